@@ -0,0 +1,104 @@
+"""This module benchmarks the battery listing read paths.
+
+Usage: python -m benchmarks.bench_battery_listing [--rows 100000]
+
+The batteries are written to the scratch database in BENCH_DB_URI, or to a
+temporary SQLite file when it is not set, see `benchmarks.scratch`. The
+listing of every row is read and serialized with full ORM instances and with
+the column-projected rows of `src.database.read_models`, and the median
+latency and the peak memory allocated by each path are printed."""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_state import BatteryState
+from src.database.read_models import select_batteries
+from src.utils.serializers import battery_to_dict
+
+from benchmarks.scratch import recreate_table, use_scratch_database
+
+
+def create_battery_table(rows, chunk_size=10000):
+    """Recreates 'batteries' with `rows` batteries, without states, in the
+    scratch database."""
+
+    recreate_table(Battery.__table__)
+    recreate_table(BatteryState.__table__)
+    now = datetime.utcnow()
+    for start in range(0, rows, chunk_size):
+        db.session.execute(
+            insert(Battery),
+            [
+                {
+                    "state_of_charge": i % 100,
+                    "capacity": 100,
+                    "voltage": 12.5,
+                    "battery_health": "GOOD",
+                    "created_at": now - timedelta(seconds=i),
+                    "updated_at": now,
+                }
+                for i in range(start, min(start + chunk_size, rows))
+            ],
+        )
+    db.session.commit()
+
+
+def orm_listing():
+    """The listing read through full ORM instances."""
+
+    query = Battery.query.order_by(Battery.created_at, Battery.battery_id)
+    return [battery_to_dict(battery) for battery in query]
+
+
+def row_listing():
+    """The listing read through column-projected rows."""
+
+    query = select_batteries().order_by(Battery.created_at, Battery.battery_id)
+    return [battery_to_dict(battery) for battery in query]
+
+
+def measure(func, repeat):
+    """Returns the median duration of the function in milliseconds and the
+    peak memory it allocated in MiB. The session is cleared after each run."""
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+        db.session.remove()
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.remove()
+    return statistics.median(durations), peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    use_scratch_database()
+    app = create_app()
+    with app.app_context():
+        create_battery_table(args.rows)
+        print(f"{'path':>8} {'rows':>10} {'median ms':>12} {'peak MiB':>10}")
+        for name, func in (("orm", orm_listing), ("rows", row_listing)):
+            duration, peak = measure(func, args.repeat)
+            print(f"{name:>8} {args.rows:>10} {duration:>12.1f} {peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""This module benchmarks the exceed count strategies of the health check.
+
+Usage: python -m benchmarks.bench_health_check [--sizes 1000 100000 1000000]
+
+The logs are written to the scratch database in BENCH_DB_URI, or to a
+temporary SQLite file when it is not set, see `benchmarks.scratch`. Every size
+seeds one battery with that many logs, half of them out of band, all within
+the health check window."""
+
+import uuid
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery_log import BatteryLog
+from src.services.battery_health_check import (
+    IncrementalStrategy,
+    RowScanStrategy,
+    SqlAggregateStrategy,
+)
+from src.services.health_engine import health_counter
+
+from src.config.app_config import HEALTH_CHECK_WINDOW
+
+from benchmarks.scratch import recreate_table, use_scratch_database
+
+
+def create_log_table():
+    """Recreates 'battery_logs' in the scratch database."""
+
+    recreate_table(BatteryLog.__table__)
+
+
+def seed_logs(battery_id, size, now, chunk_size=10000):
+    """Inserts `size` logs for the battery, spread over the last hours."""
+
+    for start in range(0, size, chunk_size):
+        db.session.execute(
+            insert(BatteryLog),
+            [
+                {
+                    "battery_id": battery_id,
+                    "state_of_charge": 10 if i % 2 else 50,
+                    "voltage": 12,
+                    "timestamp": now - timedelta(seconds=i % 80000),
+                }
+                for i in range(start, min(start + chunk_size, size))
+            ],
+        )
+    db.session.commit()
+
+
+def measure(func, repeat):
+    """Returns the median duration of the function in milliseconds."""
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def run(sizes, repeat):
+    """Runs the benchmark for every size and prints one row per strategy."""
+
+    now = datetime.utcnow()
+    since = now - HEALTH_CHECK_WINDOW
+    strategies = {
+        "scan": RowScanStrategy(),
+        "aggregate": SqlAggregateStrategy(),
+        "incremental": IncrementalStrategy(),
+    }
+
+    create_log_table()
+    print(f"{'logs':>10} {'strategy':>20} {'median ms':>12}")
+    for size in sizes:
+        battery_id = uuid.uuid4()
+        seed_logs(battery_id, size, now)
+
+        for name, strategy in strategies.items():
+            if name == "incremental":
+                # the first count rebuilds the window from the logs.
+                health_counter.reconcile([battery_id])
+                cold = measure(
+                    lambda s=strategy: s.count(battery_id, None, since, now),
+                    1,
+                )
+                print(f"{size:>10} {'incremental (cold)':>20} {cold:>12.3f}")
+            duration = measure(
+                lambda s=strategy: s.count(battery_id, None, since, now),
+                repeat,
+            )
+            print(f"{size:>10} {name:>20} {duration:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 100000, 1000000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    use_scratch_database()
+    app = create_app()
+    with app.app_context():
+        run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""This module load-tests the batteries and issues API end to end.
+
+Usage: python -m benchmarks.bench_load [--requests 1000] [--concurrency 4]
+       [--url http://127.0.0.1:5000] [--output load.json]
+
+Without `--url` the requests go through the app in this process, with the
+scratch database in BENCH_DB_URI, or a temporary SQLite file when it is not
+set, see `benchmarks.scratch`. With `--url` they are sent over
+HTTP to a running server, e.g. gunicorn against a local Postgres.
+
+The batteries and issues the scenarios read and change are created through
+the API first. Every scenario then sends its requests from `--concurrency`
+threads, and its latency percentiles, throughput and error count are
+reported."""
+
+import json
+import random
+import argparse
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from src.app import create_app
+from src.database.database import db
+
+from benchmarks.results import print_results, save_results, summarize
+from benchmarks.scratch import use_scratch_database
+
+
+class AppClient:
+    """Sends the requests to the app in this process."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def request(self, method, path, body=None):
+        """Returns the status code and the JSON body of the response."""
+
+        response = self.app.test_client().open(path, method=method, json=body)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpClient:
+    """Sends the requests to a running server."""
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+
+    def request(self, method, path, body=None):
+        """Returns the status code and the JSON body of the response."""
+
+        data = None if body is None else json.dumps(body).encode()
+        request = urllib.request.Request(
+            self.url + path,
+            data=data,
+            method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read() or "null")
+        except urllib.error.HTTPError as error:
+            return error.code, None
+
+
+def seed(client, batteries, issues_per_battery):
+    """Creates the batteries and their issues through the API, returning the
+    ids of the batteries and the (battery id, issue id) of the issues."""
+
+    battery_ids = []
+    for i in range(batteries):
+        status, body = client.request(
+            "POST",
+            "/api/v1/batteries",
+            {
+                "state_of_charge": 50 + i % 30,
+                "capacity": 100,
+                "voltage": 12,
+                "battery_health": "EXCELLENT",
+            },
+        )
+        if status != 201:
+            raise RuntimeError(f"Seeding the batteries failed with {status}")
+        battery_ids.append(body["battery_id"])
+
+    issues = [
+        {
+            "battery_id": battery_id,
+            "issue_type": "Overheating",
+            "issue_description": "Battery temperature exceeded safe limits",
+        }
+        for battery_id in battery_ids
+        for _ in range(issues_per_battery)
+    ]
+    issue_ids = []
+    for start in range(0, len(issues), 1000):
+        batch = issues[start : start + 1000]
+        status, body = client.request(
+            "POST", "/api/v1/batteries/issues", batch
+        )
+        if status != 200:
+            raise RuntimeError(f"Seeding the issues failed with {status}")
+        issue_ids += [
+            (issue["battery_id"], result["id"])
+            for issue, result in zip(batch, body["results"])
+            if result["status"] == "ok"
+        ]
+    return battery_ids, issue_ids
+
+
+def scenarios(battery_ids, issue_ids):
+    """Returns {name: request factory} of the scenarios, each factory
+    returning the (method, path, body) of a request."""
+
+    def battery_id():
+        return random.choice(battery_ids)
+
+    def issue_path():
+        battery, issue = random.choice(issue_ids)
+        return f"/api/v1/batteries/{battery}/issues/{issue}"
+
+    return {
+        "GET /batteries": lambda: ("GET", "/api/v1/batteries?limit=100", None),
+        "GET /batteries/<id>": lambda: (
+            "GET",
+            f"/api/v1/batteries/{battery_id()}",
+            None,
+        ),
+        "POST /batteries": lambda: (
+            "POST",
+            "/api/v1/batteries",
+            {
+                "state_of_charge": 60,
+                "capacity": 100,
+                "voltage": 12,
+                "battery_health": "EXCELLENT",
+            },
+        ),
+        "PUT /batteries/<id>": lambda: (
+            "PUT",
+            f"/api/v1/batteries/{battery_id()}",
+            {"state_of_charge": random.randint(0, 100), "voltage": 12},
+        ),
+        "GET /batteries/<id>/issues": lambda: (
+            "GET",
+            f"/api/v1/batteries/{battery_id()}/issues?limit=50",
+            None,
+        ),
+        "POST /batteries/<id>/issues": lambda: (
+            "POST",
+            f"/api/v1/batteries/{battery_id()}/issues",
+            {"issue_type": "Noise", "issue_description": "Buzzing"},
+        ),
+        "PUT /batteries/<id>/issues/<id>": lambda: (
+            "PUT",
+            issue_path(),
+            {
+                "issue_type": "Overheating",
+                "issue_description": f"Reading {random.randint(0, 999)}",
+            },
+        ),
+    }
+
+
+def run_scenario(client, name, make_request, requests, concurrency):
+    """Sends the requests of the scenario from `concurrency` threads and
+    returns its result."""
+
+    durations = []
+    errors = []
+    lock = threading.Lock()
+    per_thread = [requests // concurrency] * concurrency
+    per_thread[0] += requests % concurrency
+
+    def worker(count):
+        thread_durations = []
+        thread_errors = 0
+        for _ in range(count):
+            method, path, body = make_request()
+            start = time.perf_counter()
+            status, _ = client.request(method, path, body)
+            thread_durations.append(time.perf_counter() - start)
+            if status >= 400:
+                thread_errors += 1
+        with lock:
+            durations.extend(thread_durations)
+            errors.append(thread_errors)
+
+    threads = [
+        threading.Thread(target=worker, args=(count,)) for count in per_thread
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return summarize(
+        name,
+        durations,
+        elapsed,
+        errors=sum(errors),
+        concurrency=concurrency,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Load-test a running server instead.")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--batteries", type=int, default=100)
+    parser.add_argument("--issues-per-battery", type=int, default=20)
+    parser.add_argument(
+        "--scenarios", nargs="+", help="Run only the named scenarios."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this file.")
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    database = None
+    if args.url:
+        client = HttpClient(args.url)
+    else:
+        use_scratch_database()
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            database = db.engine.dialect.name
+        client = AppClient(app)
+
+    battery_ids, issue_ids = seed(
+        client, args.batteries, args.issues_per_battery
+    )
+    results = [
+        run_scenario(
+            client, name, make_request, args.requests, args.concurrency
+        )
+        for name, make_request in scenarios(battery_ids, issue_ids).items()
+        if not args.scenarios or name in args.scenarios
+    ]
+
+    print_results(results)
+    if args.output:
+        save_results(
+            args.output,
+            "load",
+            results,
+            database=database or args.url,
+            params={
+                key: value
+                for key, value in vars(args).items()
+                if key != "output"
+            },
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""This module micro-benchmarks the validators and the health check.
+
+Usage: python -m benchmarks.bench_micro [--sizes 1000 100000] [--output micro.json]
+
+The validators are called with valid and invalid payloads, and with a batch
+of 10000 readings of 100 batteries. The health check is run with the engine
+and policy of the app's configuration (see HEALTH_CHECK_ENGINE and
+HEALTH_POLICY) against one battery per size, seeded with that many logs in
+the scratch database in BENCH_DB_URI, or in a temporary SQLite file when it
+is not set, see `benchmarks.scratch`."""
+
+import uuid
+import argparse
+from datetime import datetime
+
+from src.app import create_app
+from src.database.database import db
+from src.services.battery_health_check import HealthCheck
+from src.utils.input_validators import (
+    validate_battery_data,
+    validate_issue_data,
+    validate_reading_data,
+)
+from src.utils.schemas import validate_items
+
+from benchmarks.bench_health_check import create_log_table, seed_logs
+from benchmarks.scratch import use_scratch_database
+from benchmarks.results import (
+    print_results,
+    save_results,
+    summarize,
+    timed_calls,
+)
+
+VALIDATOR_CASES = {
+    "validate_battery_data[valid]": (
+        validate_battery_data,
+        {
+            "state_of_charge": 85,
+            "capacity": 100,
+            "voltage": 24,
+            "battery_health": "GOOD",
+        },
+    ),
+    "validate_battery_data[invalid]": (
+        validate_battery_data,
+        {"state_of_charge": 150, "voltage": "24"},
+    ),
+    "validate_issue_data[valid]": (
+        validate_issue_data,
+        {"issue_type": "Overheating", "issue_description": "Too hot"},
+    ),
+    "validate_issue_data[invalid]": (
+        validate_issue_data,
+        {"issue_type": "Overheating"},
+    ),
+}
+
+
+def bench_validators(iterations):
+    """Returns the results of the validators."""
+
+    results = []
+    for name, (validator, data) in VALIDATOR_CASES.items():
+        durations, elapsed = timed_calls(
+            lambda v=validator, d=data: v(d), iterations
+        )
+        results.append(summarize(name, durations, elapsed))
+    return results
+
+
+def bench_batch_validation(repeat, size=10000):
+    """Returns the results of the validation of a batch of readings."""
+
+    battery_ids = [str(uuid.uuid4()) for _ in range(100)]
+    readings = [
+        {
+            "battery_id": battery_ids[index % len(battery_ids)],
+            "state_of_charge": index % 101,
+            "voltage": 12.0,
+            "timestamp": "2023-06-01T08:30:00",
+        }
+        for index in range(size)
+    ]
+    durations, elapsed = timed_calls(
+        lambda: validate_items(validate_reading_data, readings), repeat
+    )
+    return [
+        summarize(
+            f"validate_items[{size} readings]",
+            durations,
+            elapsed,
+            readings=size,
+        )
+    ]
+
+
+def bench_health_check(sizes, repeat):
+    """Returns the results of the health check at every log volume."""
+
+    now = datetime.utcnow()
+    create_log_table()
+    results = []
+    for size in sizes:
+        battery_id = uuid.uuid4()
+        seed_logs(battery_id, size, now)
+
+        def check(battery_id=battery_id):
+            HealthCheck(battery_id, "EXCELLENT", now).check_condition()
+
+        durations, elapsed = timed_calls(check, repeat)
+        results.append(
+            summarize(
+                f"HealthCheck.check_condition[{size} logs]",
+                durations,
+                elapsed,
+                logs=size,
+            )
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Write the results to this file.")
+    args = parser.parse_args()
+
+    use_scratch_database()
+
+    app = create_app()
+    with app.app_context():
+        results = bench_validators(args.iterations)
+        results += bench_batch_validation(args.repeat)
+        results += bench_health_check(args.sizes, args.repeat)
+        database = db.engine.dialect.name
+
+    print_results(results)
+    if args.output:
+        save_results(
+            args.output,
+            "micro",
+            results,
+            database=database,
+            params={
+                "sizes": args.sizes,
+                "iterations": args.iterations,
+                "repeat": args.repeat,
+                "health_check_engine": app.config["HEALTH_CHECK_ENGINE"],
+                "health_policy": app.config["HEALTH_POLICY"],
+            },
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""This module benchmarks the JSON serialization of battery listings.
+
+Usage: python -m benchmarks.bench_serialization [--sizes 100 1000 10000]
+
+Every size serializes a page of that many batteries, built in memory, with
+the hand written dicts and the standard library provider the routes used to
+have, and with the compiled serializers and each JSON provider."""
+
+import uuid
+import argparse
+import statistics
+import time
+from datetime import datetime
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from src.database.model_battery import Battery
+from src.utils.json_provider import OrjsonProvider
+from src.utils.serializers import battery_to_dict
+
+
+def make_batteries(size):
+    """Returns `size` batteries with all of their fields set."""
+
+    now = datetime.utcnow()
+    batteries = []
+    for i in range(size):
+        battery = Battery(
+            state_of_charge=i % 100,
+            capacity=100,
+            voltage=12.5,
+            battery_health="GOOD",
+            battery_id=uuid.uuid4(),
+        )
+        battery.created_at = battery.updated_at = now
+        batteries.append(battery)
+    return batteries
+
+
+def legacy_to_dict(battery):
+    """The representation the routes built by hand before."""
+
+    return {
+        "id": str(battery.battery_id),
+        "state_of_charge": battery.state_of_charge,
+        "capacity": battery.capacity,
+        "voltage": battery.voltage,
+        "battery_health": battery.battery_health,
+        "created_at": battery.created_at,
+        "updated_at": battery.updated_at,
+    }
+
+
+def measure(func, repeat):
+    """Returns the median duration of the function in milliseconds."""
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    """Runs the benchmark and prints a table of the median durations."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1000, 10000]
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    iso_app = Flask(__name__)
+    iso_app.config["JSON_DATETIME_FORMAT"] = "iso"
+    default = DefaultJSONProvider(app)
+    cases = {
+        "legacy dicts + json": (legacy_to_dict, default),
+        "compiled + json": (battery_to_dict, default),
+        "compiled + orjson": (battery_to_dict, OrjsonProvider(app)),
+        "compiled + orjson iso": (battery_to_dict, OrjsonProvider(iso_app)),
+    }
+
+    print(f"{'case':<24}" + "".join(f"{size:>12}" for size in args.sizes))
+    for name, (serializer, provider) in cases.items():
+        row = f"{name:<24}"
+        for size in args.sizes:
+            batteries = make_batteries(size)
+            with app.app_context():
+                duration = measure(
+                    lambda: provider.response(
+                        [serializer(battery) for battery in batteries]
+                    ),
+                    args.repeat,
+                )
+            row += f"{duration:>10.2f}ms"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""This module compares two saved runs of the benchmark suite.
+
+Usage: python -m benchmarks.compare baseline.json current.json [--threshold 10]
+
+Every benchmark found in both runs is printed with the change of its p50,
+p95, p99 and throughput. A benchmark regresses when one of its latency
+percentiles grows, or its throughput drops, by more than the threshold in
+percent; the command then exits with status 1, so it can gate a CI job."""
+
+import sys
+import json
+import argparse
+
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def load_results(path):
+    """Returns the run saved in the file and its results by name."""
+
+    with open(path, encoding="utf-8") as file:
+        run = json.load(file)
+    return run, {result["name"]: result for result in run["results"]}
+
+
+def change(baseline, current):
+    """Returns the change from the baseline in percent, or None."""
+
+    if not baseline or current is None:
+        return None
+    return (current - baseline) / baseline * 100
+
+
+def compare(baseline, current, threshold):
+    """Returns a row per benchmark of both runs, with the change of every
+    metric and whether it regressed."""
+
+    rows = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        changes = {
+            metric: change(baseline[name].get(metric), result.get(metric))
+            for metric in LATENCY_METRICS + ("rps",)
+        }
+        regressed = any(
+            changes[metric] is not None and changes[metric] > threshold
+            for metric in LATENCY_METRICS
+        ) or (changes["rps"] is not None and changes["rps"] < -threshold)
+        rows.append((name, changes, regressed))
+    return rows
+
+
+def _format(value):
+    return f"{value:+.1f}%" if value is not None else "n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+
+    baseline_run, baseline = load_results(args.baseline)
+    current_run, current = load_results(args.current)
+    print(
+        f"{baseline_run.get('commit')} -> {current_run.get('commit')} "
+        f"({current_run.get('suite')}, threshold {args.threshold}%)"
+    )
+
+    rows = compare(baseline, current, args.threshold)
+    print(f"{'benchmark':>40} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8}")
+    for name, changes, regressed in rows:
+        print(
+            f"{name:>40} "
+            + " ".join(
+                f"{_format(changes[metric]):>8}"
+                for metric in LATENCY_METRICS + ("rps",)
+            )
+            + ("  REGRESSED" if regressed else "")
+        )
+
+    regressions = [name for name, _, regressed in rows if regressed]
+    if regressions:
+        print(f"{len(regressions)} benchmarks regressed.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""This module summarizes and saves the results of the benchmark suite.
+
+Every benchmark records the duration of each call, which is summarized into
+percentiles and a throughput. A run is saved as one JSON document holding the
+results with the commit, Python version and database they were measured on,
+so runs of different commits can be compared with `benchmarks.compare`."""
+
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+
+def git_commit():
+    """Returns the commit of the working tree, or None outside of git."""
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(sorted_values, fraction):
+    """Returns the value at the fraction of the sorted values, interpolated
+    between the closest ranks."""
+
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def summarize(name, durations, elapsed=None, **extra):
+    """Returns the result of a benchmark from the durations of its calls in
+    seconds. The throughput is counted over `elapsed`, the wall time of the
+    whole run, which defaults to the sum of the durations."""
+
+    values = sorted(durations)
+    elapsed = elapsed if elapsed is not None else sum(values)
+    return {
+        "name": name,
+        "count": len(values),
+        "p50_ms": percentile(values, 0.50) * 1000,
+        "p95_ms": percentile(values, 0.95) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "mean_ms": sum(values) / len(values) * 1000,
+        "rps": len(values) / elapsed if elapsed else None,
+        **extra,
+    }
+
+
+def timed_calls(func, count):
+    """Calls the function `count` times, returning the duration of every call
+    and the wall time of all of them, in seconds."""
+
+    durations = []
+    started = time.perf_counter()
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations, time.perf_counter() - started
+
+
+def print_results(results):
+    """Prints the results as a table."""
+
+    print(
+        f"{'benchmark':>40} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'rps':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['name']:>40} {result['count']:>7} "
+            f"{result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} "
+            f"{result['p99_ms']:>9.3f} {result['rps'] or 0:>10.1f}"
+        )
+
+
+def save_results(path, suite, results, database=None, params=None):
+    """Writes the results of a run of the suite to the JSON file."""
+
+    document = {
+        "suite": suite,
+        "created_at": datetime.utcnow().isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "database": database,
+        "params": params or {},
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(document, file, indent=2)
+        file.write("\n")
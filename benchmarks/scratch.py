@@ -0,0 +1,47 @@
+"""This module points the benchmarks at a scratch database.
+
+The benchmarks seed, and some of them recreate, their tables, so they never
+run against the service's SQLALCHEMY_DB_URI: they use the database in
+BENCH_DB_URI, or a temporary SQLite file when it is not set."""
+
+import os
+import tempfile
+
+from sqlalchemy.engine import make_url
+
+from src.database.database import db
+
+
+def _database(url):
+    """Returns what identifies the database of a URL, whatever its driver."""
+
+    return url.get_backend_name(), url.host, url.port, url.database
+
+
+def use_scratch_database():
+    """Points the apps created from now on at the scratch database and
+    returns its URI."""
+
+    uri = os.environ.get("BENCH_DB_URI")
+    if not uri:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        uri = f"sqlite:///{path}"
+    os.environ["SQLALCHEMY_DB_URI"] = uri
+    os.environ["BENCH_SCRATCH_DB_URI"] = uri
+    return uri
+
+
+def recreate_table(table):
+    """Drops and creates the table of a model. Raises RuntimeError unless
+    the app runs on the scratch database of `use_scratch_database`."""
+
+    scratch_uri = os.environ.get("BENCH_SCRATCH_DB_URI")
+    if not scratch_uri or _database(db.engine.url) != _database(
+        make_url(scratch_uri)
+    ):
+        raise RuntimeError(
+            f"Refusing to drop '{table.name}' outside of the scratch "
+            f"database, see BENCH_DB_URI."
+        )
+    table.drop(db.engine, checkfirst=True)
+    table.create(db.engine)
@@ -0,0 +1,39 @@
+"""Gunicorn settings of the production server, read from the environment.
+
+Every worker holds its own database pool, so WEB_CONCURRENCY times
+(DB_POOL_SIZE + DB_MAX_OVERFLOW) must fit the database's max_connections, and
+GUNICORN_THREADS should not exceed the pool of a worker."""
+
+# pylint: disable=invalid-name
+
+import os
+import multiprocessing
+
+wsgi_app = os.environ.get("APP_MODULE", "src.app:create_app()")
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+workers = int(
+    os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# recycle the workers now and then, staggered so they do not restart at once.
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = "-"
+errorlog = "-"
+
+
+def worker_exit(server, worker):  # pylint: disable=unused-argument
+    """Stores the readings still queued by the asynchronous ingestion."""
+
+    # pylint: disable=import-outside-toplevel
+    from src.services.battery_ingest import ingest_pipeline
+
+    ingest_pipeline.stop()
@@ -8,15 +8,86 @@ from flask_cors import CORS
 
 from src.database.database import db
 from src.config.logs import LOG_CONFIG
+from src.config.engine_config import engine_options
+from src.utils.json_provider import create_json_provider
 
 from src.services.battery_subscriber import battery_subscriber
 from src.services.battery_issues import battery_issues
+from src.services.battery_ingest import battery_ingest, ingest_pipeline
+from src.services.battery_history import battery_history
+from src.services.data_export import data_export
+from src.services.maintenance import maintenance
+from src.services.diagnostics import diagnostics
+from src.services.battery_cache import battery_cache
+from src.services.instrumentation import instrumentation
+from src.services.reading_coalescer import reading_coalescer
 
 
 logging.config.dictConfig(LOG_CONFIG)
 logger = logging.getLogger(__name__)
 
 
+def _service_config():
+    """Returns the settings of the optional service features."""
+
+    log_retention_days = os.environ.get("LOG_RETENTION_DAYS")
+    archive_after_days = os.environ.get("ARCHIVE_AFTER_DAYS")
+    return {
+        "HEALTH_CHECK_ENGINE": os.environ.get("HEALTH_CHECK_ENGINE", "scan"),
+        "HEALTH_POLICY": os.environ.get("HEALTH_POLICY", "exceed"),
+        "LOG_RETENTION_DAYS": int(log_retention_days)
+        if log_retention_days
+        else None,
+        "ARCHIVE_DIR": os.environ.get("ARCHIVE_DIR", "archive"),
+        "ARCHIVE_AFTER_DAYS": int(archive_after_days)
+        if archive_after_days
+        else None,
+        "ARCHIVE_PARTITIONS": int(os.environ.get("ARCHIVE_PARTITIONS", 16)),
+        "ARCHIVE_COMPRESSION": os.environ.get("ARCHIVE_COMPRESSION", "zstd"),
+        "BATTERY_CACHE_BACKEND": os.environ.get(
+            "BATTERY_CACHE_BACKEND", "none"
+        ),
+        "BATTERY_CACHE_SIZE": int(os.environ.get("BATTERY_CACHE_SIZE", 10000)),
+        "BATTERY_CACHE_TTL": int(os.environ.get("BATTERY_CACHE_TTL", 30)),
+        "REDIS_URL": os.environ.get("REDIS_URL", "redis://localhost:6379/0"),
+        "INGEST_MODE": os.environ.get("INGEST_MODE", "sync"),
+        "INGEST_QUEUE_SIZE": int(os.environ.get("INGEST_QUEUE_SIZE", 10000)),
+        "INGEST_WORKERS": int(os.environ.get("INGEST_WORKERS", 1)),
+        "INGEST_BATCH_SIZE": int(os.environ.get("INGEST_BATCH_SIZE", 500)),
+        "INGEST_FLUSH_INTERVAL": float(
+            os.environ.get("INGEST_FLUSH_INTERVAL", 0.5)
+        ),
+        "INGEST_MAX_RETRIES": int(os.environ.get("INGEST_MAX_RETRIES", 5)),
+        "READING_COALESCING": os.environ.get("READING_COALESCING", False)
+        == "True",
+        "COALESCE_STATE_OF_CHARGE_DEADBAND": float(
+            os.environ.get("COALESCE_STATE_OF_CHARGE_DEADBAND", 0.5)
+        ),
+        "COALESCE_VOLTAGE_DEADBAND": float(
+            os.environ.get("COALESCE_VOLTAGE_DEADBAND", 0.05)
+        ),
+        "COALESCE_MAX_INTERVAL": float(
+            os.environ.get("COALESCE_MAX_INTERVAL", 300)
+        ),
+        "COALESCE_CACHE_SIZE": int(
+            os.environ.get("COALESCE_CACHE_SIZE", 100000)
+        ),
+        "ISSUE_RULES_ENABLED": os.environ.get("ISSUE_RULES_ENABLED", False)
+        == "True",
+        "PROFILER_ENABLED": os.environ.get("PROFILER_ENABLED", False)
+        == "True",
+        "PROFILER_INTERVAL": float(os.environ.get("PROFILER_INTERVAL", 0.005)),
+        "PROFILER_SLOW_REQUEST_MS": float(
+            os.environ.get("PROFILER_SLOW_REQUEST_MS", 500)
+        ),
+        "PROFILER_OUTPUT_DIR": os.environ.get(
+            "PROFILER_OUTPUT_DIR", "profiles"
+        ),
+        "JSON_PROVIDER": os.environ.get("JSON_PROVIDER", "auto"),
+        "JSON_DATETIME_FORMAT": os.environ.get("JSON_DATETIME_FORMAT", "http"),
+    }
+
+
 def create_app():
     """Main flask application function."""
 
@@ -30,17 +101,29 @@ def create_app():
         SECRET_KEY=secret_key,
         SQLALCHEMY_DATABASE_URI=db_uri,
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        SQLALCHEMY_ENGINE_OPTIONS=engine_options(db_uri, os.environ),
         TESTING=test_mode,
+        **_service_config(),
     )
+    app.json = create_json_provider(app)
     CORS(app, resources={r"/api/*": {"origins": "*"}})
 
     db.app = app
     db.init_app(app)
+    battery_cache.init_app(app)
+    ingest_pipeline.init_app(app)
+    reading_coalescer.init_app(app)
+    instrumentation.init_app(app)
     # Application configuration: end #
 
     # Blueprints: start #
     app.register_blueprint(battery_subscriber)
     app.register_blueprint(battery_issues)
+    app.register_blueprint(battery_ingest)
+    app.register_blueprint(battery_history)
+    app.register_blueprint(data_export)
+    app.register_blueprint(maintenance)
+    app.register_blueprint(diagnostics)
     # Blueprints: end #
 
     return app
@@ -0,0 +1,55 @@
+"""This is the asyncio (ASGI) entry point of the battery subscriber and
+incidents services. It serves the same routes as the Flask app with the
+asyncpg driver, so a worker handles many concurrent requests on one thread.
+
+Requires the packages of requirements-asgi.txt; serve it with:
+    APP_MODULE="src.asgi:create_asgi_app()" \\
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \\
+    gunicorn -c gunicorn.conf.py"""
+
+import os
+import logging
+
+from quart import Quart
+
+from src.config.logs import LOG_CONFIG
+from src.database.async_database import init_async_db
+
+from src.services.async_battery_subscriber import async_battery_subscriber
+from src.services.async_battery_issues import async_battery_issues
+
+
+logging.config.dictConfig(LOG_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+def create_asgi_app():
+    """Main quart application function."""
+
+    # Application configuration: start #
+    secret_key = os.environ.get("SECRET_KEY", "Juice-Master-Secret-Key")
+    db_uri = os.environ.get("SQLALCHEMY_DB_URI")
+    test_mode = os.environ.get("TEST_MODE", False) == "True"
+
+    app = Quart(__name__)
+    app.config.from_mapping(
+        SECRET_KEY=secret_key,
+        TESTING=test_mode,
+        HEALTH_POLICY=os.environ.get("HEALTH_POLICY", "exceed"),
+    )
+    engine = init_async_db(app, db_uri, os.environ)
+
+    @app.after_serving
+    async def dispose_engine():
+        """Closes the pooled connections on shutdown."""
+
+        await engine.dispose()
+
+    # Application configuration: end #
+
+    # Blueprints: start #
+    app.register_blueprint(async_battery_subscriber)
+    app.register_blueprint(async_battery_issues)
+    # Blueprints: end #
+
+    return app
@@ -1,4 +1,56 @@
 """This module contains application configurations."""
 
+from datetime import timedelta
+
 
 BATTERY_HEALTH_ORDER = ("BAD", "GOOD", "VERY GOOD", "EXCELLENT")
+
+# Health check thresholds: a reading outside the state of charge band counts
+# against the battery, and more than HEALTH_EXCEED_LIMIT of them within the
+# window downgrades its health by one level.
+STATE_OF_CHARGE_LOWER_LIMIT = 20
+STATE_OF_CHARGE_UPPER_LIMIT = 80
+HEALTH_EXCEED_LIMIT = 2
+HEALTH_CHECK_WINDOW = timedelta(days=1)
+
+# Maximum number of readings accepted by one bulk ingestion request.
+INGEST_MAX_BATCH_SIZE = 10000
+
+# Page sizes of the paginated listing endpoints.
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Number of rows fetched from the database and written per chunk by the
+# streaming export endpoints.
+EXPORT_CHUNK_SIZE = 1000
+
+# Time range of the battery logs history when the request does not set one.
+HISTORY_DEFAULT_RANGE = timedelta(days=1)
+
+# Maximum number of issues accepted by one bulk issue request.
+ISSUE_MAX_BATCH_SIZE = 10000
+
+# Issue rules: readings above STATE_OF_CHARGE_UPPER_LIMIT raise an
+# over-charge issue, readings below DEEP_DISCHARGE_LIMIT a deep discharge
+# issue, and a voltage changing by more than VOLTAGE_ANOMALY_RATIO from the
+# previous reading a voltage anomaly. A battery gets at most one issue of a
+# type per ISSUE_RULE_COOLDOWN.
+DEEP_DISCHARGE_LIMIT = 10
+VOLTAGE_ANOMALY_RATIO = 0.2
+ISSUE_RULE_COOLDOWN = timedelta(hours=1)
+
+# Analytics health policy: on top of the exceed count, the health goes one
+# level down for each of more than HEALTH_CYCLE_LIMIT equivalent full cycles,
+# more than HEALTH_DEEP_DISCHARGE_LIMIT discharges of at least
+# DEEP_DISCHARGE_DEPTH points, and a voltage sag while discharging of more
+# than HEALTH_VOLTAGE_SAG_LIMIT, within the health check window.
+HEALTH_CYCLE_LIMIT = 3
+DEEP_DISCHARGE_DEPTH = 80
+HEALTH_DEEP_DISCHARGE_LIMIT = 1
+HEALTH_VOLTAGE_SAG_LIMIT = 0.1
+DEPTH_OF_DISCHARGE_BINS = (0, 20, 40, 60, 80, 100)
+
+# Maximum number of rows of a row group of the archived log files. The files
+# are sorted by battery, so a history read skips the row groups of the other
+# batteries.
+ARCHIVE_ROW_GROUP_SIZE = 65536
@@ -0,0 +1,112 @@
+"""This module builds the SQLAlchemy engine options from the environment.
+
+The pool settings apply per process: with gunicorn every worker holds up to
+DB_POOL_SIZE + DB_MAX_OVERFLOW connections, which must fit the server's
+max_connections. Behind PgBouncer the pooling is left to PgBouncer."""
+
+from sqlalchemy.pool import NullPool
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _env_bool(environ, name, default):
+    """Returns the boolean value of an environment variable."""
+
+    value = environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("true", "1", "yes")
+
+
+def _env_int(environ, name, default):
+    """Returns the integer value of an environment variable.
+    Raises ValueError if it is not an integer."""
+
+    value = environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError as error:
+        raise ValueError(
+            f"{name} must be an integer, got '{value}'"
+        ) from error
+
+
+def engine_options(db_uri, environ):
+    """Returns the SQLALCHEMY_ENGINE_OPTIONS for the database URI.
+
+    - DB_POOL_SIZE (5), DB_MAX_OVERFLOW (10), DB_POOL_TIMEOUT (30 seconds) and
+      DB_POOL_RECYCLE (1800 seconds) size the connection pool.
+    - DB_POOL_PRE_PING (true) checks connections before they are used.
+    - DB_STATEMENT_TIMEOUT_MS aborts longer statements (PostgreSQL only).
+    - DB_PGBOUNCER (false) opens a connection per checkout (NullPool) and
+      leaves the statement timeout to PgBouncer or the database role, as
+      startup options are rejected by PgBouncer. asyncpg does not cache
+      prepared statements then, as PgBouncer in transaction mode may run
+      them on another server connection.
+
+    SQLite keeps the defaults of Flask-SQLAlchemy."""
+
+    if not db_uri or db_uri.startswith("sqlite"):
+        return {}
+
+    options = {
+        "pool_pre_ping": _env_bool(environ, "DB_POOL_PRE_PING", True),
+    }
+    if _env_bool(environ, "DB_PGBOUNCER", False):
+        options["poolclass"] = NullPool
+        if db_uri.startswith("postgresql+asyncpg"):
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+            }
+        return options
+
+    options.update(
+        pool_size=_env_int(environ, "DB_POOL_SIZE", 5),
+        max_overflow=_env_int(environ, "DB_MAX_OVERFLOW", 10),
+        pool_timeout=_env_int(environ, "DB_POOL_TIMEOUT", 30),
+        pool_recycle=_env_int(environ, "DB_POOL_RECYCLE", 1800),
+    )
+    statement_timeout = _env_int(environ, "DB_STATEMENT_TIMEOUT_MS", None)
+    if statement_timeout and db_uri.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {
+            "server_settings": {"statement_timeout": str(statement_timeout)}
+        }
+    elif statement_timeout and db_uri.startswith("postgres"):
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={statement_timeout}"
+        }
+    return options
+
+
+def async_database_uri(db_uri):
+    """Returns the database URI with the asyncio driver of its database.
+    Raises ValueError if the database has no asyncio driver."""
+
+    scheme, separator, rest = db_uri.partition("://")
+    database = scheme.split("+")[0]
+    if not separator or database not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver for database URI '{db_uri}'")
+    return f"{ASYNC_DRIVERS[database]}://{rest}"
+
+
+def pool_status(engine):
+    """Returns the connections held by the pool of the engine. Pools that
+    do not keep connections only report their class."""
+
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if hasattr(pool, "checkedout"):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    return status
@@ -0,0 +1,41 @@
+"""This module contains the asyncio database engine of the ASGI app.
+
+The models are shared with the Flask app; they are queried with `select`
+statements on an `AsyncSession` instead of `Model.query`."""
+
+from contextlib import asynccontextmanager
+
+from quart import current_app
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.config.engine_config import async_database_uri, engine_options
+from src.utils.pagination import split_page
+
+
+def init_async_db(app, db_uri, environ):
+    """Creates the asyncio engine and session factory of the app, with the
+    pool options of the environment."""
+
+    db_uri = async_database_uri(db_uri)
+    engine = create_async_engine(db_uri, **engine_options(db_uri, environ))
+    app.extensions["async_engine"] = engine
+    app.extensions["async_session"] = async_sessionmaker(
+        engine, expire_on_commit=False
+    )
+    return engine
+
+
+@asynccontextmanager
+async def async_session():
+    """Yields a session of the current app, closed on exit."""
+
+    async with current_app.extensions["async_session"]() as session:
+        yield session
+
+
+async def fetch_page(session, statement, limit, key):
+    """Reads one page of the ordered statement. Returns the rows and the
+    cursor of the next page, or None on the last page."""
+
+    rows = (await session.execute(statement.limit(limit + 1))).all()
+    return split_page(rows, limit, key)
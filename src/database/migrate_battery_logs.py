@@ -0,0 +1,169 @@
+"""This module migrates 'battery_logs' to the time series layout.
+
+The existing table is renamed to 'battery_logs_legacy' and kept as it is. The
+new table gets a surrogate key and a (battery_id, timestamp DESC) index, and on
+Postgres it can be partitioned by day. The rename and the new table are
+committed first, so new logs go to the new table right away, and the logs are
+then copied over one day at a time, each day in its own transaction, so no
+lock on the table is held for the whole copy."""
+
+import logging
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from src.database.model_battery_log import BatteryLog
+
+logger = logging.getLogger()
+
+LEGACY_TABLE = "battery_logs_legacy"
+
+PARTITIONED_TABLE_DDL = """
+CREATE TABLE battery_logs (
+    log_id BIGSERIAL,
+    battery_id UUID NOT NULL,
+    state_of_charge FLOAT,
+    voltage FLOAT,
+    timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (log_id, timestamp)
+) PARTITION BY RANGE (timestamp)
+"""
+
+DEFAULT_PARTITION_DDL = (
+    "CREATE TABLE IF NOT EXISTS battery_logs_default "
+    "PARTITION OF battery_logs DEFAULT"
+)
+
+INDEX_DDL = (
+    "CREATE INDEX IF NOT EXISTS ix_battery_logs_battery_id_timestamp "
+    "ON battery_logs (battery_id, timestamp DESC)"
+)
+
+COPY_DML = f"""
+INSERT INTO battery_logs (battery_id, state_of_charge, voltage, timestamp)
+SELECT battery_id, state_of_charge, voltage, timestamp
+FROM {LEGACY_TABLE}
+WHERE battery_id IS NOT NULL
+    AND timestamp >= :start AND timestamp < :end
+ORDER BY battery_id, timestamp
+"""
+
+
+def partition_name(day):
+    """Returns the name of the daily partition that holds the given day."""
+
+    return f"battery_logs_{day:%Y%m%d}"
+
+
+def daily_partition_ddl(day):
+    """Returns the DDL creating the partition of 'battery_logs' for a day."""
+
+    start = datetime.combine(day, time.min)
+    end = start + timedelta(days=1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(day)} "
+        f"PARTITION OF battery_logs "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def daily_partitions_ddl(first_day, last_day):
+    """Returns the DDL creating the daily partitions from first to last day."""
+
+    days = (last_day - first_day).days + 1
+    return [
+        daily_partition_ddl(first_day + timedelta(days=i))
+        for i in range(max(days, 0))
+    ]
+
+
+def _logged_days(connection, table):
+    """Returns every day between the first and the last log of the table."""
+
+    first, last = connection.execute(
+        text(f"SELECT MIN(timestamp), MAX(timestamp) FROM {table}")
+    ).one()
+    if first is None:
+        return []
+    if isinstance(first, str):
+        first, last = datetime.fromisoformat(first), datetime.fromisoformat(
+            last
+        )
+    return [
+        first.date() + timedelta(days=i)
+        for i in range((last.date() - first.date()).days + 1)
+    ]
+
+
+def migration_plan(engine, partitioned=False):
+    """Returns the statements to run before the copy, the days to copy and
+    the statements to run after the copy. The index is built after the copy,
+    which is cheaper than maintaining it while the rows are inserted."""
+
+    if partitioned and engine.dialect.name != "postgresql":
+        raise ValueError("Partitioning is only supported on Postgres.")
+
+    with engine.connect() as connection:
+        days = _logged_days(connection, "battery_logs")
+
+    before = [f"ALTER TABLE battery_logs RENAME TO {LEGACY_TABLE}"]
+    if partitioned:
+        before.append(PARTITIONED_TABLE_DDL.strip())
+        before.append(DEFAULT_PARTITION_DDL)
+        if days:
+            before += daily_partitions_ddl(days[0], days[-1])
+        after = [INDEX_DDL]
+    else:
+        table = BatteryLog.__table__
+        before.append(str(CreateTable(table).compile(engine)).strip())
+        after = [
+            str(CreateIndex(index).compile(engine)) for index in table.indexes
+        ]
+    return before, days, after
+
+
+def migrate_battery_logs(engine, partitioned=False, dry_run=False):
+    """Moves 'battery_logs' to the time series layout.
+
+    The rename and the new table, every copied day and the index are
+    committed separately. Until the copy is done, the history of the days not
+    copied yet is missing from 'battery_logs'.
+
+    Returns the statements that were, or with `dry_run` would be, executed.
+    Partitioning is only available on Postgres."""
+
+    before, days, after = migration_plan(engine, partitioned)
+    statements = before + [COPY_DML.strip()] + after
+    if dry_run:
+        return statements
+
+    with engine.begin() as connection:
+        for statement in before:
+            connection.execute(text(statement))
+    for day in days:
+        start = datetime.combine(day, time.min)
+        with engine.begin() as connection:
+            result = connection.execute(
+                text(COPY_DML),
+                {"start": start, "end": start + timedelta(days=1)},
+            )
+        logger.info("Copied %s logs of %s", result.rowcount, day)
+    with engine.begin() as connection:
+        for statement in after:
+            connection.execute(text(statement))
+
+    return statements
+
+
+def create_daily_partitions(engine, first_day, days):
+    """Creates the daily partitions of the next days, e.g. from a daily job,
+    so new logs do not fall into the default partition."""
+
+    statements = daily_partitions_ddl(
+        first_day, first_day + timedelta(days=days - 1)
+    )
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+    return statements
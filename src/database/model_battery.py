@@ -23,6 +23,16 @@ class Battery(db.Model):
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
+    __table_args__ = (
+        db.Index("ix_batteries_created_at_battery_id", created_at, battery_id),
+        db.Index(
+            "ix_batteries_battery_health_created_at_battery_id",
+            battery_health,
+            created_at,
+            battery_id,
+        ),
+    )
+
     def __init__(
         self,
         state_of_charge,
@@ -62,5 +72,13 @@ class Battery(db.Model):
 #     created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP,
 #     updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP
 # );
+#
+# CREATE INDEX ix_batteries_created_at_battery_id
+#     ON batteries (created_at, battery_id);
+# CREATE INDEX ix_batteries_battery_health_created_at_battery_id
+#     ON batteries (battery_health, created_at, battery_id);
+#
+# The last readings of the batteries are kept in battery_states, see
+# src/database/model_battery_state.py.
 
 # DDL QUERY: end #
@@ -10,25 +10,55 @@ class BatteryLog(db.Model):
 
     __tablename__ = "battery_logs"
 
-    battery_id = db.Column(db.UUID, primary_key=True)
+    log_id = db.Column(
+        db.BigInteger().with_variant(db.Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    battery_id = db.Column(db.UUID, nullable=False)
     state_of_charge = db.Column(db.Float)
     voltage = db.Column(db.Float)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index(
+            "ix_battery_logs_battery_id_timestamp",
+            battery_id,
+            timestamp.desc(),
+        ),
+    )
 
     def __init__(self, battery_id, state_of_charge, voltage, timestamp=None):
         self.battery_id = battery_id
         self.state_of_charge = state_of_charge
         self.voltage = voltage
-        self.timestamp = timestamp
+        self.timestamp = timestamp if timestamp else datetime.utcnow()
+
+    def __repr__(self) -> str:
+        return (
+            f"BatteryLog("
+            f"id={self.log_id}, "
+            f"battery_id='{self.battery_id}', "
+            f"charge={self.state_of_charge}%, "
+            f"timestamp='{self.timestamp}'"
+            f")"
+        )
 
 
 # DDL QUERY: start #
 
 # CREATE TABLE battery_logs (
-#     battery_id UUID,
+#     log_id BIGSERIAL PRIMARY KEY,
+#     battery_id UUID NOT NULL,
 #     state_of_charge FLOAT,
 #     voltage FLOAT,
-#     timestamp TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP
+#     timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
 # );
+#
+# CREATE INDEX ix_battery_logs_battery_id_timestamp
+#     ON battery_logs (battery_id, timestamp DESC);
+#
+# The table can also be partitioned by day on Postgres, see
+# src/database/migrate_battery_logs.py for the partitioned DDL.
 
 # DDL QUERY: end #
@@ -0,0 +1,90 @@
+"""This module contains database model for Battery Log Rollups."""
+
+from src.database.database import db
+
+
+class BatteryLogRollup(db.Model):
+    """DB ORM for 'battery_log_rollups' table.
+
+    Holds the aggregates of the logs of a battery per hour ('1h') and per day
+    ('1d'). Sums are stored instead of averages so rollups can be merged,
+    with the number of logs having each value to divide them by.
+
+    Once the raw logs of a rollup are pruned, `pruned` is set and the rollup
+    is never rebuilt again: later (back-dated) logs of its bucket are merged
+    into it, up to the highest merged log id `last_log_id`."""
+
+    __tablename__ = "battery_log_rollups"
+
+    bucket = db.Column(db.String(2), primary_key=True)
+    battery_id = db.Column(db.UUID, primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    count = db.Column(db.Integer, nullable=False)
+    state_of_charge_min = db.Column(db.Float)
+    state_of_charge_max = db.Column(db.Float)
+    state_of_charge_sum = db.Column(db.Float)
+    state_of_charge_count = db.Column(db.Integer, nullable=False)
+    voltage_min = db.Column(db.Float)
+    voltage_max = db.Column(db.Float)
+    voltage_sum = db.Column(db.Float)
+    voltage_count = db.Column(db.Integer, nullable=False)
+    out_of_band_count = db.Column(db.Integer, nullable=False)
+    last_log_id = db.Column(db.BigInteger)
+    pruned = db.Column(db.Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        db.Index(
+            "ix_battery_log_rollups_bucket_bucket_start", bucket, bucket_start
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"BatteryLogRollup("
+            f"battery_id='{self.battery_id}', "
+            f"bucket='{self.bucket}', "
+            f"start='{self.bucket_start}', "
+            f"count={self.count}"
+            f")"
+        )
+
+
+# DDL QUERY: start #
+
+# CREATE TABLE battery_log_rollups (
+#     bucket VARCHAR(2),
+#     battery_id UUID,
+#     bucket_start TIMESTAMP WITHOUT TIME ZONE,
+#     count INTEGER NOT NULL,
+#     state_of_charge_min FLOAT,
+#     state_of_charge_max FLOAT,
+#     state_of_charge_sum FLOAT,
+#     state_of_charge_count INTEGER NOT NULL,
+#     voltage_min FLOAT,
+#     voltage_max FLOAT,
+#     voltage_sum FLOAT,
+#     voltage_count INTEGER NOT NULL,
+#     out_of_band_count INTEGER NOT NULL,
+#     last_log_id BIGINT,
+#     pruned BOOLEAN NOT NULL DEFAULT FALSE,
+#     PRIMARY KEY (bucket, battery_id, bucket_start)
+# );
+#
+# CREATE INDEX ix_battery_log_rollups_bucket_bucket_start
+#     ON battery_log_rollups (bucket, bucket_start);
+#
+# -- existing databases, then re-run compact-rollups over the kept logs:
+# ALTER TABLE battery_log_rollups
+#     ADD COLUMN state_of_charge_count INTEGER NOT NULL DEFAULT 0,
+#     ADD COLUMN voltage_count INTEGER NOT NULL DEFAULT 0;
+# UPDATE battery_log_rollups
+#     SET state_of_charge_count = count, voltage_count = count;
+# ALTER TABLE battery_log_rollups
+#     ADD COLUMN last_log_id BIGINT,
+#     ADD COLUMN pruned BOOLEAN NOT NULL DEFAULT FALSE;
+# -- the days before the oldest raw log are already pruned:
+# UPDATE battery_log_rollups SET pruned = TRUE
+#     WHERE bucket_start < (SELECT date_trunc('day', min(timestamp))
+#                           FROM battery_logs);
+
+# DDL QUERY: end #
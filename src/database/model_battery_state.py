@@ -0,0 +1,70 @@
+"""This module contains database model for Battery States."""
+
+from sqlalchemy import DDL, event
+
+from src.database.database import db
+
+
+class BatteryState(db.Model):
+    """DB ORM for 'battery_states' table.
+
+    Holds the last reading of the batteries, written when a battery is added
+    and by every telemetry update instead of the `batteries` row, and the id
+    of the last log whose health was checked, see `recompute_health`. No
+    column but the key is indexed, so the updates can be made in place (HOT)
+    in the free space of the pages."""
+
+    __tablename__ = "battery_states"
+
+    battery_id = db.Column(db.UUID(as_uuid=True), primary_key=True)
+    state_of_charge = db.Column(db.Float)
+    voltage = db.Column(db.Float)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    checked_log_id = db.Column(db.BigInteger)
+
+    def __repr__(self) -> str:
+        return (
+            f"BatteryState("
+            f"battery_id='{self.battery_id}', "
+            f"charge={self.state_of_charge}%, "
+            f"updated_at='{self.updated_at}'"
+            f")"
+        )
+
+
+event.listen(
+    BatteryState.__table__,
+    "after_create",
+    DDL("ALTER TABLE battery_states SET (fillfactor = 70)").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+
+# DDL QUERY: start #
+
+# CREATE TABLE battery_states (
+#     battery_id UUID PRIMARY KEY,
+#     state_of_charge FLOAT,
+#     voltage FLOAT,
+#     updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+#     checked_log_id BIGINT
+# ) WITH (fillfactor = 70);
+#
+# -- existing databases, the state of charge changes with almost every
+# -- reading and must not be indexed for the updates to stay HOT:
+# DROP INDEX IF EXISTS ix_battery_states_state_of_charge;
+#
+# -- existing databases, so that the listing filters see every battery:
+# INSERT INTO battery_states (battery_id, state_of_charge, voltage, updated_at)
+#     SELECT battery_id, state_of_charge, voltage, updated_at FROM batteries
+#     ON CONFLICT (battery_id) DO NOTHING;
+#
+# -- existing databases, the logs written so far were checked when written:
+# ALTER TABLE battery_states ADD COLUMN checked_log_id BIGINT;
+# UPDATE battery_states SET checked_log_id = (
+#     SELECT max(log_id) FROM battery_logs
+#     WHERE battery_logs.battery_id = battery_states.battery_id
+# );
+
+# DDL QUERY: end #
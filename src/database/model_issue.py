@@ -17,10 +17,33 @@ class Issue(db.Model):
     battery_id = db.Column(db.UUID, db.ForeignKey("batteries.battery_id"))
     issue_type = db.Column(db.String(50))
     issue_description = db.Column(db.String(255))
-    occurrence_timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    occurrence_timestamp = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow
+    )
 
     battery = db.relationship("Battery", backref="issues")
 
+    __table_args__ = (
+        db.Index(
+            "ix_issues_battery_id_occurrence_timestamp_issue_id",
+            battery_id,
+            occurrence_timestamp,
+            issue_id,
+            postgresql_include=["issue_type"],
+        ),
+        db.Index(
+            "ix_issues_occurrence_timestamp_issue_id",
+            occurrence_timestamp,
+            issue_id,
+        ),
+        db.Index(
+            "ix_issues_issue_type_occurrence_timestamp_issue_id",
+            issue_type,
+            occurrence_timestamp,
+            issue_id,
+        ),
+    )
+
     def __init__(
         self, battery_id, issue_type, issue_description, issue_id=None
     ):
@@ -48,7 +71,23 @@ class Issue(db.Model):
 #     battery_id UUID REFERENCES batteries(battery_id),
 #     issue_type VARCHAR(50),
 #     issue_description VARCHAR(255),
-#     occurrence_timestamp TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP
+#     occurrence_timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
 # );
+#
+# -- the issues of a battery, in listing order. It also serves the foreign
+# -- key, and holds issue_type so that filter is checked in the index.
+# CREATE INDEX ix_issues_battery_id_occurrence_timestamp_issue_id
+#     ON issues (battery_id, occurrence_timestamp, issue_id) INCLUDE (issue_type);
+#
+# -- the issues of the fleet, in listing order, with or without a type.
+# CREATE INDEX ix_issues_occurrence_timestamp_issue_id
+#     ON issues (occurrence_timestamp, issue_id);
+# CREATE INDEX ix_issues_issue_type_occurrence_timestamp_issue_id
+#     ON issues (issue_type, occurrence_timestamp, issue_id);
+#
+# -- existing databases:
+# UPDATE issues SET occurrence_timestamp = CURRENT_TIMESTAMP
+#     WHERE occurrence_timestamp IS NULL;
+# ALTER TABLE issues ALTER COLUMN occurrence_timestamp SET NOT NULL;
 
 # DDL QUERY: end #
@@ -0,0 +1,108 @@
+"""This module contains the column-projected read paths of the models.
+
+The queries select only the columns the responses need and return `Row`
+tuples, which are neither added to the session's identity map nor tracked for
+changes. Use them to read rows; load model instances only to change them.
+
+The batteries are read with their last state from `battery_states`, merged by
+`with_states`; a battery without a state still has the values it was added
+with."""
+
+from sqlalchemy import case, select
+
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_state import BatteryState
+from src.database.model_battery_log import BatteryLog
+from src.database.model_issue import Issue
+
+
+def _current(state_column, battery_column):
+    """Returns the value of the state of the battery, or of the battery when
+    it has no state. A state may hold nulls, so COALESCE would not do."""
+
+    return case(
+        (BatteryState.battery_id.is_(None), battery_column),
+        else_=state_column,
+    ).label(battery_column.key)
+
+
+CURRENT_STATE_OF_CHARGE = _current(
+    BatteryState.state_of_charge, Battery.state_of_charge
+)
+CURRENT_VOLTAGE = _current(BatteryState.voltage, Battery.voltage)
+CURRENT_UPDATED_AT = _current(BatteryState.updated_at, Battery.updated_at)
+
+BATTERY_COLUMNS = (
+    Battery.battery_id,
+    CURRENT_STATE_OF_CHARGE,
+    Battery.capacity,
+    CURRENT_VOLTAGE,
+    Battery.battery_health,
+    Battery.created_at,
+    CURRENT_UPDATED_AT,
+)
+
+BATTERY_LOG_COLUMNS = (
+    BatteryLog.log_id,
+    BatteryLog.battery_id,
+    BatteryLog.state_of_charge,
+    BatteryLog.voltage,
+    BatteryLog.timestamp,
+)
+
+ISSUE_COLUMNS = (
+    Issue.issue_id,
+    Issue.battery_id,
+    Issue.issue_type,
+    Issue.issue_description,
+    Issue.occurrence_timestamp,
+)
+
+
+def with_states(statement):
+    """Joins the states of the batteries to a query or select statement of
+    BATTERY_COLUMNS."""
+
+    return statement.select_from(Battery).outerjoin(
+        BatteryState, BatteryState.battery_id == Battery.battery_id
+    )
+
+
+def battery_statement():
+    """Returns the select statement of the battery rows."""
+
+    return with_states(select(*BATTERY_COLUMNS))
+
+
+def select_batteries():
+    """Returns the query of the battery rows."""
+
+    return with_states(db.session.query(*BATTERY_COLUMNS))
+
+
+def select_battery(battery_id):
+    """Returns the row of the battery, or None if it does not exist."""
+
+    return select_batteries().filter(Battery.battery_id == battery_id).first()
+
+
+def battery_exists(battery_id):
+    """Returns True if the battery exists, read from the database."""
+
+    return (
+        db.session.scalar(
+            select(Battery.battery_id).where(Battery.battery_id == battery_id)
+        )
+        is not None
+    )
+
+
+def select_issues(battery_id=None):
+    """Returns the query of the issue rows of the battery, or of every
+    battery when no battery is given."""
+
+    query = db.session.query(*ISSUE_COLUMNS)
+    if battery_id is not None:
+        query = query.filter(Issue.battery_id == battery_id)
+    return query
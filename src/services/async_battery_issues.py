@@ -0,0 +1,141 @@
+"""This module handles the requests to the battery incidents service on the
+asyncio (ASGI) app. The routes and responses are those of
+`src.services.battery_issues`."""
+
+import logging
+
+from quart import Blueprint, request, jsonify
+from sqlalchemy import delete, select, update
+
+from src.database.async_database import async_session, fetch_page
+from src.database.model_issue import Issue
+from src.database.model_battery import Battery
+from src.database.read_models import ISSUE_COLUMNS
+from src.utils.async_validators import validate_input_async
+from src.utils.pagination import page_payload
+from src.utils.serializers import fleet_issue_to_dict, issue_to_dict
+
+from src.services.battery_issues import (
+    issue_cursor_key,
+    issue_listing_query,
+    missing_issue_message,
+    scoped_to_battery,
+)
+
+logger = logging.getLogger()
+
+async_battery_issues = Blueprint(
+    "async_battery_issues", __name__, url_prefix="/api/v1/batteries"
+)
+
+
+@async_battery_issues.get("/<uuid:battery_id>/issues")
+async def get_battery_issues(battery_id):
+    """Retrieve a page of the issues of a specific battery, ordered by
+    occurrence time. `all=true` returns every issue in one response."""
+
+    try:
+        statement, limit = issue_listing_query(
+            select(*ISSUE_COLUMNS).where(Issue.battery_id == battery_id),
+            request.args,
+        )
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    async with async_session() as session:
+        if await session.get(Battery, battery_id) is None:
+            return jsonify({"message": "Battery not found"}), 404
+        if request.args.get("all") == "true":
+            issues = (await session.execute(statement)).all()
+            return jsonify([issue_to_dict(issue) for issue in issues])
+        issues, next_cursor = await fetch_page(
+            session, statement, limit, issue_cursor_key
+        )
+
+    return jsonify(page_payload("issues", issues, next_cursor, issue_to_dict))
+
+
+@async_battery_issues.get("/issues")
+async def get_fleet_issues():
+    """Retrieve a page of the issues of every battery, ordered by
+    occurrence time."""
+
+    try:
+        statement, limit = issue_listing_query(
+            select(*ISSUE_COLUMNS), request.args
+        )
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    async with async_session() as session:
+        issues, next_cursor = await fetch_page(
+            session, statement, limit, issue_cursor_key
+        )
+
+    return jsonify(
+        page_payload("issues", issues, next_cursor, fleet_issue_to_dict)
+    )
+
+
+@async_battery_issues.post("/<uuid:battery_id>/issues")
+@validate_input_async(api="incidents")
+async def add_battery_issue(battery_id):
+    """Add a new issue associated with a specific battery."""
+
+    data = await request.get_json()
+    async with async_session() as session:
+        if await session.get(Battery, battery_id) is None:
+            return jsonify({"message": "Battery not found"}), 404
+        issue = Issue(
+            battery_id, data.get("issue_type"), data.get("issue_description")
+        )
+        session.add(issue)
+        await session.commit()
+
+    return (
+        jsonify({"message": "Issue added successfully", "id": issue.issue_id}),
+        201,
+    )
+
+
+@async_battery_issues.put("/<uuid:battery_id>/issues/<uuid:issue_id>")
+@validate_input_async(api="incidents")
+async def update_battery_issue(battery_id, issue_id):
+    """Update the details of a specific issue associated with a battery."""
+
+    data = await request.get_json()
+    async with async_session() as session:
+        result = await session.execute(
+            scoped_to_battery(update(Issue), battery_id, issue_id).values(
+                issue_type=data.get("issue_type"),
+                issue_description=data.get("issue_description"),
+            )
+        )
+        await session.commit()
+        if not result.rowcount:
+            battery = await session.get(Battery, battery_id)
+            message = missing_issue_message(
+                battery is not None, battery_id, issue_id
+            )
+            return jsonify({"message": message}), 404
+
+    return jsonify({"message": "Issue updated successfully"})
+
+
+@async_battery_issues.delete("/<uuid:battery_id>/issues/<uuid:issue_id>")
+async def delete_battery_issue(battery_id, issue_id):
+    """Remove a specific issue associated with a battery."""
+
+    async with async_session() as session:
+        result = await session.execute(
+            scoped_to_battery(delete(Issue), battery_id, issue_id)
+        )
+        await session.commit()
+        if not result.rowcount:
+            battery = await session.get(Battery, battery_id)
+            message = missing_issue_message(
+                battery is not None, battery_id, issue_id
+            )
+            return jsonify({"message": message}), 404
+
+    return jsonify({"message": "Issue deleted successfully"})
@@ -0,0 +1,205 @@
+"""This module handles the requests to the battery subscriber service on the
+asyncio (ASGI) app. The routes and responses are those of
+`src.services.battery_subscriber`."""
+
+import logging
+from datetime import datetime
+
+from quart import Blueprint, current_app, request, jsonify
+
+from src.database.async_database import async_session, fetch_page
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.database.read_models import battery_statement
+from src.utils.async_validators import validate_input_async
+from src.utils.pagination import page_payload
+from src.utils.serializers import battery_to_dict
+
+from src.config.app_config import HEALTH_CHECK_WINDOW
+from src.services.battery_health_check import (
+    evaluate_health,
+    exceed_count_statement,
+    get_policy,
+)
+from src.services.health_analytics import series_statement, split_series
+from src.services.battery_states import delete_state, upsert_states
+from src.services.battery_subscriber import (
+    battery_cursor_key,
+    listing_query,
+)
+
+logger = logging.getLogger()
+
+async_battery_subscriber = Blueprint(
+    "async_battery_subscriber", __name__, url_prefix="/api/v1"
+)
+
+
+@async_battery_subscriber.get("/batteries")
+async def get_all_batteries():
+    """Retrieve a page of batteries and their associated data.
+
+    Pages are ordered by creation time and read with the `cursor` of the
+    previous page. `all=true` returns every battery in one response."""
+
+    try:
+        statement, limit = listing_query(battery_statement(), request.args)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    async with async_session() as session:
+        if request.args.get("all") == "true":
+            batteries = (await session.execute(statement)).all()
+            return jsonify([battery_to_dict(battery) for battery in batteries])
+        batteries, next_cursor = await fetch_page(
+            session, statement, limit, battery_cursor_key
+        )
+
+    return jsonify(
+        page_payload("batteries", batteries, next_cursor, battery_to_dict)
+    )
+
+
+@async_battery_subscriber.get("/batteries/<uuid:battery_id>")
+async def get_battery_by_id(battery_id):
+    """Retrieve the data for a specific battery by its ID."""
+
+    async with async_session() as session:
+        battery = (
+            await session.execute(
+                battery_statement().where(Battery.battery_id == battery_id)
+            )
+        ).first()
+    if battery:
+        return jsonify(battery_to_dict(battery))
+    return jsonify({"message": "Battery not found"}), 404
+
+
+@async_battery_subscriber.post("/batteries")
+@validate_input_async(api="subscriber")
+async def add_battery():
+    """Add a new battery with its state of charge, capacity, and voltage."""
+
+    data = await request.get_json()
+    battery = Battery(
+        state_of_charge=data.get("state_of_charge"),
+        capacity=data.get("capacity"),
+        voltage=data.get("voltage"),
+        battery_health=data.get("battery_health"),
+    )
+    battery.created_at = datetime.utcnow()
+    log = BatteryLog(
+        battery_id=battery.battery_id,
+        state_of_charge=battery.state_of_charge,
+        voltage=battery.voltage,
+        timestamp=battery.created_at,
+    )
+    async with async_session() as session:
+        session.add_all([battery, log])
+        await session.flush()
+        await session.execute(
+            upsert_states(session.get_bind().dialect.name),
+            [
+                {
+                    "battery_id": battery.battery_id,
+                    "state_of_charge": battery.state_of_charge,
+                    "voltage": battery.voltage,
+                    "updated_at": battery.created_at,
+                    "checked_log_id": log.log_id,
+                }
+            ],
+        )
+        await session.commit()
+
+    return (
+        jsonify(
+            {
+                "message": "Battery added successfully!",
+                "battery_id": battery.battery_id,
+            }
+        ),
+        201,
+    )
+
+
+@async_battery_subscriber.put("/batteries/<uuid:battery_id>")
+@validate_input_async(api="subscriber")
+async def update_battery(battery_id):
+    """Updates battery's status of charge, health, and voltage."""
+
+    request_time = datetime.utcnow()
+    data = await request.get_json()
+    async with async_session() as session:
+        battery = await session.get(Battery, battery_id, with_for_update=True)
+        if battery is None:
+            return (
+                jsonify({"message": f"Battery '{battery_id}' not found"}),
+                404,
+            )
+
+        state_of_charge = data.get("state_of_charge")
+        voltage = data.get("voltage")
+        log = BatteryLog(
+            battery_id=battery_id,
+            state_of_charge=state_of_charge,
+            voltage=voltage,
+            timestamp=request_time,
+        )
+        session.add(log)
+        await session.flush()
+        since = request_time - HEALTH_CHECK_WINDOW
+        exceed_count = await session.scalar(
+            exceed_count_statement(battery_id, since)
+        )
+        new_breaches = 0
+        policy = get_policy(current_app.config["HEALTH_POLICY"])
+        if policy is not None:
+            series = split_series(
+                (
+                    await session.execute(
+                        series_statement([battery_id], since)
+                    )
+                ).all()
+            )
+            new_breaches = policy.new_breaches(
+                series,
+                {battery_id: [{"timestamp": request_time}]},
+                logged=True,
+            )[battery_id]
+        # the battery row is locked to serialize the health checks, but only
+        # written when the health changes.
+        battery.battery_health = evaluate_health(
+            battery.battery_health, [exceed_count], new_breaches
+        )
+        await session.execute(
+            upsert_states(session.get_bind().dialect.name),
+            [
+                {
+                    "battery_id": battery_id,
+                    "state_of_charge": state_of_charge,
+                    "voltage": voltage,
+                    "updated_at": request_time,
+                    "checked_log_id": log.log_id,
+                }
+            ],
+        )
+        await session.commit()
+
+    return jsonify(
+        {"message": "Battery updated successfully", "id": battery_id}
+    )
+
+
+@async_battery_subscriber.delete("/batteries/<uuid:battery_id>")
+async def delete_battery(battery_id):
+    """Remove a specific battery by its ID."""
+
+    async with async_session() as session:
+        battery = await session.get(Battery, battery_id)
+        if battery is None:
+            return jsonify({"message": "Battery not found"}), 404
+        await session.delete(battery)
+        await session.execute(delete_state(battery_id))
+        await session.commit()
+
+    return jsonify({"message": "Battery deleted successfully"})
@@ -0,0 +1,105 @@
+"""This module contains the read-through cache of single battery lookups.
+
+The serialized JSON of a battery is cached by its id for
+`GET /api/v1/batteries/<id>`; whether a battery exists is always read from
+the database. Routes that change a battery invalidate its entry once the
+change is committed, in the worker that made the change. The cache is off by
+default: with the in-process `lru` backend every worker holds its own cache,
+so a worker serves a battery changed through another worker until the entry
+expires. Use it with a single worker, or the shared Redis backend."""
+
+import logging
+import threading
+
+from flask import current_app
+
+from src.database.read_models import select_battery
+from src.utils.cache import LRUCacheBackend, RedisCacheBackend
+from src.utils.serializers import battery_to_dict
+
+logger = logging.getLogger()
+
+
+class BatteryCache:
+    """Caches the serialized batteries, configured per app by `init_app`."""
+
+    def __init__(self):
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Creates the backend set by the app's BATTERY_CACHE_* settings."""
+
+        backend = app.config.get("BATTERY_CACHE_BACKEND", "none")
+        ttl = app.config.get("BATTERY_CACHE_TTL", 30)
+        if backend == "lru":
+            self.backend = LRUCacheBackend(
+                max_size=app.config.get("BATTERY_CACHE_SIZE", 10000), ttl=ttl
+            )
+        elif backend == "redis":
+            try:
+                import redis  # pylint: disable=import-outside-toplevel
+            except ImportError as error:
+                raise RuntimeError(
+                    "The redis package is required for the redis cache."
+                ) from error
+            self.backend = RedisCacheBackend(
+                redis.Redis.from_url(app.config["REDIS_URL"]), ttl=ttl
+            )
+        elif backend == "none":
+            self.backend = None
+        else:
+            raise ValueError(f"Invalid battery cache backend '{backend}'.")
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+        app.extensions["battery_cache"] = self
+
+    def get_payload(self, battery_id):
+        """Returns the serialized JSON of the battery, read from the database
+        on a miss, or None if the battery does not exist."""
+
+        key = str(battery_id)
+        if self.backend is not None:
+            payload = self.backend.get(key)
+            with self._lock:
+                if payload is not None:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            if payload is not None:
+                return payload
+
+        battery = select_battery(battery_id)
+        if battery is None:
+            return None
+        payload = current_app.json.dumps(battery_to_dict(battery))
+        if self.backend is not None:
+            self.backend.set(key, payload)
+        return payload
+
+    def invalidate(self, *battery_ids):
+        """Removes the batteries from the cache."""
+
+        if self.backend is not None:
+            self.backend.delete(
+                *[str(battery_id) for battery_id in battery_ids]
+            )
+
+    def stats(self):
+        """Returns the counters of the cache."""
+
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "backend": self.backend.name if self.backend else "none",
+            "hits": hits,
+            "misses": misses,
+            "evictions": self.backend.evictions if self.backend else 0,
+            "size": self.backend.size() if self.backend else 0,
+        }
+
+
+battery_cache = BatteryCache()
@@ -1,31 +1,185 @@
 """This module checks the health condition for a battery."""
 
-from datetime import datetime, timedelta
+import abc
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func, or_, select
 
 from src.database.database import db
 from src.database.model_battery_log import BatteryLog
+from src.utils.metrics import timed
+from src.services.health_analytics import (
+    AnalyticsPolicy,
+    downgrade_health_by,
+)
+from src.services.health_engine import health_counter
 
-from src.config.app_config import BATTERY_HEALTH_ORDER
+from src.config.app_config import (
+    BATTERY_HEALTH_ORDER,
+    HEALTH_CHECK_WINDOW,
+    HEALTH_EXCEED_LIMIT,
+    STATE_OF_CHARGE_LOWER_LIMIT,
+    STATE_OF_CHARGE_UPPER_LIMIT,
+)
 
 
-class HealthCheck:
-    """Checks the battery's state of health."""
+def is_out_of_band(state_of_charge):
+    """Returns True if the state of charge is outside the healthy band."""
 
-    def __init__(self, battery_id, current_health, request_time):
-        self.battery_id = battery_id
-        self.request_time = request_time
-        self.current_health = current_health
+    return (
+        state_of_charge < STATE_OF_CHARGE_LOWER_LIMIT
+        or state_of_charge > STATE_OF_CHARGE_UPPER_LIMIT
+    )
 
-    def check_condition(self):
-        """Checks the state of charge for the battery and returns a state of health."""
 
-        # Get the state of charge values for the last 24 hours
-        yesterday = datetime.utcnow() - timedelta(days=1)
+def downgrade_health(current_health, exceed_count):
+    """Returns the health one level below the current one if the exceed count
+    is over the limit, otherwise the current health."""
+
+    if current_health not in BATTERY_HEALTH_ORDER[1:]:
+        return current_health
+    if exceed_count > HEALTH_EXCEED_LIMIT:
+        index = BATTERY_HEALTH_ORDER.index(current_health)
+        return BATTERY_HEALTH_ORDER[index - 1]
+    return current_health
+
+
+def evaluate_health(current_health, exceed_counts, new_breaches=0):
+    """Returns the health after a sequence of readings, given the exceed
+    count after each of them: one level down for each reading over the
+    exceed limit, then one level down for each analytics limit the readings
+    breached first."""
+
+    for exceed_count in exceed_counts:
+        current_health = downgrade_health(current_health, exceed_count)
+    return downgrade_health_by(current_health, new_breaches)
+
+
+def health_transitions(
+    healths, readings_by_battery, exceed_counter, since, policy, logged=False
+):
+    """Returns the {(old, new): [battery_id]} health transitions caused by
+    the readings, {battery_id: [rows]} in timestamp order, of the batteries
+    of {battery_id: health}. This is the health check of every write path.
+
+    `exceed_counter` is the `counter` of the health check engine, and
+    `logged` tells if the readings are in the logs already."""
+
+    breaches = {}
+    if policy is not None:
+        breaches = policy.breaches(readings_by_battery, since, logged)
+    transitions = {}
+    for battery_id, rows in readings_by_battery.items():
+        health = healths[battery_id]
+        new_health = evaluate_health(
+            health,
+            (exceed_counter(row) for row in rows),
+            breaches.get(battery_id, 0),
+        )
+        if new_health != health:
+            transitions.setdefault((health, new_health), []).append(battery_id)
+    return transitions
+
+
+def out_of_band_clause():
+    """Returns the SQL condition matching the out of band logs."""
+
+    return or_(
+        BatteryLog.state_of_charge < STATE_OF_CHARGE_LOWER_LIMIT,
+        BatteryLog.state_of_charge > STATE_OF_CHARGE_UPPER_LIMIT,
+    )
+
+
+def exceed_count_statement(battery_id, since):
+    """Returns the query counting the out of band logs of the battery since
+    the given time."""
+
+    out_of_band_count = func.count()  # pylint: disable=not-callable
+    return select(out_of_band_count.filter(out_of_band_clause())).where(
+        BatteryLog.battery_id == battery_id,
+        BatteryLog.timestamp >= since,
+    )
+
+
+def window_counter(exceed_counts, since):
+    """Returns a function that records a reading and returns the exceed count
+    of its battery after it, starting from {battery_id: exceed_count}."""
+
+    def count(row):
+        state_of_charge = row["state_of_charge"]
+        if (
+            row["timestamp"] >= since
+            and state_of_charge is not None
+            and is_out_of_band(state_of_charge)
+        ):
+            exceed_counts[row["battery_id"]] = (
+                exceed_counts.get(row["battery_id"], 0) + 1
+            )
+        return exceed_counts.get(row["battery_id"], 0)
+
+    return count
+
+
+class ExceedCountStrategy(abc.ABC):
+    """Base class for the ways of counting the out of band readings of a
+    battery within the health check window.
+
+    `count` is called after the new reading was added to the session, and
+    `counter` is called before a batch of readings is written."""
+
+    @abc.abstractmethod
+    def count(self, battery_id, state_of_charge, since, now):
+        """Returns the exceed count of the battery, including its new
+        reading."""
+
+    def counter(self, battery_ids, since, now):
+        """Returns a function that records a reading of the batch and returns
+        the exceed count of its battery after that reading."""
+
+        return window_counter(
+            self.exceed_counts(battery_ids, since, now), since
+        )
+
+    def exceed_counts(
+        self, battery_ids, since, now
+    ):  # pylint: disable=unused-argument
+        """Returns {battery_id: exceed_count} of the logs of the window."""
+
+        return self.count_many(battery_ids, since)
+
+    @staticmethod
+    def count_many(battery_ids, since):
+        """Returns {battery_id: exceed_count} for the given batteries, counted
+        in a single grouped query over the logs recorded since `since`."""
+
+        if not battery_ids:
+            return {}
+        rows = (
+            db.session.query(
+                BatteryLog.battery_id,
+                func.count(),  # pylint: disable=not-callable
+            )
+            .filter(
+                BatteryLog.battery_id.in_(list(battery_ids)),
+                BatteryLog.timestamp >= since,
+                out_of_band_clause(),
+            )
+            .group_by(BatteryLog.battery_id)
+            .all()
+        )
+        return dict(rows)
+
+
+class RowScanStrategy(ExceedCountStrategy):
+    """Reads every state of charge of the window and counts them in Python."""
+
+    def count(self, battery_id, state_of_charge, since, now):
         state_of_charge_values = (
             db.session.query(BatteryLog.state_of_charge)
             .filter(
-                BatteryLog.battery_id == self.battery_id,
-                BatteryLog.timestamp >= yesterday,
+                BatteryLog.battery_id == battery_id,
+                BatteryLog.timestamp >= since,
             )
             .all()
         )
@@ -33,12 +187,125 @@ class HealthCheck:
         # Count the number of times the state of charge exceeds the limits
         exceed_count = 0
         for value in state_of_charge_values:
-            if value.state_of_charge < 20 or value.state_of_charge > 80:
+            if is_out_of_band(value.state_of_charge):
                 exceed_count += 1
+        return exceed_count
+
+
+class SqlAggregateStrategy(ExceedCountStrategy):
+    """Counts the out of band logs of the window in the database, with a
+    single `COUNT(*) FILTER (WHERE ...)` query."""
+
+    def count(self, battery_id, state_of_charge, since, now):
+        return db.session.scalar(exceed_count_statement(battery_id, since))
+
+
+class IncrementalStrategy(ExceedCountStrategy):
+    """Keeps the count in the process wide rolling counter, see
+    `src.services.health_engine`."""
+
+    def count(self, battery_id, state_of_charge, since, now):
+        if state_of_charge is None:
+            return health_counter.exceed_count(battery_id, now)
+        return health_counter.observe(
+            battery_id, is_out_of_band(state_of_charge), now, now
+        )
+
+    def counter(self, battery_ids, since, now):
+        health_counter.load(battery_ids, now)
+
+        def observe(row):
+            return health_counter.observe(
+                row["battery_id"],
+                is_out_of_band(row["state_of_charge"]),
+                row["timestamp"],
+                now,
+            )
+
+        return observe
+
+    def exceed_counts(self, battery_ids, since, now):
+        health_counter.load(battery_ids, now)
+        return {
+            battery_id: health_counter.exceed_count(battery_id, now)
+            for battery_id in battery_ids
+        }
+
+
+HEALTH_CHECK_STRATEGIES = {
+    "scan": RowScanStrategy,
+    "aggregate": SqlAggregateStrategy,
+    "incremental": IncrementalStrategy,
+}
+
+
+def get_strategy(name=None):
+    """Returns the exceed count strategy with the given name, or the one set
+    by the app's HEALTH_CHECK_ENGINE configuration."""
 
-        # Update the health based on the exceed count
-        if self.current_health != "BAD" and exceed_count > 2:
-            index = BATTERY_HEALTH_ORDER.index(self.current_health)
-            self.current_health = BATTERY_HEALTH_ORDER[index - 1]
+    if name is None:
+        name = current_app.config.get("HEALTH_CHECK_ENGINE") or "scan"
+    if name not in HEALTH_CHECK_STRATEGIES:
+        raise ValueError(f"Invalid health check engine '{name}'.")
+    return HEALTH_CHECK_STRATEGIES[name]()
+
+
+HEALTH_POLICIES = {"exceed": None, "analytics": AnalyticsPolicy}
+
+
+def get_policy(name=None):
+    """Returns the health policy with the given name, or the one set by the
+    app's HEALTH_POLICY configuration. The default `exceed` policy is None,
+    it only compares the exceed count with the limit."""
+
+    if name is None:
+        name = current_app.config.get("HEALTH_POLICY") or "exceed"
+    if name not in HEALTH_POLICIES:
+        raise ValueError(f"Invalid health policy '{name}'.")
+    policy = HEALTH_POLICIES[name]
+    return policy() if policy else None
+
+
+class HealthCheck:
+    """Checks the battery's state of health."""
+
+    def __init__(
+        self,
+        battery_id,
+        current_health,
+        request_time,
+        state_of_charge=None,
+        strategy=None,
+        policy=None,
+    ):
+        self.battery_id = battery_id
+        self.request_time = request_time
+        self.current_health = current_health
+        self.state_of_charge = state_of_charge
+        self.strategy = strategy or get_strategy()
+        self.policy = policy if policy is not None else get_policy()
+
+    @timed("check_condition")
+    def check_condition(self):
+        """Checks the state of charge for the battery and returns a state of health."""
+
+        # Count the readings out of the limits for the last 24 hours
+        yesterday = datetime.utcnow() - HEALTH_CHECK_WINDOW
+        exceed_count = self.strategy.count(
+            self.battery_id, self.state_of_charge, yesterday, self.request_time
+        )
+
+        # Update the health based on the exceed count and the policy; the
+        # reading was added to the session before the check.
+        new_breaches = 0
+        if self.policy is not None:
+            new_breaches = self.policy.breaches(
+                {self.battery_id: [{"timestamp": self.request_time}]},
+                yesterday,
+                logged=True,
+            )[self.battery_id]
+        self.current_health = evaluate_health(
+            self.current_health, [exceed_count], new_breaches
+        )
 
         return self.current_health
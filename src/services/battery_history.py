@@ -0,0 +1,243 @@
+"""This module handles the requests to the battery logs history service."""
+
+import logging
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify
+from sqlalchemy import func, select, tuple_
+
+from src.database.database import db
+from src.database.model_battery_log import BatteryLog
+from src.database.read_models import battery_exists
+from src.utils.input_validators import parse_time_range
+from src.utils.pagination import decode_cursor, parse_limit, split_page
+from src.utils.serializers import battery_log_to_dict
+from src.utils.time_buckets import (
+    bucket_expression,
+    bucket_start,
+    validate_bucket,
+)
+
+from src.config.app_config import HISTORY_DEFAULT_RANGE
+from src.services.log_archive import (
+    archived_buckets,
+    archived_logs,
+    archived_until,
+)
+from src.services.log_rollups import (
+    ROLLUP_BUCKETS,
+    battery_rollups,
+    fleet_rollups,
+    raw_logs_cutoff,
+)
+
+logger = logging.getLogger()
+
+battery_history = Blueprint(
+    "battery_history", __name__, url_prefix="/api/v1/batteries"
+)
+
+
+def _split_range(start, end):
+    """Returns the parts of the range read from the archive and from the
+    database, either None when empty. The archive ends on a day, so a bucket
+    is never split between them."""
+
+    until = archived_until()
+    if until is None or until <= start:
+        return None, (start, end)
+    if until >= end:
+        return (start, end), None
+    return (start, until), (until, end)
+
+
+def _aggregated_logs(battery_id, bucket, start, end):
+    """Returns the logs of the range aggregated per bucket, from the archive
+    and in SQL. Raises ValueError if the bucket is unknown."""
+
+    validate_bucket(bucket)
+    archived, recent = _split_range(start, end)
+    buckets = []
+    if archived:
+        buckets += archived_buckets(battery_id, bucket, *archived)
+    if recent:
+        buckets += _sql_buckets(battery_id, bucket, *recent)
+    return buckets
+
+
+def _sql_buckets(battery_id, bucket, start, end):
+    """Returns the logs of the range aggregated per bucket, in SQL."""
+
+    dialect_name = db.session.get_bind().dialect.name
+    bucket_column = bucket_expression(
+        BatteryLog.timestamp, bucket, dialect_name
+    ).label("bucket_start")
+    statement = (
+        select(
+            bucket_column,
+            func.count().label("count"),  # pylint: disable=not-callable
+            func.min(BatteryLog.state_of_charge),
+            func.max(BatteryLog.state_of_charge),
+            func.avg(BatteryLog.state_of_charge),
+            func.min(BatteryLog.voltage),
+            func.max(BatteryLog.voltage),
+            func.avg(BatteryLog.voltage),
+        )
+        .where(
+            BatteryLog.battery_id == battery_id,
+            BatteryLog.timestamp >= start,
+            BatteryLog.timestamp < end,
+        )
+        .group_by(bucket_column)
+        .order_by(bucket_column)
+    )
+    return [
+        {
+            "start": bucket_start(row[0]),
+            "count": row[1],
+            "state_of_charge": {"min": row[2], "max": row[3], "avg": row[4]},
+            "voltage": {"min": row[5], "max": row[6], "avg": row[7]},
+        }
+        for row in db.session.execute(statement)
+    ]
+
+
+def _raw_logs(battery_id, start, end, args):
+    """Returns a page of the logs of the range and the next page cursor,
+    reading the archive first. Raises ValueError if the paging arguments are
+    not valid."""
+
+    limit = parse_limit(args.get("limit"))
+    after = None
+    cursor = args.get("cursor")
+    if cursor:
+        timestamp, log_id = decode_cursor(cursor, 2)
+        after = (datetime.fromisoformat(timestamp), int(log_id))
+
+    archived, recent = _split_range(start, end)
+    rows = []
+    if archived:
+        rows = archived_logs(battery_id, *archived, after, limit + 1)
+    if recent and len(rows) <= limit:
+        query = db.session.query(
+            BatteryLog.log_id,
+            BatteryLog.timestamp,
+            BatteryLog.state_of_charge,
+            BatteryLog.voltage,
+        ).filter(
+            BatteryLog.battery_id == battery_id,
+            BatteryLog.timestamp >= recent[0],
+            BatteryLog.timestamp < recent[1],
+        )
+        if after:
+            query = query.filter(
+                tuple_(BatteryLog.timestamp, BatteryLog.log_id)
+                > tuple_(*after)
+            )
+        rows += (
+            query.order_by(BatteryLog.timestamp, BatteryLog.log_id)
+            .limit(limit + 1 - len(rows))
+            .all()
+        )
+    rows, next_cursor = split_page(
+        rows,
+        limit,
+        key=lambda row: (row.timestamp.isoformat(), row.log_id),
+    )
+    return [battery_log_to_dict(row) for row in rows], next_cursor
+
+
+def _time_range(args):
+    """Returns the requested time range, the last day by default.
+    Raises ValueError if the range is not valid."""
+
+    start, end = parse_time_range(args)
+    end = end or datetime.utcnow()
+    start = start or end - HISTORY_DEFAULT_RANGE
+    return start, end
+
+
+def _rollups_until(args, bucket, start, end):
+    """Returns the end of the part of the range read from the rollups, or
+    None when it is read from the raw logs: the whole range when requested
+    with `source=rollup`, the part before the raw logs retention when the
+    range starts before it. Raises ValueError if the source is not valid."""
+
+    source = args.get("source")
+    if source is None:
+        cutoff = raw_logs_cutoff()
+        if bucket in ROLLUP_BUCKETS and cutoff and start < cutoff:
+            return min(cutoff, end)
+        return None
+    if source not in ("raw", "rollup"):
+        raise ValueError(f"Invalid source '{source}'")
+    return end if source == "rollup" else None
+
+
+@battery_history.get("/<uuid:battery_id>/logs")
+def get_battery_logs(battery_id):
+    """Retrieve the logs of a battery within a time range (`from`, `to`),
+    either as raw pages or aggregated per `bucket` (1m, 1h or 1d)."""
+
+    if not battery_exists(battery_id):
+        return jsonify({"message": f"Battery '{battery_id}' not found"}), 404
+
+    bucket = request.args.get("bucket")
+    try:
+        start, end = _time_range(request.args)
+
+        if bucket:
+            # the rollups are written by the compaction job, so the logs
+            # after the retention cutoff are aggregated from the raw logs.
+            rollups_until = _rollups_until(request.args, bucket, start, end)
+            buckets = []
+            if rollups_until:
+                buckets += battery_rollups(
+                    battery_id, bucket, start, rollups_until
+                )
+            if not rollups_until or rollups_until < end:
+                buckets += _aggregated_logs(
+                    battery_id, bucket, rollups_until or start, end
+                )
+            source = "rollup" if rollups_until else "raw"
+            return jsonify(
+                {
+                    "battery_id": battery_id,
+                    "from": start,
+                    "to": end,
+                    "bucket": bucket,
+                    "source": source,
+                    "buckets": buckets,
+                }
+            )
+
+        logs, next_cursor = _raw_logs(battery_id, start, end, request.args)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    return jsonify(
+        {
+            "battery_id": battery_id,
+            "from": start,
+            "to": end,
+            "logs": logs,
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@battery_history.get("/rollups")
+def get_fleet_rollups():
+    """Retrieve the rollups of the whole fleet merged per `bucket` (1h or 1d)
+    within a time range (`from`, `to`)."""
+
+    try:
+        start, end = _time_range(request.args)
+        bucket = request.args.get("bucket", "1h")
+        buckets = fleet_rollups(bucket, start, end)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    return jsonify(
+        {"from": start, "to": end, "bucket": bucket, "buckets": buckets}
+    )
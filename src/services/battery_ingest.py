@@ -0,0 +1,295 @@
+"""This module handles bulk ingestion of battery telemetry readings."""
+
+import uuid
+import logging
+import functools
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.database.read_models import select_batteries
+from src.utils.brokers import QueueFullError
+from src.utils.input_validators import (
+    parse_timestamp,
+    validate_reading_data,
+    validate_update_reading_data,
+)
+from src.utils.schemas import validate_items
+
+from src.config.app_config import HEALTH_CHECK_WINDOW, INGEST_MAX_BATCH_SIZE
+from src.services.battery_health_check import (
+    get_policy,
+    get_strategy,
+    health_transitions,
+)
+from src.services.battery_cache import battery_cache
+from src.services.battery_states import save_states
+from src.services.health_engine import health_counter
+from src.services.ingest_pipeline import IngestPipeline
+from src.services.reading_coalescer import reading_coalescer
+from src.services.issue_rules import raise_issues
+
+logger = logging.getLogger()
+
+battery_ingest = Blueprint(
+    "battery_ingest", __name__, url_prefix="/api/v1/batteries"
+)
+
+
+def _validate_readings(readings, request_time, results, validator):
+    """Validates the readings with the validator and returns the valid ones
+    as log rows, paired with their index in the batch. Errors are recorded in
+    `results`."""
+
+    errors = dict(validate_items(validator, readings))
+    for index, error in errors.items():
+        results[index] = {"index": index, "status": "error", "error": error}
+
+    rows = []
+    battery_ids = {}
+    for index, data in enumerate(readings):
+        if index in errors:
+            continue
+        # the readings of a batch mostly share a few batteries.
+        battery_id = data["battery_id"]
+        if battery_id not in battery_ids:
+            battery_ids[battery_id] = uuid.UUID(str(battery_id))
+        timestamp = data.get("timestamp")
+        rows.append(
+            (
+                index,
+                {
+                    "battery_id": battery_ids[battery_id],
+                    "state_of_charge": data.get("state_of_charge"),
+                    "voltage": data.get("voltage"),
+                    "timestamp": parse_timestamp(timestamp)
+                    if timestamp is not None
+                    else request_time,
+                },
+            )
+        )
+    return rows
+
+
+def _battery_states(readings_by_battery, now, log_ids):
+    """Returns the last state of every battery of the readings, with the id
+    of its last log written, from the (battery_id, log_id) rows."""
+
+    checked_log_ids = {}
+    for battery_id, log_id in log_ids:
+        checked_log_ids[battery_id] = max(
+            log_id, checked_log_ids.get(battery_id, log_id)
+        )
+    return [
+        {
+            "battery_id": battery_id,
+            "state_of_charge": rows[-1]["state_of_charge"],
+            "voltage": rows[-1]["voltage"],
+            "updated_at": now,
+            "checked_log_id": checked_log_ids.get(battery_id),
+        }
+        for battery_id, rows in readings_by_battery.items()
+    ]
+
+
+def _insert_logs(logs):
+    """Inserts the logs with one statement. Returns their (battery_id,
+    log_id) rows."""
+
+    if not logs:
+        return []
+    return db.session.execute(
+        insert(BatteryLog).returning(BatteryLog.battery_id, BatteryLog.log_id),
+        logs,
+    ).all()
+
+
+def ingest_readings(
+    readings, request_time=None, validator=validate_reading_data
+):
+    """Validates and stores a batch of readings in a single transaction.
+
+    The readings kept by the coalescing are logged with one multi-row insert
+    and the states of the affected batteries written with one upsert of
+    their latest reading; a battery row is only updated when its health
+    changes. Returns a list with one result per reading, in the order they
+    were given. The readings of battery updates, checked by
+    `validate_update_reading_data`, may leave out a value."""
+
+    request_time = request_time or datetime.utcnow()
+    results = [
+        {"index": index, "status": "ok"} for index in range(len(readings))
+    ]
+
+    # validate all the readings before touching the database.
+    rows = _validate_readings(readings, request_time, results, validator)
+
+    battery_ids = {row["battery_id"] for _, row in rows}
+    batteries = {}
+    if battery_ids:
+        batteries = {
+            battery.battery_id: battery
+            for battery in select_batteries().filter(
+                Battery.battery_id.in_(battery_ids)
+            )
+        }
+
+    readings_by_battery = {}
+    for index, row in rows:
+        if row["battery_id"] not in batteries:
+            results[index] = {
+                "index": index,
+                "status": "error",
+                "error": f"Battery '{row['battery_id']}' not found",
+            }
+            continue
+        readings_by_battery.setdefault(row["battery_id"], []).append(row)
+
+    if not readings_by_battery:
+        return results
+
+    for battery_rows in readings_by_battery.values():
+        battery_rows.sort(key=lambda row: row["timestamp"])
+
+    # check the health before the batch is logged, the batch itself is
+    # counted while the readings are applied.
+    since = request_time - HEALTH_CHECK_WINDOW
+    transitions = health_transitions(
+        {
+            battery_id: batteries[battery_id].battery_health
+            for battery_id in readings_by_battery
+        },
+        readings_by_battery,
+        get_strategy().counter(list(readings_by_battery), since, request_time),
+        since,
+        get_policy(),
+    )
+
+    logs = []
+    for battery_id, battery_rows in readings_by_battery.items():
+        logs += reading_coalescer.coalesce(battery_id, battery_rows)
+
+    try:
+        save_states(
+            _battery_states(
+                readings_by_battery, request_time, _insert_logs(logs)
+            ),
+            transitions,
+        )
+        raise_issues(
+            readings_by_battery,
+            {
+                battery_id: batteries[battery_id].voltage
+                for battery_id in readings_by_battery
+            },
+        )
+        db.session.commit()
+    except SQLAlchemyError:
+        # the readings were not logged, they must neither be coalesced with
+        # nor counted again when retried.
+        reading_coalescer.forget(*readings_by_battery)
+        health_counter.forget(*readings_by_battery)
+        raise
+    db.session.close()
+    battery_cache.invalidate(*readings_by_battery)
+
+    return results
+
+
+# the queue holds the readings of the battery updates too.
+ingest_pipeline = IngestPipeline(
+    functools.partial(ingest_readings, validator=validate_update_reading_data)
+)
+
+
+def queue_readings(
+    readings, request_time=None, validator=validate_reading_data
+):
+    """Validates a batch of readings and queues the valid ones, stamped with
+    the request time when they have no timestamp. Returns a list with one
+    result per reading. Raises QueueFullError if the queue has no room."""
+
+    request_time = request_time or datetime.utcnow()
+    results = []
+    queued = []
+    for index, data in enumerate(readings):
+        error = validator(data)
+        if error:
+            results.append({"index": index, "status": "error", "error": error})
+            continue
+        results.append({"index": index, "status": "queued"})
+        queued.append(
+            {
+                "battery_id": str(data["battery_id"]),
+                "state_of_charge": data.get("state_of_charge"),
+                "voltage": data.get("voltage"),
+                "timestamp": data.get("timestamp") or request_time.isoformat(),
+            }
+        )
+    if queued:
+        ingest_pipeline.submit(queued)
+    return results
+
+
+def queue_full_response(error):
+    """Returns the response asking the client to retry later."""
+
+    response = jsonify({"error": str(error)})
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
+
+@battery_ingest.post("/readings")
+def add_battery_readings():
+    """Store a batch of readings for one or more batteries."""
+
+    readings = request.get_json()
+    if not isinstance(readings, list) or not readings:
+        return jsonify({"error": "Expected a non-empty list of readings"}), 400
+    if len(readings) > INGEST_MAX_BATCH_SIZE:
+        return (
+            jsonify(
+                {
+                    "error": f"Batch size {len(readings)} exceeds the limit "
+                    f"of {INGEST_MAX_BATCH_SIZE} readings"
+                }
+            ),
+            400,
+        )
+
+    if ingest_pipeline.enabled:
+        try:
+            results = queue_readings(readings)
+        except QueueFullError as error:
+            return queue_full_response(error)
+        queued = sum(1 for result in results if result["status"] == "queued")
+        return (
+            jsonify(
+                {
+                    "message": "Readings queued",
+                    "accepted": queued,
+                    "rejected": len(results) - queued,
+                    "results": results,
+                }
+            ),
+            202,
+        )
+
+    results = ingest_readings(readings)
+    accepted = sum(1 for result in results if result["status"] == "ok")
+    logger.info("Ingested %s of %s readings", accepted, len(results))
+
+    return jsonify(
+        {
+            "message": "Readings processed",
+            "accepted": accepted,
+            "rejected": len(results) - accepted,
+            "results": results,
+        }
+    )
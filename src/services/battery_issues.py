@@ -1,13 +1,32 @@
 """This module handles all the requests to battery incidents service."""
 
+import uuid
 import logging
+from datetime import datetime
 
 from flask import Blueprint, request, jsonify
+from sqlalchemy import delete, insert, select, tuple_, update
 
 from src.database.database import db
 from src.database.model_issue import Issue
 from src.database.model_battery import Battery
-from src.utils.input_validators import validate_input
+from src.database.read_models import battery_exists, select_issues
+from src.utils.input_validators import (
+    parse_time_range,
+    parse_timestamp,
+    validate_bulk_issue_data,
+    validate_input,
+)
+from src.utils.schemas import validate_items
+from src.utils.pagination import (
+    decode_cursor,
+    page_payload,
+    paginate,
+    parse_limit,
+)
+from src.utils.serializers import fleet_issue_to_dict, issue_to_dict
+
+from src.config.app_config import ISSUE_MAX_BATCH_SIZE
 
 logger = logging.getLogger()
 
@@ -16,25 +35,77 @@ battery_issues = Blueprint(
 )
 
 
+def issue_listing_query(query, args):
+    """Applies the filters (`issue_type`, `from`, `to`) and the cursor of the
+    request to the issue listing query. Returns the ordered query and the
+    page size. Raises ValueError if the arguments are not valid."""
+
+    issue_type = args.get("issue_type")
+    if issue_type is not None:
+        query = query.filter(Issue.issue_type == issue_type)
+
+    start, end = parse_time_range(args)
+    if start is not None:
+        query = query.filter(Issue.occurrence_timestamp >= start)
+    if end is not None:
+        query = query.filter(Issue.occurrence_timestamp < end)
+
+    limit = parse_limit(args.get("limit"))
+    cursor = args.get("cursor")
+    if cursor:
+        occurrence_timestamp, issue_id = decode_cursor(cursor, 2)
+        query = query.filter(
+            tuple_(Issue.occurrence_timestamp, Issue.issue_id)
+            > tuple_(
+                datetime.fromisoformat(occurrence_timestamp),
+                uuid.UUID(issue_id),
+            )
+        )
+    return query.order_by(Issue.occurrence_timestamp, Issue.issue_id), limit
+
+
+def issue_cursor_key(issue):
+    """Returns the sort key values of an issue row."""
+
+    return issue.occurrence_timestamp.isoformat(), issue.issue_id
+
+
 @battery_issues.get("/<uuid:battery_id>/issues")
 def get_battery_issues(battery_id):
-    """Retrieve a list of all issues associated with a specific battery."""
-
-    battery = Battery.query.get(battery_id)
-    if battery:
-        issues = battery.issues
-        issue_list = []
-        for issue in issues:
-            issue_list.append(
-                {
-                    "id": issue.issue_id,
-                    "issue_type": issue.issue_type,
-                    "issue_description": issue.issue_description,
-                    "occurrence_timestamp": issue.occurrence_timestamp,
-                }
-            )
-        return jsonify(issue_list)
-    return jsonify({"message": "Battery not found"}), 404
+    """Retrieve a page of the issues of a specific battery, ordered by
+    occurrence time. `all=true` returns every issue in one response."""
+
+    if not battery_exists(battery_id):
+        return jsonify({"message": "Battery not found"}), 404
+
+    try:
+        query, limit = issue_listing_query(
+            select_issues(battery_id), request.args
+        )
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    if request.args.get("all") == "true":
+        return jsonify([issue_to_dict(issue) for issue in query])
+
+    issues, next_cursor = paginate(query, limit, key=issue_cursor_key)
+    return jsonify(page_payload("issues", issues, next_cursor, issue_to_dict))
+
+
+@battery_issues.get("/issues")
+def get_fleet_issues():
+    """Retrieve a page of the issues of every battery, ordered by
+    occurrence time."""
+
+    try:
+        query, limit = issue_listing_query(select_issues(), request.args)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    issues, next_cursor = paginate(query, limit, key=issue_cursor_key)
+    return jsonify(
+        page_payload("issues", issues, next_cursor, fleet_issue_to_dict)
+    )
 
 
 @battery_issues.post("/<uuid:battery_id>/issues")
@@ -42,15 +113,14 @@ def get_battery_issues(battery_id):
 def add_battery_issue(battery_id):
     """Add a new issue associated with a specific battery."""
 
-    battery = Battery.query.get(battery_id)
-    if battery:
+    if battery_exists(battery_id):
         data = request.json
         issue_type = data.get("issue_type")
         issue_description = data.get("issue_description")
 
         issue = Issue(battery_id, issue_type, issue_description)
         issue_id = issue.issue_id
-        battery.issues.append(issue)
+        db.session.add(issue)
         db.session.commit()
         db.session.close()
 
@@ -61,38 +131,150 @@ def add_battery_issue(battery_id):
     return jsonify({"message": "Battery not found"}), 404
 
 
+def add_issues(issues, request_time=None):
+    """Validates and stores a batch of issues of any batteries with a single
+    insert. Returns a list with one result per issue, in the order they were
+    given, holding the id of each stored issue."""
+
+    request_time = request_time or datetime.utcnow()
+    results = []
+    rows = []
+    errors = dict(validate_items(validate_bulk_issue_data, issues))
+    for index, data in enumerate(issues):
+        if index in errors:
+            results.append(
+                {"index": index, "status": "error", "error": errors[index]}
+            )
+            continue
+        occurrence_timestamp = data.get("occurrence_timestamp")
+        rows.append(
+            {
+                "issue_id": uuid.uuid4(),
+                "battery_id": uuid.UUID(str(data["battery_id"])),
+                "issue_type": data["issue_type"],
+                "issue_description": data["issue_description"],
+                "occurrence_timestamp": parse_timestamp(occurrence_timestamp)
+                if occurrence_timestamp is not None
+                else request_time,
+            }
+        )
+        results.append({"index": index, "status": "ok"})
+
+    battery_ids = {row["battery_id"] for row in rows}
+    existing = set(
+        db.session.scalars(
+            select(Battery.battery_id).where(
+                Battery.battery_id.in_(battery_ids)
+            )
+        )
+        if battery_ids
+        else ()
+    )
+
+    stored = []
+    valid = (result for result in results if result["status"] == "ok")
+    for result, row in zip(valid, rows):
+        if row["battery_id"] in existing:
+            result["id"] = row["issue_id"]
+            stored.append(row)
+        else:
+            result.update(
+                status="error",
+                error=f"Battery '{row['battery_id']}' not found",
+            )
+
+    if stored:
+        db.session.execute(insert(Issue), stored)
+        db.session.commit()
+    db.session.close()
+    return results
+
+
+@battery_issues.post("/issues")
+def add_issues_in_bulk():
+    """Add a batch of issues for one or more batteries."""
+
+    issues = request.get_json()
+    if not isinstance(issues, list) or not issues:
+        return jsonify({"error": "Expected a non-empty list of issues"}), 400
+    if len(issues) > ISSUE_MAX_BATCH_SIZE:
+        return (
+            jsonify(
+                {
+                    "error": f"Batch size {len(issues)} exceeds the limit "
+                    f"of {ISSUE_MAX_BATCH_SIZE} issues"
+                }
+            ),
+            400,
+        )
+
+    results = add_issues(issues)
+    accepted = sum(1 for result in results if result["status"] == "ok")
+    logger.info("Added %s of %s issues", accepted, len(results))
+
+    return jsonify(
+        {
+            "message": "Issues processed",
+            "accepted": accepted,
+            "rejected": len(results) - accepted,
+            "results": results,
+        }
+    )
+
+
+def missing_issue_message(battery_found, battery_id, issue_id):
+    """Returns the message of a mutation that matched no issue, telling a
+    missing battery from a missing issue."""
+
+    if battery_found:
+        return f"Issue {issue_id} not found"
+    return f"Battery {battery_id} not found"
+
+
+def scoped_to_battery(statement, battery_id, issue_id):
+    """Restricts an issue UPDATE or DELETE to the issue of the battery."""
+
+    return statement.where(
+        Issue.issue_id == issue_id, Issue.battery_id == battery_id
+    ).execution_options(synchronize_session=False)
+
+
 @battery_issues.put("/<uuid:battery_id>/issues/<uuid:issue_id>")
 @validate_input(api="incidents")
 def update_battery_issue(battery_id, issue_id):
     """Update the details of a specific issue associated with a battery."""
 
-    battery = Battery.query.get(battery_id)
-    if battery:
-        issue = Issue.query.get(issue_id)
-        if issue:
-            data = request.json
-            issue.issue_type = data.get("issue_type")
-            issue.issue_description = data.get("issue_description")
-            db.session.commit()
-            db.session.close()
+    data = request.json
+    result = db.session.execute(
+        scoped_to_battery(update(Issue), battery_id, issue_id).values(
+            issue_type=data.get("issue_type"),
+            issue_description=data.get("issue_description"),
+        )
+    )
+    db.session.commit()
+    db.session.close()
 
-            return jsonify({"message": "Issue updated successfully"})
-        return jsonify({"message": f"Issue {issue_id} not found"}), 404
-    return jsonify({"message": f"Battery {battery_id} not found"}), 404
+    if not result.rowcount:
+        message = missing_issue_message(
+            battery_exists(battery_id), battery_id, issue_id
+        )
+        return jsonify({"message": message}), 404
+    return jsonify({"message": "Issue updated successfully"})
 
 
 @battery_issues.delete("/<uuid:battery_id>/issues/<uuid:issue_id>")
 def delete_battery_issue(battery_id, issue_id):
     """Remove a specific issue associated with a battery."""
 
-    battery = Battery.query.get(battery_id)
-    if battery:
-        issue = Issue.query.get(issue_id)
-        if issue:
-            battery.issues.remove(issue)
-            db.session.commit()
-            db.session.close()
-
-            return jsonify({"message": "Issue deleted successfully"})
-        return jsonify({"message": f"Issue {issue_id} not found"}), 404
-    return jsonify({"message": f"Battery {battery_id} not found"}), 404
+    result = db.session.execute(
+        scoped_to_battery(delete(Issue), battery_id, issue_id)
+    )
+    db.session.commit()
+    db.session.close()
+
+    if not result.rowcount:
+        message = missing_issue_message(
+            battery_exists(battery_id), battery_id, issue_id
+        )
+        return jsonify({"message": message}), 404
+    return jsonify({"message": "Issue deleted successfully"})
@@ -0,0 +1,75 @@
+"""This module writes the last known state of the batteries.
+
+Telemetry updates store the charge, voltage and time of the last reading, and
+the id of the last log they checked, in `battery_states` with one upsert, and
+only write the `batteries` row when the health of a battery changes, which
+happens at most a few times in its life. The metadata reads of the listing
+then no longer contend with the updates."""
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_state import BatteryState
+
+UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+GREATEST = {"postgresql": func.greatest, "sqlite": func.max}
+STATE_COLUMNS = ("state_of_charge", "voltage", "updated_at")
+
+
+def upsert_states(dialect_name):
+    """Returns the statement inserting the states given as parameters, or
+    replacing the states of the same batteries. The checked log id only
+    moves forward, the updates of a battery may commit out of order."""
+
+    if dialect_name not in UPSERTS:
+        raise ValueError(
+            f"Battery states are not supported on '{dialect_name}'."
+        )
+    statement = UPSERTS[dialect_name](BatteryState)
+    return statement.on_conflict_do_update(
+        index_elements=[BatteryState.battery_id],
+        set_={
+            **{column: statement.excluded[column] for column in STATE_COLUMNS},
+            "checked_log_id": GREATEST[dialect_name](
+                func.coalesce(BatteryState.checked_log_id, 0),
+                func.coalesce(statement.excluded.checked_log_id, 0),
+            ),
+        },
+    )
+
+
+def health_updates(transitions):
+    """Yields the statements applying the {(old, new): [battery_id]} health
+    transitions, each guarded by the old health."""
+
+    for (health, new_health), battery_ids in transitions.items():
+        yield (
+            update(Battery)
+            .where(
+                Battery.battery_id.in_(battery_ids),
+                Battery.battery_health == health,
+            )
+            .values(battery_health=new_health)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def save_states(states, transitions=None):
+    """Stores the states, dicts of the battery_id, STATE_COLUMNS and the
+    checked_log_id, and the health transitions in the session. The caller
+    commits."""
+
+    if states:
+        db.session.execute(
+            upsert_states(db.session.get_bind().dialect.name), states
+        )
+    for statement in health_updates(transitions or {}):
+        db.session.execute(statement)
+
+
+def delete_state(battery_id):
+    """Returns the statement deleting the state of the battery."""
+
+    return delete(BatteryState).where(BatteryState.battery_id == battery_id)
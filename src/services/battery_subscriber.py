@@ -1,16 +1,49 @@
 """This module handles all the requests to battery subscriber service."""
 
+import math
+import uuid
 import logging
 from datetime import datetime
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy import tuple_
+from sqlalchemy.exc import SQLAlchemyError
 
 from src.database.database import db
 from src.database.model_battery import Battery
 from src.database.model_battery_log import BatteryLog
-from src.utils.input_validators import validate_input
+from src.database.model_battery_state import BatteryState
+from src.database.read_models import (
+    battery_exists,
+    select_batteries,
+    select_battery,
+)
+from src.utils.input_validators import (
+    validate_input,
+    validate_update_reading_data,
+)
+from src.utils.brokers import QueueFullError
+from src.utils.pagination import (
+    decode_cursor,
+    page_payload,
+    paginate,
+    parse_limit,
+)
+from src.utils.serializers import battery_to_dict
+
+from src.config.app_config import BATTERY_HEALTH_ORDER
 
 from src.services.battery_health_check import HealthCheck
+from src.services.health_engine import health_counter
+from src.services.issue_rules import raise_issues
+from src.services.reading_coalescer import reading_coalescer
+from src.services.battery_cache import battery_cache
+from src.services.battery_states import delete_state, save_states
+from src.services.battery_ingest import (
+    ingest_pipeline,
+    queue_full_response,
+    queue_readings,
+)
 
 logger = logging.getLogger()
 
@@ -19,44 +52,105 @@ battery_subscriber = Blueprint(
 )
 
 
+def _parse_state_of_charge(args, name):
+    """Returns the state of charge of the request parameter, or None.
+    Raises ValueError if it is not a finite number."""
+
+    value = args.get(name)
+    if value is None:
+        return None
+    error = f"Invalid {name.replace('_', ' ')} '{value}'"
+    try:
+        state_of_charge = float(value)
+    except ValueError as exception:
+        raise ValueError(error) from exception
+    if not math.isfinite(state_of_charge):
+        raise ValueError(error)
+    return state_of_charge
+
+
+def filter_batteries(query, args):
+    """Applies the battery listing filters of the request to the query.
+    Raises ValueError if a filter is not valid."""
+
+    battery_health = args.get("battery_health")
+    if battery_health is not None:
+        if battery_health not in BATTERY_HEALTH_ORDER:
+            raise ValueError("Invalid 'value' for battery health")
+        query = query.filter(Battery.battery_health == battery_health)
+
+    # the state of charge range is checked on the states, which every battery
+    # has from the time it is added, while the listing walks its creation
+    # time index; the states are not indexed on it, see BatteryState.
+    min_state_of_charge = _parse_state_of_charge(args, "min_state_of_charge")
+    if min_state_of_charge is not None:
+        query = query.filter(
+            BatteryState.state_of_charge >= min_state_of_charge
+        )
+
+    max_state_of_charge = _parse_state_of_charge(args, "max_state_of_charge")
+    if max_state_of_charge is not None:
+        query = query.filter(
+            BatteryState.state_of_charge <= max_state_of_charge
+        )
+    return query
+
+
+def listing_query(query, args):
+    """Applies the filters and the cursor of the request to the battery
+    listing query. Returns the ordered query and the page size.
+    Raises ValueError if the arguments are not valid."""
+
+    query = filter_batteries(query, args)
+    limit = parse_limit(args.get("limit"))
+    cursor = args.get("cursor")
+    if cursor:
+        created_at, battery_id = decode_cursor(cursor, 2)
+        query = query.filter(
+            tuple_(Battery.created_at, Battery.battery_id)
+            > tuple_(datetime.fromisoformat(created_at), uuid.UUID(battery_id))
+        )
+    return query.order_by(Battery.created_at, Battery.battery_id), limit
+
+
+def battery_cursor_key(battery):
+    """Returns the sort key values of a battery row."""
+
+    return battery.created_at.isoformat(), battery.battery_id
+
+
 @battery_subscriber.get("/batteries")
 def get_all_batteries():
-    """Retrieve a list of all batteries and their associated data."""
+    """Retrieve a page of batteries and their associated data.
 
-    batteries = Battery.query.all()
-    battery_list = []
-    for battery in batteries:
-        battery_list.append(
-            {
-                "id": str(battery.battery_id),
-                "state_of_charge": battery.state_of_charge,
-                "capacity": battery.capacity,
-                "voltage": battery.voltage,
-                "battery_health": battery.battery_health,
-                "created_at": battery.created_at,
-                "updated_at": battery.updated_at,
-            }
-        )
-    return jsonify(battery_list)
+    Pages are ordered by creation time and read with the `cursor` of the
+    previous page. `all=true` returns every battery in one response."""
+
+    try:
+        query, limit = listing_query(select_batteries(), request.args)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    if request.args.get("all") == "true":
+        return jsonify([battery_to_dict(battery) for battery in query])
+
+    batteries, next_cursor = paginate(
+        query,
+        limit,
+        key=battery_cursor_key,
+    )
+    return jsonify(
+        page_payload("batteries", batteries, next_cursor, battery_to_dict)
+    )
 
 
 @battery_subscriber.get("/batteries/<uuid:battery_id>")
 def get_battery_by_id(battery_id):
     """Retrieve the data for a specific battery by its ID."""
 
-    battery = Battery.query.get(battery_id)
-    if battery:
-        return jsonify(
-            {
-                "id": str(battery.battery_id),
-                "state_of_charge": battery.state_of_charge,
-                "capacity": battery.capacity,
-                "voltage": battery.voltage,
-                "battery_health": battery.battery_health,
-                "created_at": battery.created_at,
-                "updated_at": battery.updated_at,
-            }
-        )
+    payload = battery_cache.get_payload(battery_id)
+    if payload:
+        return current_app.response_class(payload, mimetype="application/json")
     return jsonify({"message": "Battery not found"}), 404
 
 
@@ -78,6 +172,7 @@ def add_battery():
         voltage=voltage,
         battery_health=battery_health,
     )
+    battery.created_at = datetime.utcnow()
     battery_id = battery.battery_id
     created_at = battery.created_at
     db.session.add(battery)
@@ -90,6 +185,18 @@ def add_battery():
         timestamp=created_at,
     )
     db.session.add(log)
+    db.session.flush()
+    save_states(
+        [
+            {
+                "battery_id": battery_id,
+                "state_of_charge": state_of_charge,
+                "voltage": voltage,
+                "updated_at": created_at,
+                "checked_log_id": log.log_id,
+            }
+        ]
+    )
 
     db.session.commit()
     db.session.close()
@@ -105,38 +212,97 @@ def add_battery():
     )
 
 
+def _queue_battery_update(battery_id, request_time):
+    """Queues the update of an existing battery as a reading."""
+
+    if not battery_exists(battery_id):
+        return jsonify({"message": f"Battery '{battery_id}' not found"}), 404
+
+    data = request.json
+    reading = {
+        "battery_id": str(battery_id),
+        "state_of_charge": data.get("state_of_charge"),
+        "voltage": data.get("voltage"),
+    }
+    try:
+        results = queue_readings(
+            [reading], request_time, validate_update_reading_data
+        )
+    except QueueFullError as error:
+        return queue_full_response(error)
+    if results[0]["status"] != "queued":
+        return jsonify({"error": results[0]["error"]}), 400
+
+    return (
+        jsonify({"message": "Battery update accepted", "id": battery_id}),
+        202,
+    )
+
+
 @battery_subscriber.put("/batteries/<uuid:battery_id>")
 @validate_input(api="subscriber")
 def update_battery(battery_id):
     """Updates battery's status of charge, health, and voltage."""
 
     request_time = datetime.utcnow()
-    battery = Battery.query.get(battery_id)
+    if ingest_pipeline.enabled:
+        return _queue_battery_update(battery_id, request_time)
+
+    battery = select_battery(battery_id)
     if battery:
         data = request.json
         state_of_charge = data.get("state_of_charge")
         voltage = data.get("voltage")
 
-        log = BatteryLog(
-            battery_id=battery_id,
-            state_of_charge=state_of_charge,
-            voltage=voltage,
-            timestamp=request_time,
-        )
-        db.session.add(log)
-
-        battery_health = HealthCheck(
-            battery_id=battery_id,
-            current_health=battery.battery_health,
-            request_time=request_time,
-        ).check_condition()
-        battery.state_of_charge = state_of_charge
-        battery.voltage = voltage
-        battery.battery_health = battery_health
-        battery.updated_at = request_time
-        db.session.commit()
+        reading = {
+            "battery_id": battery_id,
+            "state_of_charge": state_of_charge,
+            "voltage": voltage,
+            "timestamp": request_time,
+        }
+        log = None
+        if reading_coalescer.coalesce(battery_id, [reading]):
+            log = BatteryLog(**reading)
+            db.session.add(log)
+
+        try:
+            battery_health = HealthCheck(
+                battery_id=battery_id,
+                current_health=battery.battery_health,
+                request_time=request_time,
+                state_of_charge=state_of_charge,
+            ).check_condition()
+            raise_issues(
+                {battery_id: [reading]}, {battery_id: battery.voltage}
+            )
+            transitions = {}
+            if battery_health != battery.battery_health:
+                transitions[(battery.battery_health, battery_health)] = [
+                    battery_id
+                ]
+            db.session.flush()
+            save_states(
+                [
+                    {
+                        "battery_id": battery_id,
+                        "state_of_charge": state_of_charge,
+                        "voltage": voltage,
+                        "updated_at": request_time,
+                        "checked_log_id": log.log_id if log else None,
+                    }
+                ],
+                transitions,
+            )
+            db.session.commit()
+        except SQLAlchemyError:
+            # the reading was not logged, it must neither be coalesced with
+            # nor counted again when retried.
+            reading_coalescer.forget(battery_id)
+            health_counter.forget(battery_id)
+            raise
 
         db.session.close()
+        battery_cache.invalidate(battery_id)
 
         return jsonify(
             {"message": "Battery updated successfully", "id": battery_id}
@@ -151,8 +317,12 @@ def delete_battery(battery_id):
     battery = Battery.query.get(battery_id)
     if battery:
         db.session.delete(battery)
+        db.session.execute(delete_state(battery_id))
         db.session.commit()
         db.session.close()
+        health_counter.forget(battery_id)
+        reading_coalescer.forget(battery_id)
+        battery_cache.invalidate(battery_id)
 
         return jsonify({"message": "Battery deleted successfully"})
     return jsonify({"message": "Battery not found"}), 404
@@ -0,0 +1,159 @@
+"""This module handles the streaming export of batteries, logs and issues.
+
+The rows are read through a server side cursor and written to the response
+chunk by chunk, as NDJSON (default) or CSV, so the memory used by an export
+does not depend on the size of the table."""
+
+import io
+import csv
+import json
+import uuid
+import logging
+from datetime import datetime
+
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from sqlalchemy import select
+
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.database.model_issue import Issue
+from src.database.read_models import (
+    BATTERY_LOG_COLUMNS,
+    ISSUE_COLUMNS,
+    battery_statement,
+)
+from src.utils.input_validators import parse_time_range
+
+from src.config.app_config import EXPORT_CHUNK_SIZE
+
+logger = logging.getLogger()
+
+data_export = Blueprint("data_export", __name__, url_prefix="/api/v1/export")
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _to_json(value):
+    """Converts the values json does not support natively."""
+
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not exportable")
+
+
+def _ndjson_chunks(result, columns):
+    """Yields the rows of the result as NDJSON, one chunk per partition."""
+
+    for rows in result.partitions():
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_to_json) + "\n"
+            for row in rows
+        )
+
+
+def _csv_chunks(result, columns):
+    """Yields the rows of the result as CSV, one chunk per partition."""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in result.partitions():
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _stream(statement, export_format):
+    """Returns a streaming response with the rows of the statement."""
+
+    columns = [column.name for column in statement.selected_columns]
+    chunks = _ndjson_chunks if export_format == "ndjson" else _csv_chunks
+
+    def generate():
+        result = db.session.execute(
+            statement.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        try:
+            yield from chunks(result, columns)
+        finally:
+            result.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_FORMATS[export_format],
+    )
+
+
+def _battery_ids(args):
+    """Returns the `battery_id` filters of the request arguments.
+    Raises ValueError if an id is not valid."""
+
+    return [uuid.UUID(battery_id) for battery_id in args.getlist("battery_id")]
+
+
+def _export_format(args):
+    """Returns the requested format. Raises ValueError if it is unknown."""
+
+    export_format = args.get("format", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid export format '{export_format}'")
+    return export_format
+
+
+@data_export.get("/batteries")
+def export_batteries():
+    """Stream every battery."""
+
+    try:
+        export_format = _export_format(request.args)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    statement = battery_statement().order_by(
+        Battery.created_at, Battery.battery_id
+    )
+    return _stream(statement, export_format)
+
+
+@data_export.get("/battery_logs")
+def export_battery_logs():
+    """Stream the battery logs, optionally of some batteries (`battery_id`,
+    repeatable) and within a time range (`from`, `to`)."""
+
+    try:
+        export_format = _export_format(request.args)
+        battery_ids = _battery_ids(request.args)
+        start, end = parse_time_range(request.args)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    statement = select(*BATTERY_LOG_COLUMNS)
+    if battery_ids:
+        statement = statement.where(BatteryLog.battery_id.in_(battery_ids))
+    if start is not None:
+        statement = statement.where(BatteryLog.timestamp >= start)
+    if end is not None:
+        statement = statement.where(BatteryLog.timestamp < end)
+    return _stream(statement.order_by(BatteryLog.log_id), export_format)
+
+
+@data_export.get("/issues")
+def export_issues():
+    """Stream the issues, optionally of some batteries (`battery_id`,
+    repeatable)."""
+
+    try:
+        export_format = _export_format(request.args)
+        battery_ids = _battery_ids(request.args)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    statement = select(*ISSUE_COLUMNS)
+    if battery_ids:
+        statement = statement.where(Issue.battery_id.in_(battery_ids))
+    return _stream(statement.order_by(Issue.issue_id), export_format)
@@ -0,0 +1,39 @@
+"""This module exposes the runtime counters of the service for debugging."""
+
+from flask import Blueprint, jsonify
+
+from src.config.engine_config import pool_status
+from src.database.database import db
+from src.services.battery_cache import battery_cache
+from src.services.battery_ingest import ingest_pipeline
+from src.services.reading_coalescer import reading_coalescer
+
+diagnostics = Blueprint("diagnostics", __name__, url_prefix="/debug")
+
+
+@diagnostics.get("/cache")
+def get_cache_stats():
+    """Retrieve the hit, miss and eviction counters of the battery cache."""
+
+    return jsonify(battery_cache.stats())
+
+
+@diagnostics.get("/pool")
+def get_pool_status():
+    """Retrieve the checked out, idle and overflow database connections."""
+
+    return jsonify(pool_status(db.engine))
+
+
+@diagnostics.get("/ingest")
+def get_ingest_stats():
+    """Retrieve the queue and counters of the asynchronous ingestion."""
+
+    return jsonify(ingest_pipeline.stats())
+
+
+@diagnostics.get("/coalescing")
+def get_coalescing_stats():
+    """Retrieve the logged, dropped and merged readings of the coalescing."""
+
+    return jsonify(reading_coalescer.stats())
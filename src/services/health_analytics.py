@@ -0,0 +1,251 @@
+"""This module computes the health analytics of the batteries with NumPy.
+
+The state of charge and voltage series of one battery, or of a slice of the
+fleet, are read with one query and split into arrays per battery. Every
+metric is then computed on whole arrays:
+
+- the equivalent full cycles, the state of charge swung up and down between
+  the turning points of the series divided by 200 points;
+- the depth of every discharge, from a peak to the next trough, and their
+  distribution over DEPTH_OF_DISCHARGE_BINS;
+- the voltage sag, the largest relative voltage drop between two readings
+  while the state of charge goes down.
+
+`AnalyticsPolicy` turns these metrics into health downgrades, see
+`health_transitions`."""
+
+from sqlalchemy import select
+
+from src.database.database import db
+from src.database.model_battery_log import BatteryLog
+
+from src.config.app_config import (
+    BATTERY_HEALTH_ORDER,
+    DEEP_DISCHARGE_DEPTH,
+    DEPTH_OF_DISCHARGE_BINS,
+    HEALTH_CYCLE_LIMIT,
+    HEALTH_DEEP_DISCHARGE_LIMIT,
+    HEALTH_EXCEED_LIMIT,
+    HEALTH_VOLTAGE_SAG_LIMIT,
+    STATE_OF_CHARGE_LOWER_LIMIT,
+    STATE_OF_CHARGE_UPPER_LIMIT,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def series_statement(battery_ids, since):
+    """Returns the query of the timestamp, state of charge and voltage of the
+    logs of the batteries since the given time, in time order."""
+
+    return (
+        select(
+            BatteryLog.battery_id,
+            BatteryLog.timestamp,
+            BatteryLog.state_of_charge,
+            BatteryLog.voltage,
+        )
+        .where(
+            BatteryLog.battery_id.in_(list(battery_ids)),
+            BatteryLog.timestamp >= since,
+        )
+        .order_by(BatteryLog.battery_id, BatteryLog.timestamp)
+    )
+
+
+def split_series(rows):
+    """Returns {battery_id: (timestamp, state_of_charge, voltage)} arrays of
+    the rows of `series_statement`."""
+
+    if not rows:
+        return {}
+
+    ids, timestamps, state_of_charge, voltage = zip(*rows)
+    ids = np.array(ids, dtype=object)
+    timestamps = np.array(timestamps, dtype="datetime64[us]")
+    # missing values become NaN and are dropped by each metric.
+    values = np.array([state_of_charge, voltage], dtype=float)
+    starts = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+    return {
+        ids[start]: (times, series[0], series[1])
+        for start, times, series in zip(
+            np.concatenate(([0], starts)),
+            np.split(timestamps, starts),
+            np.split(values, starts, axis=1),
+        )
+    }
+
+
+def load_series(battery_ids, since):
+    """Returns {battery_id: (timestamp, state_of_charge, voltage)} arrays of
+    the logs of the batteries since the given time, in time order. Batteries
+    without logs are left out."""
+
+    return split_series(
+        db.session.execute(series_statement(battery_ids, since)).all()
+    )
+
+
+def turning_points(state_of_charge):
+    """Returns the first and last values of the series and the values where
+    it changes direction."""
+
+    values = state_of_charge[~np.isnan(state_of_charge)]
+    if values.size:
+        values = values[np.concatenate(([True], np.diff(values) != 0))]
+    if values.size < 3:
+        return values
+    slopes = np.sign(np.diff(values))
+    reversals = np.flatnonzero(slopes[1:] != slopes[:-1]) + 1
+    return values[np.concatenate(([0], reversals, [values.size - 1]))]
+
+
+def voltage_sag(state_of_charge, voltage):
+    """Returns the largest relative voltage drop between two consecutive
+    readings while the state of charge goes down, 0 if there is none."""
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drops = (voltage[:-1] - voltage[1:]) / voltage[:-1]
+    discharging = (np.diff(state_of_charge) < 0) & (voltage[:-1] > 0)
+    drops = drops[discharging & np.isfinite(drops)]
+    return float(drops.max()) if drops.size else 0.0
+
+
+def analyze_series(state_of_charge, voltage):
+    """Returns the health metrics of one battery's series."""
+
+    swings = np.diff(turning_points(state_of_charge))
+    depths = -swings[swings < 0]
+    counts, _ = np.histogram(depths, bins=DEPTH_OF_DISCHARGE_BINS)
+    with np.errstate(invalid="ignore"):
+        out_of_band = (state_of_charge < STATE_OF_CHARGE_LOWER_LIMIT) | (
+            state_of_charge > STATE_OF_CHARGE_UPPER_LIMIT
+        )
+    return {
+        "readings": int(state_of_charge.size),
+        "exceed_count": int(np.count_nonzero(out_of_band)),
+        "cycles": float(np.abs(swings).sum() / 200),
+        "depth_of_discharge": {
+            "bins": list(DEPTH_OF_DISCHARGE_BINS),
+            "counts": counts.tolist(),
+            "max": float(depths.max()) if depths.size else 0.0,
+        },
+        "deep_discharges": int(
+            np.count_nonzero(depths >= DEEP_DISCHARGE_DEPTH)
+        ),
+        "voltage_sag": voltage_sag(state_of_charge, voltage),
+    }
+
+
+def battery_analytics(battery_ids, since):
+    """Returns {battery_id: metrics} of the batteries since the given time,
+    read with a single query. Batteries without logs are left out."""
+
+    return {
+        battery_id: analyze_series(state_of_charge, voltage)
+        for battery_id, (_, state_of_charge, voltage) in load_series(
+            battery_ids, since
+        ).items()
+    }
+
+
+def breached_limits(metrics):
+    """Returns the names of the health limits exceeded by the metrics."""
+
+    limits = {
+        "exceed_count": metrics["exceed_count"] > HEALTH_EXCEED_LIMIT,
+        "cycles": metrics["cycles"] > HEALTH_CYCLE_LIMIT,
+        "deep_discharges": metrics["deep_discharges"]
+        > HEALTH_DEEP_DISCHARGE_LIMIT,
+        "voltage_sag": metrics["voltage_sag"] > HEALTH_VOLTAGE_SAG_LIMIT,
+    }
+    return [name for name, breached in limits.items() if breached]
+
+
+def downgrade_health_by(current_health, levels):
+    """Returns the health `levels` levels below the current one, BAD at
+    worst. Unknown healths are kept."""
+
+    if current_health not in BATTERY_HEALTH_ORDER or levels <= 0:
+        return current_health
+    index = BATTERY_HEALTH_ORDER.index(current_health)
+    return BATTERY_HEALTH_ORDER[max(index - levels, 0)]
+
+
+def _windows(series, rows, logged):
+    """Returns the (state_of_charge, voltage) arrays of the window of a
+    battery before and after its readings, given as log rows in timestamp
+    order. `logged` tells if the series holds the readings already."""
+
+    if series is None:
+        series = (np.array([], dtype="datetime64[us]"), *np.empty((2, 0)))
+    timestamps, state_of_charge, voltage = series
+    if logged:
+        before = timestamps < np.datetime64(rows[0]["timestamp"], "us")
+        return (
+            (state_of_charge[before], voltage[before]),
+            (state_of_charge, voltage),
+        )
+
+    new_timestamps = np.array(
+        [row["timestamp"] for row in rows], dtype="datetime64[us]"
+    )
+    new_values = np.array(
+        [
+            [row["state_of_charge"] for row in rows],
+            [row["voltage"] for row in rows],
+        ],
+        dtype=float,
+    )
+    order = np.argsort(
+        np.concatenate((timestamps, new_timestamps)), kind="stable"
+    )
+    return (
+        (state_of_charge, voltage),
+        (
+            np.concatenate((state_of_charge, new_values[0]))[order],
+            np.concatenate((voltage, new_values[1]))[order],
+        ),
+    )
+
+
+class AnalyticsPolicy:
+    """Evaluates the analytics of the health check window on top of the
+    exceed count: one level down for each limit that the new readings breach
+    first. A limit that stays breached does not downgrade the health again,
+    so with the exceed count as the only exceeded limit it gives the same
+    health as the default policy."""
+
+    def __init__(self):
+        if np is None:
+            raise RuntimeError(
+                "The numpy package is required for the analytics policy."
+            )
+
+    @staticmethod
+    def new_breaches(series, readings_by_battery, logged=False):
+        """Returns {battery_id: number of limits, besides the exceed count,
+        breached by the window with the readings and not before them}.
+        `series` holds the windows read by `load_series`."""
+
+        breaches = {}
+        for battery_id, rows in readings_by_battery.items():
+            before, after = _windows(series.get(battery_id), rows, logged)
+            breached = set(breached_limits(analyze_series(*after)))
+            breached -= set(breached_limits(analyze_series(*before)))
+            breached.discard("exceed_count")
+            breaches[battery_id] = len(breached)
+        return breaches
+
+    def breaches(self, readings_by_battery, since, logged=False):
+        """Returns the new breaches of the readings, reading the windows of
+        their batteries since the given time with one query."""
+
+        return self.new_breaches(
+            load_series(readings_by_battery, since),
+            readings_by_battery,
+            logged,
+        )
@@ -0,0 +1,118 @@
+"""This module keeps an incremental count of out of band readings per battery.
+
+The counter holds the timestamps of the out of band readings of the health
+check window in memory, so a new reading is evaluated in O(1) instead of
+re-reading the window from `battery_logs`. A battery is rebuilt from the logs
+the first time it is seen by the process, e.g. after a restart.
+
+The counts are kept per process: run a single worker, or route the readings of
+a battery to the same worker, when this engine is enabled."""
+
+import bisect
+import threading
+from collections import deque
+
+from sqlalchemy import or_
+
+from src.database.database import db
+from src.database.model_battery_log import BatteryLog
+
+from src.config.app_config import (
+    HEALTH_CHECK_WINDOW,
+    STATE_OF_CHARGE_LOWER_LIMIT,
+    STATE_OF_CHARGE_UPPER_LIMIT,
+)
+
+
+class RollingHealthCounter:
+    """Sliding window counter of out of band readings per battery."""
+
+    def __init__(self, window=HEALTH_CHECK_WINDOW):
+        self.window = window
+        self._timestamps = {}
+        self._lock = threading.Lock()
+
+    def load(self, battery_ids, now):
+        """Rebuilds the window of the batteries that are not held yet from
+        `battery_logs`, in one query."""
+
+        with self._lock:
+            missing = [i for i in battery_ids if i not in self._timestamps]
+        if not missing:
+            return
+
+        loaded = {battery_id: deque() for battery_id in missing}
+        with db.session.no_autoflush:
+            rows = (
+                db.session.query(BatteryLog.battery_id, BatteryLog.timestamp)
+                .filter(
+                    BatteryLog.battery_id.in_(missing),
+                    BatteryLog.timestamp >= now - self.window,
+                    or_(
+                        BatteryLog.state_of_charge
+                        < STATE_OF_CHARGE_LOWER_LIMIT,
+                        BatteryLog.state_of_charge
+                        > STATE_OF_CHARGE_UPPER_LIMIT,
+                    ),
+                )
+                .order_by(BatteryLog.timestamp)
+                .all()
+            )
+        for battery_id, timestamp in rows:
+            loaded[battery_id].append(timestamp)
+
+        with self._lock:
+            for battery_id, timestamps in loaded.items():
+                self._timestamps.setdefault(battery_id, timestamps)
+
+    def observe(self, battery_id, out_of_band, timestamp, now):
+        """Records a reading of the battery and returns its exceed count."""
+
+        self.load([battery_id], now)
+        with self._lock:
+            timestamps = self._timestamps[battery_id]
+            if out_of_band and timestamp >= now - self.window:
+                if not timestamps or timestamp >= timestamps[-1]:
+                    timestamps.append(timestamp)
+                else:
+                    timestamps.insert(
+                        bisect.bisect_right(timestamps, timestamp), timestamp
+                    )
+            return self._expire(timestamps, now)
+
+    def exceed_count(self, battery_id, now):
+        """Returns the number of out of band readings within the window."""
+
+        self.load([battery_id], now)
+        with self._lock:
+            return self._expire(self._timestamps[battery_id], now)
+
+    def forget(self, *battery_ids):
+        """Drops the batteries, they are rebuilt from the logs when seen
+        again, e.g. after their readings failed to be logged."""
+
+        with self._lock:
+            for battery_id in battery_ids:
+                self._timestamps.pop(battery_id, None)
+
+    def reconcile(self, battery_ids=None):
+        """Drops the given batteries, or every battery, so their windows are
+        rebuilt from `battery_logs` the next time they are read."""
+
+        with self._lock:
+            if battery_ids is None:
+                self._timestamps.clear()
+            else:
+                for battery_id in battery_ids:
+                    self._timestamps.pop(battery_id, None)
+
+    def _expire(self, timestamps, now):
+        """Drops the timestamps that left the window and returns the count."""
+
+        since = now - self.window
+        while timestamps and timestamps[0] < since:
+            timestamps.popleft()
+        return len(timestamps)
+
+
+health_counter = RollingHealthCounter()
@@ -0,0 +1,312 @@
+"""This module recomputes the health of the whole fleet.
+
+The health of a battery is checked when its readings are written, so a log
+that was not written by an ingest path, e.g. loaded into `battery_logs`
+directly, is not accounted for. Every write path records the id of the last
+log it checked in `battery_states.checked_log_id`; the logs of a battery
+above it are the ones to check. The recomputation replays them in timestamp
+order, then moves `checked_log_id` past them, so running it again finds
+nothing to replay and the health does not depend on how often it runs.
+
+The logs of the health check window are replayed through
+`health_transitions`, with the HEALTH_CHECK_ENGINE and HEALTH_POLICY of the
+app, like a batch of readings. Older logs, e.g. of batteries that went idle
+before the logs were loaded, are checked against the window ending at each
+of them, counted from `battery_logs`, since the engines only count the
+current window. The state of a battery moves to its last replayed log when
+that log is newer than the state.
+
+The batteries are walked in ranges of ids. Each range costs one query
+selecting the logs to replay, the exceed counts of their batteries and one
+guarded UPDATE per health transition, so only the batteries with such logs
+are read and written. The ranges are processed in order, or spread over a
+process pool."""
+
+import bisect
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.database.model_battery_state import BatteryState
+from src.database.read_models import (
+    CURRENT_STATE_OF_CHARGE,
+    CURRENT_UPDATED_AT,
+    CURRENT_VOLTAGE,
+    with_states,
+)
+from src.services.battery_cache import battery_cache
+from src.services.battery_states import save_states
+from src.services.battery_health_check import (
+    get_policy,
+    get_strategy,
+    health_transitions,
+    is_out_of_band,
+    out_of_band_clause,
+    window_counter,
+)
+
+from src.config.app_config import HEALTH_CHECK_WINDOW
+
+logger = logging.getLogger()
+
+LOG_FIELDS = (
+    "log_id",
+    "battery_id",
+    "state_of_charge",
+    "voltage",
+    "timestamp",
+)
+STATE_FIELDS = ("state_of_charge", "voltage", "updated_at")
+
+
+def battery_id_ranges(batch_size):
+    """Yields the (first id, last id, count) of consecutive ranges of at most
+    `batch_size` batteries, in id order."""
+
+    last_id = None
+    while True:
+        statement = select(Battery.battery_id).order_by(Battery.battery_id)
+        if last_id is not None:
+            statement = statement.where(Battery.battery_id > last_id)
+        battery_ids = db.session.scalars(statement.limit(batch_size)).all()
+        if not battery_ids:
+            return
+        last_id = battery_ids[-1]
+        yield battery_ids[0], last_id, len(battery_ids)
+
+
+def unaccounted_logs(first_id, last_id):
+    """Returns the health, the state and the logs, {battery_id: [rows]} in
+    timestamp order, of the batteries of the id range with logs after the
+    last log checked."""
+
+    rows = db.session.execute(
+        with_states(
+            select(
+                Battery.battery_health,
+                CURRENT_STATE_OF_CHARGE,
+                CURRENT_VOLTAGE,
+                CURRENT_UPDATED_AT,
+                *(getattr(BatteryLog, field) for field in LOG_FIELDS),
+            )
+        )
+        .join(BatteryLog, BatteryLog.battery_id == Battery.battery_id)
+        .where(
+            Battery.battery_id.between(first_id, last_id),
+            BatteryLog.log_id > func.coalesce(BatteryState.checked_log_id, 0),
+        )
+        .order_by(
+            BatteryLog.battery_id, BatteryLog.timestamp, BatteryLog.log_id
+        )
+    )
+    healths = {}
+    states = {}
+    logs = {}
+    for health, *values in rows:
+        row = dict(zip(LOG_FIELDS, values[3:]))
+        healths[row["battery_id"]] = health
+        states[row["battery_id"]] = dict(zip(STATE_FIELDS, values[:3]))
+        logs.setdefault(row["battery_id"], []).append(row)
+    return healths, states, logs
+
+
+def past_counter(logs):
+    """Returns a function returning the exceed count of the window ending at
+    a log, for the logs, {battery_id: [rows]}, older than the health check
+    window. The out of band logs of their windows are read with one query."""
+
+    earliest = min(rows[0]["timestamp"] for rows in logs.values())
+    latest = max(rows[-1]["timestamp"] for rows in logs.values())
+    timestamps = {battery_id: [] for battery_id in logs}
+    for battery_id, timestamp in db.session.execute(
+        select(BatteryLog.battery_id, BatteryLog.timestamp)
+        .where(
+            BatteryLog.battery_id.in_(list(logs)),
+            BatteryLog.timestamp >= earliest - HEALTH_CHECK_WINDOW,
+            BatteryLog.timestamp <= latest,
+            out_of_band_clause(),
+        )
+        .order_by(BatteryLog.timestamp)
+    ):
+        timestamps[battery_id].append(timestamp)
+
+    def count(row):
+        battery_timestamps = timestamps[row["battery_id"]]
+        return bisect.bisect_right(
+            battery_timestamps, row["timestamp"]
+        ) - bisect.bisect_left(
+            battery_timestamps, row["timestamp"] - HEALTH_CHECK_WINDOW
+        )
+
+    return count
+
+
+def window_transitions(healths, logs, since, now):
+    """Returns the health transitions of the logs of the health check window,
+    counted by the health check engine of the app."""
+
+    # the counts include the logs, which are replayed from before them.
+    exceed_counts = get_strategy().exceed_counts(list(logs), since, now)
+    for battery_id, rows in logs.items():
+        replayed = sum(
+            1
+            for row in rows
+            if row["state_of_charge"] is not None
+            and is_out_of_band(row["state_of_charge"])
+        )
+        exceed_counts[battery_id] = max(
+            exceed_counts.get(battery_id, 0) - replayed, 0
+        )
+    return health_transitions(
+        healths,
+        logs,
+        window_counter(exceed_counts, since),
+        since,
+        get_policy(),
+        logged=True,
+    )
+
+
+def _split_logs(logs, since):
+    """Returns the logs, {battery_id: [rows]}, before and since the given
+    time, without the batteries that have none."""
+
+    past = {}
+    recent = {}
+    for battery_id, rows in logs.items():
+        for row in rows:
+            part = past if row["timestamp"] < since else recent
+            part.setdefault(battery_id, []).append(row)
+    return past, recent
+
+
+def replay_logs(healths, logs, since, now):
+    """Returns the {(old, new): [battery_id]} health transitions of the
+    batteries of {battery_id: health} caused by their unaccounted logs."""
+
+    past, recent = _split_logs(logs, since)
+    new_healths = dict(healths)
+    if past:
+        transitions = health_transitions(
+            new_healths, past, past_counter(past), since, None, logged=True
+        )
+        for (_, health), battery_ids in transitions.items():
+            new_healths.update(dict.fromkeys(battery_ids, health))
+    if recent:
+        transitions = window_transitions(new_healths, recent, since, now)
+        for (_, health), battery_ids in transitions.items():
+            new_healths.update(dict.fromkeys(battery_ids, health))
+
+    changes = {}
+    for battery_id, health in healths.items():
+        if new_healths[battery_id] != health:
+            changes.setdefault((health, new_healths[battery_id]), []).append(
+                battery_id
+            )
+    return changes
+
+
+def _replayed_state(battery_id, state, rows):
+    """Returns the state of the battery after its replayed logs: their last
+    log when it is newer than the state, with the id of the last log."""
+
+    last = rows[-1]
+    if state["updated_at"] is None or last["timestamp"] > state["updated_at"]:
+        state = {
+            "state_of_charge": last["state_of_charge"],
+            "voltage": last["voltage"],
+            "updated_at": last["timestamp"],
+        }
+    return {
+        "battery_id": battery_id,
+        **state,
+        "checked_log_id": max(row["log_id"] for row in rows),
+    }
+
+
+def recompute_range(first_id, last_id, since, dry_run=False, now=None):
+    """Checks the health of the batteries of the id range against their
+    unaccounted logs. Returns the number of batteries changed per (old
+    health, new health)."""
+
+    healths, states, logs = unaccounted_logs(first_id, last_id)
+    changes = {}
+    if logs:
+        changes = replay_logs(healths, logs, since, now or datetime.utcnow())
+
+    if not dry_run and logs:
+        # the health updates are guarded by the old health, so a battery
+        # whose health was just checked by a reading is not downgraded twice.
+        save_states(
+            [
+                _replayed_state(battery_id, states[battery_id], rows)
+                for battery_id, rows in logs.items()
+            ],
+            changes,
+        )
+        db.session.commit()
+        logger.info(
+            "Recomputed the health of %s to %s: %s changed",
+            first_id,
+            last_id,
+            sum(len(battery_ids) for battery_ids in changes.values()),
+        )
+        battery_cache.invalidate(*logs)
+    db.session.close()
+    return Counter(
+        {transition: len(ids) for transition, ids in changes.items()}
+    )
+
+
+def _init_worker():
+    """Creates the app of a pool worker and enters its context."""
+
+    # imported here, the app imports the maintenance commands using this.
+    from src.app import create_app  # pylint: disable=import-outside-toplevel
+
+    create_app().app_context().push()
+
+
+def _recompute_in_worker(first_id, last_id, count, since, dry_run, now):
+    """Recomputes a range in a pool worker, returning its count as well."""
+
+    return count, recompute_range(first_id, last_id, since, dry_run, now)
+
+
+def recompute_health(batch_size, workers=1, dry_run=False, now=None):
+    """Recomputes the health of every battery, `batch_size` batteries at a
+    time, in this process or in a pool of `workers` processes. Yields the
+    number of batteries checked and the changes of each range, in order."""
+
+    now = now or datetime.utcnow()
+    since = now - HEALTH_CHECK_WINDOW
+    ranges = battery_id_ranges(batch_size)
+    if workers <= 1:
+        for first_id, last_id, count in ranges:
+            yield count, recompute_range(
+                first_id, last_id, since, dry_run, now
+            )
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+        futures = [
+            pool.submit(
+                _recompute_in_worker,
+                first_id,
+                last_id,
+                count,
+                since,
+                dry_run,
+                now,
+            )
+            for first_id, last_id, count in ranges
+        ]
+        db.session.close()
+        for future in futures:
+            yield future.result()
@@ -0,0 +1,170 @@
+"""This module contains the asynchronous ingestion of battery readings.
+
+With INGEST_MODE=async the readings are validated by the request, published
+to a broker and stored later by background workers, which drain the broker in
+micro-batches through `ingest_readings`. A failed batch is rolled back and
+requeued up to INGEST_MAX_RETRIES times, so a reading may be stored twice if a
+worker fails after its commit. The workers drain the broker before the
+process exits."""
+
+import time
+import atexit
+import logging
+import threading
+
+from src.database.database import db
+from src.utils.brokers import LocalBroker
+
+logger = logging.getLogger()
+
+
+class IngestPipeline:
+    """Publishes readings to the broker and stores them with `store` from
+    worker threads, configured per app by `init_app`."""
+
+    def __init__(self, store):
+        self.store = store
+        self.app = None
+        self.broker = None
+        self.counters = {}
+        self._workers = []
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """Whether readings are ingested asynchronously."""
+
+        return self.broker is not None
+
+    def init_app(self, app):
+        """Starts the workers when the app's INGEST_MODE is async."""
+
+        self.stop()
+        mode = app.config.get("INGEST_MODE", "sync")
+        if mode == "sync":
+            return
+        if mode != "async":
+            raise ValueError(f"Invalid ingest mode '{mode}'.")
+
+        self.app = app
+        self.broker = LocalBroker(app.config.get("INGEST_QUEUE_SIZE", 10000))
+        self.counters = dict.fromkeys(
+            ("accepted", "stored", "rejected", "retried", "failed"), 0
+        )
+        self._stopping.clear()
+        self._workers = [
+            threading.Thread(
+                target=self._work, name=f"ingest-worker-{number}", daemon=True
+            )
+            for number in range(app.config.get("INGEST_WORKERS", 1))
+        ]
+        for worker in self._workers:
+            worker.start()
+        atexit.register(self.stop)
+        app.extensions["ingest_pipeline"] = self
+
+    def submit(self, readings):
+        """Queues validated readings. Raises QueueFullError if the broker
+        has no room for all of them."""
+
+        self.broker.publish(
+            [{"reading": reading, "attempts": 0} for reading in readings]
+        )
+        self._count("accepted", len(readings))
+
+    def flush(self, timeout=None):
+        """Waits until every queued reading is processed. Returns False on
+        timeout."""
+
+        return self.broker.join(timeout) if self.enabled else True
+
+    def stop(self, timeout=30):
+        """Lets the workers drain the broker, then stops them."""
+
+        if not self._workers:
+            return
+        self._stopping.set()
+        self.broker.wake()
+        for worker in self._workers:
+            worker.join(timeout)
+        if self.broker.size():
+            logger.error(
+                "Ingest stopped with %s readings queued", self.broker.size()
+            )
+        self._workers = []
+        self.broker = None
+        atexit.unregister(self.stop)
+
+    def stats(self):
+        """Returns the counters of the pipeline."""
+
+        if not self.enabled:
+            return {"mode": "sync"}
+        return {
+            "mode": "async",
+            "broker": self.broker.name,
+            "queued": self.broker.size(),
+            "in_flight": self.broker.in_flight(),
+            "workers": len(self._workers),
+            **self.counters,
+        }
+
+    def _count(self, name, value):
+        """Adds the value to a counter."""
+
+        with self._lock:
+            self.counters[name] += value
+
+    def _work(self):
+        """Stores the queued readings until stopped and drained."""
+
+        broker = self.broker
+        batch_size = self.app.config.get("INGEST_BATCH_SIZE", 500)
+        flush_interval = self.app.config.get("INGEST_FLUSH_INTERVAL", 0.5)
+        while not self._stopping.is_set() or broker.size():
+            batch = broker.consume(batch_size, flush_interval)
+            if batch:
+                self._process(broker, batch)
+
+    def _process(self, broker, batch):
+        """Stores a batch, requeueing it on failure."""
+
+        with self.app.app_context():
+            try:
+                results = self.store([message["reading"] for message in batch])
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Failed to store %s readings", len(batch))
+                db.session.rollback()
+                db.session.close()
+                self._retry(broker, batch)
+                return
+
+        broker.ack(batch)
+        rejected = [result for result in results if result["status"] != "ok"]
+        for result in rejected:
+            logger.warning("Rejected queued reading: %s", result["error"])
+        self._count("stored", len(results) - len(rejected))
+        self._count("rejected", len(rejected))
+
+    def _retry(self, broker, batch):
+        """Requeues the batch, dropping the readings out of retries."""
+
+        max_retries = self.app.config.get("INGEST_MAX_RETRIES", 5)
+        for message in batch:
+            message["attempts"] += 1
+        retry = [m for m in batch if m["attempts"] <= max_retries]
+        failed = [m for m in batch if m["attempts"] > max_retries]
+        if failed:
+            logger.error(
+                "Dropped %s readings after %s attempts",
+                len(failed),
+                max_retries + 1,
+            )
+            broker.ack(failed)
+            self._count("failed", len(failed))
+        if retry:
+            # back off before the batch is consumed again.
+            time.sleep(min(0.1 * 2 ** retry[0]["attempts"], 5))
+            broker.requeue(retry)
+            self._count("retried", len(retry))
@@ -0,0 +1,177 @@
+"""This module instruments the requests served by the app.
+
+Every request records its duration, and the number and duration of the SQL
+statements it ran, per route, counted by SQLAlchemy engine events. The
+metrics are served in the Prometheus text format at `GET /metrics`.
+
+With PROFILER_ENABLED=True the stacks of every request are also sampled
+every PROFILER_INTERVAL seconds, and those of the requests slower than
+PROFILER_SLOW_REQUEST_MS are written to PROFILER_OUTPUT_DIR as collapsed
+stacks, ready for flamegraph.pl or speedscope. Sampling is off by default."""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.utils.metrics import COUNT_BUCKETS, metrics
+from src.utils.profiler import SamplingProfiler, write_collapsed
+
+logger = logging.getLogger()
+
+request_duration = metrics.histogram(
+    "juicemaster_request_duration_seconds",
+    "Duration of the requests.",
+    ("method", "route", "status"),
+)
+request_sql_statements = metrics.histogram(
+    "juicemaster_request_sql_statements",
+    "Number of SQL statements run by a request.",
+    ("method", "route"),
+    buckets=COUNT_BUCKETS,
+)
+request_sql_duration = metrics.histogram(
+    "juicemaster_request_sql_duration_seconds",
+    "Time spent running the SQL statements of a request.",
+    ("method", "route"),
+)
+sql_statement_duration = metrics.histogram(
+    "juicemaster_sql_statement_duration_seconds",
+    "Duration of every SQL statement, within requests or not.",
+)
+profiles_written = metrics.counter(
+    "juicemaster_profiles_written_total",
+    "Number of slow request profiles written.",
+)
+
+
+def _before_cursor_execute(conn, *args):  # pylint: disable=unused-argument
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, *args):  # pylint: disable=unused-argument
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+    sql_statement_duration.observe(duration)
+    if has_request_context() and "sql_statements" in g:
+        g.sql_statements += 1
+        g.sql_duration += duration
+
+
+def _handle_error(context):
+    # a failed statement has no after_cursor_execute to pop its start.
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def get_metrics():
+    """Retrieve the metrics of this process in the Prometheus text format."""
+
+    return Response(
+        metrics.render(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+class Instrumentation:
+    """Records the metrics of the requests of the apps set up by
+    `init_app`, and profiles them when enabled."""
+
+    def __init__(self):
+        self.profiler = None
+        self._engine_events = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Adds the request hooks and the `/metrics` route to the app, and
+        listens to the SQL statements of every engine."""
+
+        with self._lock:
+            if not self._engine_events:
+                event.listen(
+                    Engine, "before_cursor_execute", _before_cursor_execute
+                )
+                event.listen(
+                    Engine, "after_cursor_execute", _after_cursor_execute
+                )
+                event.listen(Engine, "handle_error", _handle_error)
+                self._engine_events = True
+
+        if app.config.get("PROFILER_ENABLED"):
+            interval = app.config.get("PROFILER_INTERVAL", 0.005)
+            if self.profiler is None or self.profiler.interval != interval:
+                self.profiler = SamplingProfiler(interval)
+            os.makedirs(app.config["PROFILER_OUTPUT_DIR"], exist_ok=True)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule("/metrics", "metrics", get_metrics)
+        app.extensions["instrumentation"] = self
+
+    def _before_request(self):
+        g.request_start = time.perf_counter()
+        g.sql_statements = 0
+        g.sql_duration = 0.0
+        if self._profiling():
+            self.profiler.begin(threading.get_ident())
+
+    def _after_request(self, response):
+        duration = time.perf_counter() - g.request_start
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        method = request.method
+        request_duration.observe(
+            duration, method=method, route=route, status=response.status_code
+        )
+        request_sql_statements.observe(
+            g.sql_statements, method=method, route=route
+        )
+        request_sql_duration.observe(
+            g.sql_duration, method=method, route=route
+        )
+        if self._profiling():
+            self._write_profile(method, route, duration)
+        return response
+
+    def _teardown_request(self, error):  # pylint: disable=unused-argument
+        # stops sampling the requests which failed before `_after_request`.
+        if self.profiler is not None:
+            self.profiler.end(threading.get_ident())
+
+    def _profiling(self):
+        return self.profiler is not None and current_app.config.get(
+            "PROFILER_ENABLED"
+        )
+
+    def _write_profile(self, method, route, duration):
+        """Writes the stacks sampled during the request if it was slow."""
+
+        samples = self.profiler.end(threading.get_ident())
+        if not samples or duration * 1000 < current_app.config.get(
+            "PROFILER_SLOW_REQUEST_MS", 500
+        ):
+            return
+        name = "".join(
+            c if c.isalnum() else "_" for c in f"{method}{route}"
+        ).strip("_")
+        path = os.path.join(
+            current_app.config["PROFILER_OUTPUT_DIR"],
+            f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{name}.folded",
+        )
+        write_collapsed(path, samples)
+        profiles_written.inc()
+        logger.info(
+            "Profiled a %.0f ms request to %s %s: %s",
+            duration * 1000,
+            method,
+            route,
+            path,
+        )
+
+
+instrumentation = Instrumentation()
@@ -0,0 +1,173 @@
+"""This module raises battery issues automatically from the readings.
+
+Every rule looks at one reading, with the voltage of the previous reading of
+the battery, and describes the issue it finds; a value the reading does not
+have is not checked. An issue is not raised again for the same battery and
+type within the cooldown, counted from the last issue of that type, stored or
+raised by the same batch."""
+
+import abc
+import uuid
+import logging
+
+from flask import current_app
+from sqlalchemy import func, insert, select
+
+from src.database.database import db
+from src.database.model_issue import Issue
+
+from src.config.app_config import (
+    DEEP_DISCHARGE_LIMIT,
+    ISSUE_RULE_COOLDOWN,
+    STATE_OF_CHARGE_UPPER_LIMIT,
+    VOLTAGE_ANOMALY_RATIO,
+)
+
+logger = logging.getLogger()
+
+
+class IssueRule(abc.ABC):
+    """Base class for the rules raising one type of issue."""
+
+    issue_type = None
+
+    @abc.abstractmethod
+    def check(self, reading, previous_voltage):
+        """Returns the description of the issue found in the reading, or
+        None if there is none."""
+
+
+class OverChargeRule(IssueRule):
+    """Raises an issue when the battery is charged above the upper limit."""
+
+    issue_type = "over-charge"
+
+    def check(self, reading, previous_voltage):
+        state_of_charge = reading["state_of_charge"]
+        if (
+            state_of_charge is not None
+            and state_of_charge > STATE_OF_CHARGE_UPPER_LIMIT
+        ):
+            return (
+                f"State of charge {state_of_charge}% is above "
+                f"{STATE_OF_CHARGE_UPPER_LIMIT}%"
+            )
+        return None
+
+
+class DeepDischargeRule(IssueRule):
+    """Raises an issue when the battery is discharged below the limit."""
+
+    issue_type = "deep discharge"
+
+    def check(self, reading, previous_voltage):
+        state_of_charge = reading["state_of_charge"]
+        if (
+            state_of_charge is not None
+            and state_of_charge < DEEP_DISCHARGE_LIMIT
+        ):
+            return (
+                f"State of charge {state_of_charge}% is below "
+                f"{DEEP_DISCHARGE_LIMIT}%"
+            )
+        return None
+
+
+class VoltageAnomalyRule(IssueRule):
+    """Raises an issue when the voltage is not positive, or moves too far
+    from the previous reading."""
+
+    issue_type = "voltage anomaly"
+
+    def check(self, reading, previous_voltage):
+        voltage = reading["voltage"]
+        if voltage is None:
+            return None
+        if voltage <= 0:
+            return f"Voltage {voltage}V is not positive"
+        if (
+            previous_voltage
+            and abs(voltage - previous_voltage) / previous_voltage
+            > VOLTAGE_ANOMALY_RATIO
+        ):
+            return f"Voltage changed from {previous_voltage}V to {voltage}V"
+        return None
+
+
+ISSUE_RULES = (OverChargeRule(), DeepDischargeRule(), VoltageAnomalyRule())
+
+
+def _last_issues(battery_ids, since, rules):
+    """Returns the time of the last issue of each (battery, type) of the
+    rules since the given time."""
+
+    rows = db.session.execute(
+        select(
+            Issue.battery_id,
+            Issue.issue_type,
+            func.max(Issue.occurrence_timestamp),
+        )
+        .where(
+            Issue.battery_id.in_(battery_ids),
+            Issue.issue_type.in_([rule.issue_type for rule in rules]),
+            Issue.occurrence_timestamp >= since,
+        )
+        .group_by(Issue.battery_id, Issue.issue_type)
+    )
+    return {(row[0], row[1]): row[2] for row in rows}
+
+
+def detect_issues(readings_by_battery, previous_voltages, rules=ISSUE_RULES):
+    """Returns the issue rows raised by the readings, given per battery in
+    time order, and the voltage of each battery before them."""
+
+    if not readings_by_battery:
+        return []
+    since = min(
+        readings[0]["timestamp"] for readings in readings_by_battery.values()
+    )
+    last_issues = _last_issues(
+        list(readings_by_battery), since - ISSUE_RULE_COOLDOWN, rules
+    )
+
+    issues = []
+    for battery_id, readings in readings_by_battery.items():
+        previous_voltage = previous_voltages.get(battery_id)
+        for reading in readings:
+            for rule in rules:
+                description = rule.check(reading, previous_voltage)
+                last_issue = last_issues.get((battery_id, rule.issue_type))
+                if description is None or (
+                    last_issue is not None
+                    and reading["timestamp"] - last_issue < ISSUE_RULE_COOLDOWN
+                ):
+                    continue
+                last_issues[(battery_id, rule.issue_type)] = reading[
+                    "timestamp"
+                ]
+                issues.append(
+                    {
+                        "issue_id": uuid.uuid4(),
+                        "battery_id": battery_id,
+                        "issue_type": rule.issue_type,
+                        "issue_description": description,
+                        "occurrence_timestamp": reading["timestamp"],
+                    }
+                )
+            if reading["voltage"] is not None:
+                previous_voltage = reading["voltage"]
+    if issues:
+        logger.info("Raised %s issues from the readings", len(issues))
+    return issues
+
+
+def raise_issues(readings_by_battery, previous_voltages):
+    """Adds the issues raised by the readings to the session when the app's
+    ISSUE_RULES_ENABLED setting is on. Returns the number of issues."""
+
+    if not current_app.config.get("ISSUE_RULES_ENABLED"):
+        return 0
+    issues = detect_issues(readings_by_battery, previous_voltages)
+    if issues:
+        db.session.execute(insert(Issue), issues)
+    return len(issues)
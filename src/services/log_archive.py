@@ -0,0 +1,453 @@
+"""This module archives the old battery logs to Parquet files and reads them.
+
+`flask --app src.app maintenance archive-logs` moves the logs older than a
+number of days from `battery_logs` to zstd compressed Parquet files under
+ARCHIVE_DIR, partitioned by day and by a hash of the battery id:
+`date=2023-06-01/battery_hash=007/logs-<first log id>.parquet`. The rollups of
+the logs are rebuilt first, then every day is streamed to its partitions in
+keyset batches and each touched partition is compacted into one file sorted
+by battery and timestamp. The time before which the logs are archived is then
+written to the `_archive.json` manifest, and the logs are deleted in batches.
+Only the logs up to the last log id at the start of the run are archived and
+deleted, so logs inserted meanwhile are left to the next run.
+
+The history reads the logs before that time from the archive, memory-mapping
+the files of the battery's partition of each day, and the later logs from the
+database. Runs are safe to repeat: files are written under a temporary name
+and renamed, and a log archived twice is dropped by the compaction. Logs
+older than the manifest inserted after a run are only read once a later run
+archives them. Requires the `pyarrow` package."""
+
+import json
+import logging
+import os
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = pc = pq = None
+
+from src.config.app_config import ARCHIVE_ROW_GROUP_SIZE
+from src.database.database import db
+from src.database.model_battery_log import BatteryLog
+from src.utils.time_buckets import TIME_BUCKETS, truncate
+
+from src.services.log_rollups import compact_old_logs, delete_logs
+
+logger = logging.getLogger()
+
+MANIFEST_FILE = "_archive.json"
+ARCHIVE_COLUMNS = (
+    "log_id",
+    "battery_id",
+    "timestamp",
+    "state_of_charge",
+    "voltage",
+)
+
+ArchivedLog = namedtuple(
+    "ArchivedLog", ("log_id", "timestamp", "state_of_charge", "voltage")
+)
+
+
+def _require_pyarrow():
+    """Raises RuntimeError if pyarrow is not installed."""
+
+    if pq is None:
+        raise RuntimeError(
+            "The pyarrow package is required for the log archive."
+        )
+
+
+def _schema():
+    """Returns the Arrow schema of the archived logs."""
+
+    return pa.schema(
+        [
+            ("log_id", pa.int64()),
+            ("battery_id", pa.string()),
+            ("timestamp", pa.timestamp("us")),
+            ("state_of_charge", pa.float64()),
+            ("voltage", pa.float64()),
+        ]
+    )
+
+
+def read_manifest(directory):
+    """Returns the manifest of the archive in the directory, or None."""
+
+    try:
+        with open(
+            os.path.join(directory, MANIFEST_FILE), encoding="utf-8"
+        ) as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        return None
+    manifest["archived_until"] = datetime.fromisoformat(
+        manifest["archived_until"]
+    )
+    return manifest
+
+
+def _write_manifest(directory, until, partitions):
+    """Replaces the manifest of the archive in the directory."""
+
+    path = os.path.join(directory, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "archived_until": until.isoformat(),
+                "partitions": partitions,
+            },
+            file,
+        )
+    os.replace(f"{path}.tmp", path)
+
+
+def archived_until():
+    """Returns the time before which the logs are read from the archive, or
+    None when nothing was archived."""
+
+    manifest = read_manifest(current_app.config["ARCHIVE_DIR"])
+    return manifest["archived_until"] if manifest else None
+
+
+def partition_of(battery_id, partitions):
+    """Returns the hash partition of the battery."""
+
+    return uuid.UUID(str(battery_id)).int % partitions
+
+
+def partition_dir(directory, day, partition):
+    """Returns the directory of the logs of a day and hash partition."""
+
+    return os.path.join(
+        directory, f"date={day:%Y-%m-%d}", f"battery_hash={partition:03}"
+    )
+
+
+def _parquet_files(path):
+    """Returns the paths of the Parquet files in the directory."""
+
+    if not os.path.isdir(path):
+        return []
+    return sorted(
+        os.path.join(path, name)
+        for name in os.listdir(path)
+        if name.endswith(".parquet")
+    )
+
+
+def _day_batches(day, batch_size, last_log_id):
+    """Yields the logs of the day up to the log id `last_log_id` in batches
+    of `batch_size` rows, read in log id order."""
+
+    statement = select(
+        *(getattr(BatteryLog, column) for column in ARCHIVE_COLUMNS)
+    ).where(
+        BatteryLog.timestamp >= day,
+        BatteryLog.timestamp < day + timedelta(days=1),
+        BatteryLog.log_id <= last_log_id,
+    )
+    last_id = None
+    while True:
+        batch = statement
+        if last_id is not None:
+            batch = batch.where(BatteryLog.log_id > last_id)
+        rows = db.session.execute(
+            batch.order_by(BatteryLog.log_id).limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].log_id
+
+
+def _to_table(rows):
+    """Returns the log rows as an Arrow table."""
+
+    log_ids, battery_ids, timestamps, states, voltages = zip(*rows)
+    return pa.table(
+        [
+            log_ids,
+            [str(battery_id) for battery_id in battery_ids],
+            timestamps,
+            states,
+            voltages,
+        ],
+        schema=_schema(),
+    )
+
+
+def _drop_repeated(table):
+    """Returns the table without the rows repeating the log id of the row
+    before them."""
+
+    if table.num_rows < 2:
+        return table
+    log_ids = table.column("log_id")
+    repeated = pc.equal(log_ids.slice(1), log_ids.slice(0, table.num_rows - 1))
+    return table.filter(
+        pa.concat_arrays(
+            [pa.array([True]), pc.invert(repeated).combine_chunks()]
+        )
+    )
+
+
+def compact_partition(path, compression):
+    """Rewrites the files of a partition as one file sorted by battery,
+    timestamp and log id, without duplicate logs."""
+
+    files = _parquet_files(path)
+    if not files:
+        return
+    table = pa.concat_tables(
+        pq.read_table(file, memory_map=True) for file in files
+    )
+    table = table.sort_by(
+        [
+            ("battery_id", "ascending"),
+            ("timestamp", "ascending"),
+            ("log_id", "ascending"),
+        ]
+    ).combine_chunks()
+    table = _drop_repeated(table)
+
+    target = os.path.join(
+        path, f"logs-{pc.min(table.column('log_id')).as_py()}.parquet"
+    )
+    pq.write_table(
+        table,
+        f"{target}.tmp",
+        compression=compression,
+        row_group_size=ARCHIVE_ROW_GROUP_SIZE,
+    )
+    # the target may replace one of the files, the others are then removed.
+    os.replace(f"{target}.tmp", target)
+    for file in files:
+        if file != target:
+            os.remove(file)
+
+
+def archive_day(directory, day, batches, partitions, compression):
+    """Writes the batches of logs of the day, see `_day_batches`, to the
+    archive and compacts the partitions written to. Returns the number of
+    archived logs."""
+
+    writers = {}
+    count = 0
+    try:
+        for rows in batches:
+            by_partition = {}
+            for row in rows:
+                by_partition.setdefault(
+                    partition_of(row.battery_id, partitions), []
+                ).append(row)
+            for partition, partition_rows in by_partition.items():
+                if partition not in writers:
+                    path = partition_dir(directory, day, partition)
+                    os.makedirs(path, exist_ok=True)
+                    target = os.path.join(
+                        path, f"logs-{partition_rows[0].log_id}.parquet"
+                    )
+                    writers[partition] = (
+                        pq.ParquetWriter(
+                            f"{target}.tmp",
+                            _schema(),
+                            compression=compression,
+                        ),
+                        target,
+                    )
+                writers[partition][0].write_table(_to_table(partition_rows))
+            count += len(rows)
+    finally:
+        for writer, _ in writers.values():
+            writer.close()
+
+    for partition, (_, target) in writers.items():
+        os.replace(f"{target}.tmp", target)
+        compact_partition(
+            partition_dir(directory, day, partition), compression
+        )
+    logger.info("Archived %s logs of %s", count, f"{day:%Y-%m-%d}")
+    return count
+
+
+def archive_logs(cutoff, batch_size):
+    """Moves the logs older than the cutoff, rounded down to a day, to the
+    archive and deletes them in batches of `batch_size` rows. The rollups of
+    those logs are rebuilt first. Returns the number of archived logs.
+    Raises ValueError if the archive has another number of partitions."""
+
+    _require_pyarrow()
+    config = current_app.config
+    directory = config["ARCHIVE_DIR"]
+    partitions = config["ARCHIVE_PARTITIONS"]
+    manifest = read_manifest(directory)
+    if manifest and manifest["partitions"] != partitions:
+        raise ValueError(
+            f"The archive in '{directory}' has {manifest['partitions']} "
+            f"partitions, not ARCHIVE_PARTITIONS={partitions}."
+        )
+
+    # the logs inserted from now on, even back-dated, are left to the next
+    # run: they are neither archived nor deleted.
+    last_log_id = db.session.scalar(select(func.max(BatteryLog.log_id)))
+    cutoff, earliest = compact_old_logs(cutoff)
+    if earliest is None:
+        return 0
+
+    archived = 0
+    day = truncate(earliest, "1d")
+    while day is not None:
+        archived += archive_day(
+            directory,
+            day,
+            _day_batches(day, batch_size, last_log_id),
+            partitions,
+            config["ARCHIVE_COMPRESSION"],
+        )
+        next_log = db.session.scalar(
+            select(func.min(BatteryLog.timestamp)).where(
+                BatteryLog.timestamp >= day + timedelta(days=1),
+                BatteryLog.timestamp < cutoff,
+                BatteryLog.log_id <= last_log_id,
+            )
+        )
+        day = truncate(next_log, "1d") if next_log else None
+
+    # the reads switch to the archive before the logs are deleted.
+    if manifest:
+        cutoff = max(cutoff, manifest["archived_until"])
+    _write_manifest(directory, cutoff, partitions)
+    delete_logs(cutoff, batch_size, last_log_id)
+    return archived
+
+
+def _read_partition(path, filters):
+    """Returns the filtered tables of the files of a partition. The files
+    are listed again when a compaction removes one of them meanwhile."""
+
+    while True:
+        try:
+            return [
+                pq.read_table(
+                    file,
+                    columns=list(ArchivedLog._fields),
+                    filters=filters,
+                    memory_map=True,
+                )
+                for file in _parquet_files(path)
+            ]
+        except FileNotFoundError:
+            continue
+
+
+def _read_battery(battery_id, start, end):
+    """Returns the archived logs of the battery in the range as a table
+    sorted by timestamp and log id."""
+
+    _require_pyarrow()
+    directory = current_app.config["ARCHIVE_DIR"]
+    manifest = read_manifest(directory)
+    partition = partition_of(battery_id, manifest["partitions"])
+    filters = [
+        ("battery_id", "==", str(battery_id)),
+        ("timestamp", ">=", start),
+        ("timestamp", "<", end),
+    ]
+    tables = []
+    day = truncate(start, "1d")
+    while day < end:
+        tables += _read_partition(
+            partition_dir(directory, day, partition), filters
+        )
+        day += timedelta(days=1)
+    if not tables:
+        return None
+    # a file read before and after its compaction is read twice.
+    return _drop_repeated(
+        pa.concat_tables(tables)
+        .sort_by([("timestamp", "ascending"), ("log_id", "ascending")])
+        .combine_chunks()
+    )
+
+
+def archived_logs(battery_id, start, end, after=None, limit=None):
+    """Returns up to `limit` archived logs of the battery in the range, in
+    timestamp and log id order, following the (timestamp, log_id) `after`."""
+
+    if after is not None:
+        start = max(start, after[0])
+    table = _read_battery(battery_id, start, end)
+    if table is None:
+        return []
+    if after is not None:
+        timestamps = table.column("timestamp")
+        after_timestamp = pa.scalar(after[0], pa.timestamp("us"))
+        table = table.filter(
+            pc.or_(
+                pc.greater(timestamps, after_timestamp),
+                pc.and_(
+                    pc.equal(timestamps, after_timestamp),
+                    pc.greater(table.column("log_id"), after[1]),
+                ),
+            )
+        )
+    if limit is not None:
+        table = table.slice(0, limit)
+    return [ArchivedLog(**row) for row in table.to_pylist()]
+
+
+def archived_buckets(battery_id, bucket, start, end):
+    """Returns the archived logs of the battery in the range aggregated per
+    bucket, like the history reads them from the database."""
+
+    table = _read_battery(battery_id, start, end)
+    if table is None:
+        return []
+    table = table.append_column(
+        "bucket_start",
+        pc.floor_temporal(
+            table.column("timestamp"),
+            multiple=TIME_BUCKETS[bucket][2],
+            unit="second",
+        ),
+    )
+    aggregated = table.group_by("bucket_start").aggregate(
+        [
+            ("log_id", "count"),
+            ("state_of_charge", "min"),
+            ("state_of_charge", "max"),
+            ("state_of_charge", "mean"),
+            ("voltage", "min"),
+            ("voltage", "max"),
+            ("voltage", "mean"),
+        ]
+    )
+    rows = sorted(aggregated.to_pylist(), key=lambda row: row["bucket_start"])
+    return [
+        {
+            "start": row["bucket_start"],
+            "count": row["log_id_count"],
+            "state_of_charge": {
+                "min": row["state_of_charge_min"],
+                "max": row["state_of_charge_max"],
+                "avg": row["state_of_charge_mean"],
+            },
+            "voltage": {
+                "min": row["voltage_min"],
+                "max": row["voltage_max"],
+                "avg": row["voltage_mean"],
+            },
+        }
+        for row in rows
+    ]
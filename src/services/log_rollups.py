@@ -0,0 +1,358 @@
+"""This module maintains and reads the hourly and daily rollups of the logs.
+
+The rollups are rebuilt from `battery_logs` by a compaction job that can be
+re-run over any range: the rollups of the range are deleted and inserted
+again in one transaction. Raw logs older than the retention period can then
+be pruned while their rollups stay; the pruned rollups are only ever merged
+with the logs added to their buckets later."""
+
+import logging
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import (
+    and_,
+    case,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+)
+
+from src.database.database import db
+from src.database.model_battery_log import BatteryLog
+from src.database.model_battery_log_rollup import BatteryLogRollup
+from src.utils.time_buckets import (
+    bucket_end,
+    bucket_expression,
+    bucket_start,
+    truncate,
+)
+
+from src.services.battery_health_check import out_of_band_clause
+
+logger = logging.getLogger()
+
+ROLLUP_BUCKETS = ("1h", "1d")
+
+
+def raw_logs_cutoff():
+    """Returns the time before which raw logs may have been pruned, or None
+    when the logs are kept forever."""
+
+    retention_days = current_app.config.get("LOG_RETENTION_DAYS")
+    if not retention_days:
+        return None
+    return truncate(datetime.utcnow() - timedelta(days=retention_days), "1d")
+
+
+def _validate_bucket(bucket):
+    """Raises ValueError if the rollups are not kept for the bucket."""
+
+    if bucket not in ROLLUP_BUCKETS:
+        raise ValueError(
+            f"Invalid rollup bucket '{bucket}', expected one of "
+            f"{', '.join(ROLLUP_BUCKETS)}"
+        )
+
+
+ROLLUP_COLUMNS = (
+    "count",
+    "state_of_charge_min",
+    "state_of_charge_max",
+    "state_of_charge_sum",
+    "state_of_charge_count",
+    "voltage_min",
+    "voltage_max",
+    "voltage_sum",
+    "voltage_count",
+    "out_of_band_count",
+    "last_log_id",
+)
+
+
+def _aggregates():
+    """Returns the aggregates of the logs of a rollup, in the order of
+    `ROLLUP_COLUMNS`."""
+
+    # pylint: disable=not-callable
+    return (
+        func.count(),
+        func.min(BatteryLog.state_of_charge),
+        func.max(BatteryLog.state_of_charge),
+        func.sum(BatteryLog.state_of_charge),
+        func.count(BatteryLog.state_of_charge),
+        func.min(BatteryLog.voltage),
+        func.max(BatteryLog.voltage),
+        func.sum(BatteryLog.voltage),
+        func.count(BatteryLog.voltage),
+        func.sum(case((out_of_band_clause(), 1), else_=0)),
+        func.max(BatteryLog.log_id),
+    )
+    # pylint: enable=not-callable
+
+
+def _is_pruned(bucket, bucket_column):
+    """Returns the clause matching the pruned rollup of a log's bucket."""
+
+    return and_(
+        BatteryLogRollup.bucket == bucket,
+        BatteryLogRollup.battery_id == BatteryLog.battery_id,
+        BatteryLogRollup.bucket_start == bucket_column,
+        BatteryLogRollup.pruned,
+    )
+
+
+def _merge(rollup, row):
+    """Adds the aggregates of later logs, in the order of `ROLLUP_COLUMNS`,
+    to a pruned rollup."""
+
+    values = dict(zip(ROLLUP_COLUMNS, row))
+    for name, value in values.items():
+        current = getattr(rollup, name)
+        if value is None or current is None:
+            merged = current if value is None else value
+        elif name.endswith("_min"):
+            merged = min(current, value)
+        elif name.endswith("_max") or name == "last_log_id":
+            merged = max(current, value)
+        else:
+            merged = current + value
+        setattr(rollup, name, merged)
+
+
+def _merge_late_logs(bucket, bucket_column, start, end):
+    """Merges the logs added to the buckets of pruned rollups since they
+    were last merged. Returns the number of rollups updated."""
+
+    rows = db.session.execute(
+        select(BatteryLog.battery_id, bucket_column, *_aggregates())
+        .join(BatteryLogRollup, _is_pruned(bucket, bucket_column))
+        .where(
+            BatteryLog.timestamp >= start,
+            BatteryLog.timestamp < end,
+            BatteryLog.log_id > func.coalesce(BatteryLogRollup.last_log_id, 0),
+        )
+        .group_by(BatteryLog.battery_id, bucket_column)
+    ).all()
+    for battery_id, start_value, *row in rows:
+        rollup = db.session.get(
+            BatteryLogRollup,
+            (bucket, battery_id, bucket_start(start_value)),
+        )
+        _merge(rollup, row)
+    return len(rows)
+
+
+def compact_rollups(bucket, start, end):
+    """Rebuilds the rollups of the buckets between start and end from the raw
+    logs. Returns the number of rollups written.
+
+    The range is widened to whole buckets, and never starts before the oldest
+    raw log. Pruned rollups are never rebuilt, since their logs are gone: the
+    logs added to their buckets since are merged into them instead."""
+
+    _validate_bucket(bucket)
+    earliest = db.session.scalar(select(func.min(BatteryLog.timestamp)))
+    if earliest is None:
+        return 0
+    start = max(truncate(start, bucket), truncate(earliest, bucket))
+    if end > truncate(end, bucket):
+        end = bucket_end(truncate(end, bucket), bucket)
+    if start >= end:
+        return 0
+
+    dialect_name = db.session.get_bind().dialect.name
+    bucket_column = bucket_expression(
+        BatteryLog.timestamp, bucket, dialect_name
+    )
+    merged = _merge_late_logs(bucket, bucket_column, start, end)
+
+    rollups = (
+        select(
+            literal(bucket),
+            BatteryLog.battery_id,
+            bucket_column,
+            *_aggregates(),
+        )
+        .where(
+            BatteryLog.timestamp >= start,
+            BatteryLog.timestamp < end,
+            ~exists().where(_is_pruned(bucket, bucket_column)),
+        )
+        .group_by(BatteryLog.battery_id, bucket_column)
+    )
+    db.session.execute(
+        delete(BatteryLogRollup)
+        .where(
+            BatteryLogRollup.bucket == bucket,
+            BatteryLogRollup.bucket_start >= start,
+            BatteryLogRollup.bucket_start < end,
+            ~BatteryLogRollup.pruned,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    result = db.session.execute(
+        insert(BatteryLogRollup).from_select(
+            ["bucket", "battery_id", "bucket_start", *ROLLUP_COLUMNS],
+            rollups,
+        )
+    )
+    db.session.commit()
+    logger.info(
+        "Compacted %s rollups of %s to %s (%s), %s merged",
+        result.rowcount,
+        start,
+        end,
+        bucket,
+        merged,
+    )
+    return result.rowcount + merged
+
+
+def prune_logs(cutoff, batch_size):
+    """Deletes the raw logs older than the cutoff, rounded down to a day, in
+    batches of `batch_size` rows (see `delete_logs`). The rollups of those
+    logs are rebuilt first. Returns the number of deleted logs."""
+
+    # the logs inserted from now on, even back-dated, are left to the next
+    # run: they may miss the rollups rebuilt below.
+    last_log_id = db.session.scalar(select(func.max(BatteryLog.log_id)))
+    cutoff, earliest = compact_old_logs(cutoff)
+    if earliest is None:
+        return 0
+    return delete_logs(cutoff, batch_size, last_log_id)
+
+
+def compact_old_logs(cutoff):
+    """Rebuilds the rollups of the raw logs older than the cutoff, rounded
+    down to a day. Returns the rounded cutoff and the time of the oldest log,
+    None when no log is older."""
+
+    cutoff = truncate(cutoff, "1d")
+    earliest = db.session.scalar(select(func.min(BatteryLog.timestamp)))
+    if earliest is None or earliest >= cutoff:
+        return cutoff, None
+    for bucket in ROLLUP_BUCKETS:
+        compact_rollups(bucket, earliest, cutoff)
+    return cutoff, earliest
+
+
+def delete_logs(cutoff, batch_size, last_log_id=None):
+    """Deletes the raw logs older than the cutoff, up to the log id
+    `last_log_id` when given, in batches of `batch_size` rows with a commit
+    after each batch, so locks are held briefly. Returns the number of
+    deleted logs.
+
+    The rollups older than the cutoff are marked as pruned first, so they
+    are never rebuilt from the logs left."""
+
+    db.session.execute(
+        update(BatteryLogRollup)
+        .where(
+            BatteryLogRollup.bucket_start < cutoff, ~BatteryLogRollup.pruned
+        )
+        .values(pruned=True)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    statement = select(BatteryLog.log_id).where(BatteryLog.timestamp < cutoff)
+    if last_log_id is not None:
+        statement = statement.where(BatteryLog.log_id <= last_log_id)
+    deleted = 0
+    while True:
+        batch = statement.limit(batch_size).scalar_subquery()
+        result = db.session.execute(
+            delete(BatteryLog)
+            .where(BatteryLog.log_id.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        if not result.rowcount:
+            break
+        deleted += result.rowcount
+        logger.info("Deleted %s logs older than %s", deleted, cutoff)
+    return deleted
+
+
+def _rollup_to_dict(row):
+    """Returns the response representation of a (merged) rollup row. The
+    averages skip the logs without the value, like AVG does."""
+
+    return {
+        "start": row[0],
+        "count": row[1],
+        "state_of_charge": {
+            "min": row[2],
+            "max": row[3],
+            "avg": row[4] / row[5] if row[5] else None,
+        },
+        "voltage": {
+            "min": row[6],
+            "max": row[7],
+            "avg": row[8] / row[9] if row[9] else None,
+        },
+        "out_of_band_count": row[10],
+    }
+
+
+def battery_rollups(battery_id, bucket, start, end):
+    """Returns the rollups of a battery between start and end."""
+
+    _validate_bucket(bucket)
+    rows = db.session.execute(
+        select(
+            BatteryLogRollup.bucket_start,
+            BatteryLogRollup.count,
+            BatteryLogRollup.state_of_charge_min,
+            BatteryLogRollup.state_of_charge_max,
+            BatteryLogRollup.state_of_charge_sum,
+            BatteryLogRollup.state_of_charge_count,
+            BatteryLogRollup.voltage_min,
+            BatteryLogRollup.voltage_max,
+            BatteryLogRollup.voltage_sum,
+            BatteryLogRollup.voltage_count,
+            BatteryLogRollup.out_of_band_count,
+        )
+        .where(
+            BatteryLogRollup.bucket == bucket,
+            BatteryLogRollup.battery_id == battery_id,
+            BatteryLogRollup.bucket_start >= truncate(start, bucket),
+            BatteryLogRollup.bucket_start < end,
+        )
+        .order_by(BatteryLogRollup.bucket_start)
+    )
+    return [_rollup_to_dict(row) for row in rows]
+
+
+def fleet_rollups(bucket, start, end):
+    """Returns the rollups of every battery merged per bucket."""
+
+    _validate_bucket(bucket)
+    rows = db.session.execute(
+        select(
+            BatteryLogRollup.bucket_start,
+            func.sum(BatteryLogRollup.count),
+            func.min(BatteryLogRollup.state_of_charge_min),
+            func.max(BatteryLogRollup.state_of_charge_max),
+            func.sum(BatteryLogRollup.state_of_charge_sum),
+            func.sum(BatteryLogRollup.state_of_charge_count),
+            func.min(BatteryLogRollup.voltage_min),
+            func.max(BatteryLogRollup.voltage_max),
+            func.sum(BatteryLogRollup.voltage_sum),
+            func.sum(BatteryLogRollup.voltage_count),
+            func.sum(BatteryLogRollup.out_of_band_count),
+        )
+        .where(
+            BatteryLogRollup.bucket == bucket,
+            BatteryLogRollup.bucket_start >= truncate(start, bucket),
+            BatteryLogRollup.bucket_start < end,
+        )
+        .group_by(BatteryLogRollup.bucket_start)
+        .order_by(BatteryLogRollup.bucket_start)
+    )
+    return [_rollup_to_dict(row) for row in rows]
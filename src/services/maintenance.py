@@ -0,0 +1,170 @@
+"""This module contains the maintenance commands of the service.
+
+The commands are registered on the Flask CLI, e.g.
+`flask --app src.app maintenance migrate-battery-logs --dry-run`."""
+
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+
+import click
+from flask import Blueprint, current_app
+
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.migrate_battery_logs import (
+    create_daily_partitions,
+    migrate_battery_logs,
+)
+from src.services.health_recompute import recompute_health
+from src.services.log_archive import archive_logs
+from src.services.log_rollups import (
+    ROLLUP_BUCKETS,
+    compact_rollups,
+    prune_logs,
+)
+
+logger = logging.getLogger()
+
+maintenance = Blueprint("maintenance", __name__, cli_group="maintenance")
+
+
+@maintenance.cli.command("migrate-battery-logs")
+@click.option(
+    "--partitioned", is_flag=True, help="Partition the logs by day (Postgres)."
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Print the statements without running them.",
+)
+def migrate_battery_logs_command(partitioned, dry_run):
+    """Move 'battery_logs' to the time series layout."""
+
+    statements = migrate_battery_logs(
+        db.engine, partitioned=partitioned, dry_run=dry_run
+    )
+    for statement in statements:
+        click.echo(f"{statement};")
+
+
+@maintenance.cli.command("create-log-partitions")
+@click.option("--days", default=7, show_default=True)
+def create_log_partitions_command(days):
+    """Create the daily partitions of 'battery_logs' for the next days."""
+
+    statements = create_daily_partitions(
+        db.engine, datetime.utcnow().date(), days
+    )
+    for statement in statements:
+        click.echo(f"{statement};")
+
+
+@maintenance.cli.command("compact-rollups")
+@click.option(
+    "--bucket",
+    type=click.Choice(ROLLUP_BUCKETS + ("all",)),
+    default="all",
+    show_default=True,
+)
+@click.option(
+    "--from",
+    "start",
+    type=click.DateTime(),
+    help="Start of the range, two days ago by default.",
+)
+@click.option(
+    "--to",
+    "end",
+    type=click.DateTime(),
+    help="End of the range, now by default.",
+)
+def compact_rollups_command(bucket, start, end):
+    """Rebuild the log rollups of a time range, safe to re-run."""
+
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=2)
+    buckets = ROLLUP_BUCKETS if bucket == "all" else (bucket,)
+    for name in buckets:
+        count = compact_rollups(name, start, end)
+        click.echo(f"{count} rollups of {name} written.")
+
+
+@maintenance.cli.command("prune-logs")
+@click.option(
+    "--older-than-days",
+    type=int,
+    help="Retention of the raw logs, LOG_RETENTION_DAYS by default.",
+)
+@click.option("--batch-size", default=10000, show_default=True)
+def prune_logs_command(older_than_days, batch_size):
+    """Delete the raw logs older than the retention, keeping their rollups."""
+
+    older_than_days = older_than_days or current_app.config.get(
+        "LOG_RETENTION_DAYS"
+    )
+    if not older_than_days:
+        raise click.UsageError(
+            "Set --older-than-days or LOG_RETENTION_DAYS to prune the logs."
+        )
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    deleted = prune_logs(cutoff, batch_size)
+    click.echo(f"{deleted} logs pruned.")
+
+
+@maintenance.cli.command("archive-logs")
+@click.option(
+    "--older-than-days",
+    type=int,
+    help="Age of the logs to archive, ARCHIVE_AFTER_DAYS by default.",
+)
+@click.option("--batch-size", default=10000, show_default=True)
+def archive_logs_command(older_than_days, batch_size):
+    """Move the logs older than the given age to the Parquet archive."""
+
+    older_than_days = older_than_days or current_app.config.get(
+        "ARCHIVE_AFTER_DAYS"
+    )
+    if not older_than_days:
+        raise click.UsageError(
+            "Set --older-than-days or ARCHIVE_AFTER_DAYS to archive the logs."
+        )
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    try:
+        archived = archive_logs(cutoff, batch_size)
+    except (RuntimeError, ValueError) as error:
+        raise click.ClickException(str(error)) from error
+    click.echo(
+        f"{archived} logs archived to {current_app.config['ARCHIVE_DIR']}."
+    )
+
+
+@maintenance.cli.command("recompute-health")
+@click.option("--batch-size", default=10000, show_default=True)
+@click.option(
+    "--workers",
+    default=1,
+    show_default=True,
+    help="Number of processes recomputing the batches in parallel.",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Report the changes without writing them.",
+)
+def recompute_health_command(batch_size, workers, dry_run):
+    """Recompute the health of every battery from its recent logs."""
+
+    total = db.session.query(Battery).count()
+    checked = 0
+    changes = Counter()
+    for count, range_changes in recompute_health(batch_size, workers, dry_run):
+        checked += count
+        changes.update(range_changes)
+        click.echo(
+            f"{checked}/{total} batteries checked, "
+            f"{sum(changes.values())} changed."
+        )
+    for (health, new_health), count in sorted(changes.items()):
+        verb = "would change" if dry_run else "changed"
+        click.echo(f"{count} batteries {verb} from {health} to {new_health}.")
@@ -0,0 +1,162 @@
+"""This module coalesces the readings of a battery before they are logged.
+
+Some devices report every second with unchanged values. With
+READING_COALESCING=True a reading is not written to `battery_logs` when its
+state of charge and voltage are within COALESCE_STATE_OF_CHARGE_DEADBAND and
+COALESCE_VOLTAGE_DEADBAND of the last logged reading of the battery, and it
+follows that reading by at most COALESCE_MAX_INTERVAL seconds. Such readings
+are counted as dropped, or as merged when they repeat the logged reading with
+the same timestamp. The state of the battery is updated either way.
+
+Out of band readings, which count against the health of the battery, and the
+first reading back in band are always logged, as is any reading that cannot
+be compared. The health checks and the issue rules thus see the same logs
+that matter to them. The last logged readings are kept per process for the
+COALESCE_CACHE_SIZE most recent batteries; a battery seen first by a process
+has its first reading logged."""
+
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from src.utils.metrics import metrics
+
+from src.services.battery_health_check import is_out_of_band
+
+coalesced_readings = metrics.counter(
+    "juicemaster_readings_coalesced_total",
+    "Number of readings not written to the logs by the coalescing.",
+    ("action",),
+)
+
+
+def _comparable(reading):
+    """Returns True if the reading has both values and is in band."""
+
+    return (
+        reading["state_of_charge"] is not None
+        and reading["voltage"] is not None
+        and not is_out_of_band(reading["state_of_charge"])
+    )
+
+
+class ReadingCoalescer:
+    """Filters the readings to log per battery, configured per app by
+    `init_app`. Disabled, every reading is logged."""
+
+    def __init__(self):
+        self.state_of_charge_deadband = 0.0
+        self.voltage_deadband = 0.0
+        self.max_interval = timedelta(0)
+        self.cache_size = 0
+        self.counters = {}
+        self._last = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """Whether the readings are coalesced."""
+
+        return self.cache_size > 0
+
+    def init_app(self, app):
+        """Reads the app's READING_COALESCING and COALESCE_* settings."""
+
+        self.state_of_charge_deadband = app.config.get(
+            "COALESCE_STATE_OF_CHARGE_DEADBAND", 0.5
+        )
+        self.voltage_deadband = app.config.get(
+            "COALESCE_VOLTAGE_DEADBAND", 0.05
+        )
+        self.max_interval = timedelta(
+            seconds=app.config.get("COALESCE_MAX_INTERVAL", 300)
+        )
+        self.cache_size = (
+            app.config.get("COALESCE_CACHE_SIZE", 100000)
+            if app.config.get("READING_COALESCING", False)
+            else 0
+        )
+        self.counters = dict.fromkeys(("logged", "dropped", "merged"), 0)
+        with self._lock:
+            self._last.clear()
+        app.extensions["reading_coalescer"] = self
+
+    def coalesce(self, battery_id, rows):
+        """Returns the readings of the battery to log, given as log rows in
+        timestamp order, and remembers the last of them."""
+
+        if not self.enabled:
+            return rows
+
+        logged = []
+        counts = dict.fromkeys(self.counters, 0)
+        with self._lock:
+            last = self._last.get(battery_id)
+            for row in rows:
+                action = self._action(last, row)
+                counts[action] += 1
+                if action == "logged":
+                    logged.append(row)
+                    if last is None or row["timestamp"] >= last["timestamp"]:
+                        last = row
+            if last is not None:
+                self._last[battery_id] = last
+                self._last.move_to_end(battery_id)
+                while len(self._last) > self.cache_size:
+                    self._last.popitem(last=False)
+            for action, count in counts.items():
+                self.counters[action] += count
+
+        for action in ("dropped", "merged"):
+            if counts[action]:
+                coalesced_readings.inc(counts[action], action=action)
+        return logged
+
+    def _action(self, last, row):
+        """Returns whether the reading is logged, dropped or merged."""
+
+        if last is None or not _comparable(row) or not _comparable(last):
+            return "logged"
+        state_of_charge = row["state_of_charge"]
+        voltage = row["voltage"]
+        elapsed = row["timestamp"] - last["timestamp"]
+        if elapsed < timedelta(0) or elapsed > self.max_interval:
+            return "logged"
+        if (
+            abs(state_of_charge - last["state_of_charge"])
+            > self.state_of_charge_deadband
+            or abs(voltage - last["voltage"]) > self.voltage_deadband
+        ):
+            return "logged"
+        if (
+            not elapsed
+            and state_of_charge == last["state_of_charge"]
+            and voltage == last["voltage"]
+        ):
+            return "merged"
+        return "dropped"
+
+    def forget(self, *battery_ids):
+        """Drops the last logged readings of the batteries, so their next
+        reading is logged."""
+
+        with self._lock:
+            for battery_id in battery_ids:
+                self._last.pop(battery_id, None)
+
+    def stats(self):
+        """Returns the settings and counters of the coalescing."""
+
+        with self._lock:
+            batteries = len(self._last)
+        return {
+            "enabled": self.enabled,
+            "state_of_charge_deadband": self.state_of_charge_deadband,
+            "voltage_deadband": self.voltage_deadband,
+            "max_interval": self.max_interval.total_seconds(),
+            "batteries": batteries,
+            **self.counters,
+        }
+
+
+reading_coalescer = ReadingCoalescer()
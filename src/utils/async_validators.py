@@ -0,0 +1,26 @@
+"""This module contains the input validator of the asyncio APIs, applying
+the same checks as `src.utils.input_validators.validate_input`."""
+
+import functools
+
+from quart import request, jsonify
+
+from src.utils.input_validators import validate_api_data
+
+
+def validate_input_async(api):
+    """Performs validation checks on input data."""
+
+    def decorator(func):
+        """Returns {"error": "error message"} if invalid."""
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            error = validate_api_data(api, await request.get_json())
+            if error:
+                return jsonify({"error": error}), 400
+            return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,93 @@
+"""This module contains the message brokers of the asynchronous ingestion.
+
+A broker holds messages until a consumer acknowledges them. Messages that a
+consumer could not process are requeued, so every message is delivered at
+least once. Another broker (e.g. Redis streams or SQS) can be used by
+implementing the same `publish`/`consume`/`ack`/`requeue` interface."""
+
+import threading
+from collections import deque
+
+
+class QueueFullError(Exception):
+    """Raised when the broker has no room for the published messages."""
+
+
+class LocalBroker:
+    """Bounded in-process broker. Its messages are lost if the process
+    stops without draining it."""
+
+    name = "local"
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._messages = deque()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def publish(self, messages):
+        """Adds the messages, all or none of them.
+        Raises QueueFullError if there is not enough room."""
+
+        with self._condition:
+            if len(self._messages) + len(messages) > self.max_size:
+                raise QueueFullError(
+                    f"Ingest queue is full ({len(self._messages)} of "
+                    f"{self.max_size} readings queued)"
+                )
+            self._messages.extend(messages)
+            self._condition.notify_all()
+
+    def consume(self, max_messages, timeout):
+        """Returns up to `max_messages` messages, waiting up to `timeout`
+        seconds for the first one. The messages stay in flight until they
+        are acknowledged or requeued."""
+
+        with self._condition:
+            if not self._messages:
+                self._condition.wait(timeout)
+            batch = []
+            while self._messages and len(batch) < max_messages:
+                batch.append(self._messages.popleft())
+            self._in_flight += len(batch)
+            return batch
+
+    def ack(self, messages):
+        """Marks the messages as processed."""
+
+        with self._condition:
+            self._in_flight -= len(messages)
+            self._condition.notify_all()
+
+    def requeue(self, messages):
+        """Puts the messages back in front of the queue, even if it is full,
+        so they are consumed again."""
+
+        with self._condition:
+            self._in_flight -= len(messages)
+            self._messages.extendleft(reversed(messages))
+            self._condition.notify_all()
+
+    def wake(self):
+        """Wakes up the waiting consumers."""
+
+        with self._condition:
+            self._condition.notify_all()
+
+    def join(self, timeout=None):
+        """Waits until every message is processed. Returns False on timeout."""
+
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._messages and not self._in_flight, timeout
+            )
+
+    def size(self):
+        """Returns the number of queued messages."""
+
+        return len(self._messages)
+
+    def in_flight(self):
+        """Returns the number of consumed but unacknowledged messages."""
+
+        return self._in_flight
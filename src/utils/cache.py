@@ -0,0 +1,96 @@
+"""This module contains the key-value cache backends.
+
+Every backend stores strings under string keys, expires them after a TTL and
+counts its evictions. The Redis backend takes any client with the
+`get`/`set(ex=...)`/`delete` interface of redis-py, so tests can pass a fake."""
+
+import time
+import threading
+from collections import OrderedDict
+
+
+class LRUCacheBackend:
+    """In-process least recently used cache with a TTL."""
+
+    name = "lru"
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the value of the key, or None if missing or expired."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Stores the value, evicting the least recently used entries."""
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        """Removes the keys."""
+
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def size(self):
+        """Returns the number of entries held."""
+
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Cache held in Redis, shared by every worker. Evictions are done by
+    Redis itself and are not counted here."""
+
+    name = "redis"
+
+    def __init__(self, client, ttl, prefix="juicemaster:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the value of the key, or None if missing or expired."""
+
+        value = self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode()
+        return value
+
+    def set(self, key, value):
+        """Stores the value with the TTL."""
+
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def delete(self, *keys):
+        """Removes the keys."""
+
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def size(self):
+        """The size of a shared cache is not tracked."""
+
+        return None
@@ -1,77 +1,140 @@
 """This module contains the input validator for batteries and issues APIs."""
 
 import functools
+from datetime import datetime, timezone
 
 from flask import request, jsonify
 
-from src.config.app_config import BATTERY_HEALTH_ORDER
-
-
-def validate_battery_data(data):
-    """Performs validation checks on the battery data.
-    Returns an error message if the data is not valid."""
-
-    state_of_charge = data.get("state_of_charge")
-    if state_of_charge:
-        if not isinstance(state_of_charge, (int, float)):
-            return "Invalid 'type' for state of charge"
-        if not 0 <= state_of_charge <= 100:
-            return f"Charge value '{state_of_charge}' is not in the valid range (0-100)."
-
-    capacity = data.get("capacity")
-    if capacity:
-        if not isinstance(capacity, (int, float)):
-            return "Invalid 'type' for capacity"
-
-    voltage = data.get("voltage")
-    if voltage:
-        if not isinstance(voltage, (int, float)):
-            return "Invalid 'type' for voltage"
-
-    battery_health = data.get("battery_health")
-    if battery_health:
-        if not isinstance(battery_health, str):
-            return "Invalid 'type' for battery health"
-        if battery_health not in BATTERY_HEALTH_ORDER:
-            return "Invalid 'value' for battery health"
+from src.utils.metrics import timed
+from src.utils.schemas import Field, compile_validator
 
-    return None
+from src.config.app_config import BATTERY_HEALTH_ORDER
 
 
-def validate_issue_data(data):
-    """Performs validation checks on the issue data.
+CHARGE_RANGE_ERROR = (
+    "Charge value '{value}' is not in the valid range (0-100)."
+)
+
+BATTERY_SCHEMA = {
+    "state_of_charge": Field(
+        "number", minimum=0, maximum=100, value_error=CHARGE_RANGE_ERROR
+    ),
+    "capacity": Field("number"),
+    "voltage": Field("number"),
+    "battery_health": Field("string", choices=BATTERY_HEALTH_ORDER),
+}
+
+ISSUE_SCHEMA = {
+    "issue_type": Field(
+        "string", required=True, type_error="Invalid 'type' for issue"
+    ),
+    "issue_description": Field(
+        "string", required=True, type_error="Invalid issue description"
+    ),
+}
+
+READING_SCHEMA = {
+    "battery_id": Field("uuid", required=True),
+    "state_of_charge": Field(
+        "number",
+        required=True,
+        minimum=0,
+        maximum=100,
+        value_error=CHARGE_RANGE_ERROR,
+    ),
+    "voltage": Field("number", required=True),
+    "timestamp": Field("timestamp"),
+}
+
+# the readings of a battery update, which may leave out either value.
+UPDATE_READING_SCHEMA = {
+    **READING_SCHEMA,
+    "state_of_charge": Field(
+        "number", minimum=0, maximum=100, value_error=CHARGE_RANGE_ERROR
+    ),
+    "voltage": Field("number"),
+}
+
+BULK_ISSUE_SCHEMA = {
+    **ISSUE_SCHEMA,
+    "battery_id": Field("uuid", required=True),
+    "occurrence_timestamp": Field(
+        "timestamp", value_error="Invalid timestamp '{value}'"
+    ),
+}
+
+validate_battery_data = compile_validator(
+    "validate_battery_data", "battery", BATTERY_SCHEMA
+)
+validate_issue_data = compile_validator(
+    "validate_issue_data", "issue", ISSUE_SCHEMA
+)
+validate_reading_data = compile_validator(
+    "validate_reading_data", "reading", READING_SCHEMA
+)
+validate_update_reading_data = compile_validator(
+    "validate_update_reading_data", "reading", UPDATE_READING_SCHEMA
+)
+validate_bulk_issue_data = compile_validator(
+    "validate_bulk_issue_data", "issue", BULK_ISSUE_SCHEMA
+)
+
+VALIDATORS = {
+    "subscriber": validate_battery_data,
+    "incidents": validate_issue_data,
+}
+timed_validators = {
+    api: timed("validate_input")(validator)
+    for api, validator in VALIDATORS.items()
+}
+
+
+def parse_timestamp(value):
+    """Parses an ISO-8601 timestamp into a naive UTC datetime.
+    Raises ValueError if the value is not a valid timestamp."""
+
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid timestamp '{value}'")
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def parse_time_range(args):
+    """Returns the (from, to) timestamps of the request arguments, either of
+    them None when missing. Raises ValueError if the range is not valid."""
+
+    start, end = args.get("from"), args.get("to")
+    start = parse_timestamp(start) if start is not None else None
+    end = parse_timestamp(end) if end is not None else None
+    if start is not None and end is not None and start > end:
+        raise ValueError("Invalid time range, 'from' is after 'to'")
+    return start, end
+
+
+def validate_api_data(api, data):
+    """Performs the validation checks of the api on the data.
     Returns an error message if the data is not valid."""
 
-    missing = [i for i in ["issue_type", "issue_description"] if i not in data]
-    if missing:
-        return f"Missing attributes for issue: {', '.join(missing)}"
-
-    if not isinstance(data.get("issue_type"), str):
-        return "Invalid 'type' for issue"
-
-    if not isinstance(data.get("issue_description"), str):
-        return "Invalid issue description"
-
-    return None
+    if api not in VALIDATORS:
+        raise ValueError("Invalid API specified.")
+    return timed_validators[api](data)
 
 
 def validate_input(api):
     """Performs validation checks on input data."""
 
+    validator = timed_validators.get(api)
+    if validator is None:
+        raise ValueError("Invalid API specified.")
+
     def decorator(func):
         """Returns {"error": "error message"} if invalid."""
 
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            data = request.get_json()
-
-            if api == "subscriber":
-                error = validate_battery_data(data=data)
-            elif api == "incidents":
-                error = validate_issue_data(data=data)
-            else:
-                raise ValueError("Invalid API specified.")
-
+            error = validator(request.get_json())
             if error:
                 return jsonify({"error": error}), 400
             return func(*args, **kwargs)
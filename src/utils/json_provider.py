@@ -0,0 +1,110 @@
+"""This module contains the JSON providers of the app.
+
+`OrjsonProvider` serializes the responses with orjson, which handles UUIDs,
+dataclasses and datetimes natively and writes bytes directly. By default the
+datetimes keep Flask's HTTP date format, so responses do not change; with
+JSON_DATETIME_FORMAT=iso they are written natively as ISO 8601, which is
+faster."""
+
+from datetime import date, datetime, timezone
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+JSON_PROVIDERS = ("auto", "orjson", "default")
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+MONTHS = (
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+)
+
+
+def http_date(value):
+    """Formats a date or datetime like `werkzeug.http.http_date`, treating
+    naive datetimes as UTC, without its locale independent slow path."""
+
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        time_of_day = f"{value.hour:02}:{value.minute:02}:{value.second:02}"
+    else:
+        time_of_day = "00:00:00"
+    return (
+        f"{WEEKDAYS[value.weekday()]}, {value.day:02} "
+        f"{MONTHS[value.month - 1]} {value.year:04} {time_of_day} GMT"
+    )
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider serializing with orjson, with the key order and the
+    value formats of the default provider."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.option = orjson.OPT_NON_STR_KEYS
+        if app.config.get("JSON_DATETIME_FORMAT", "http") != "iso":
+            self.option |= orjson.OPT_PASSTHROUGH_DATETIME
+
+    def _dumps(self, obj, sort_keys=None, indent=None):
+        """Returns the JSON bytes of the object."""
+
+        option = self.option
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self._default, option=option)
+
+    def _default(self, value):
+        """Formats the values orjson does not handle natively."""
+
+        if isinstance(value, date):
+            return http_date(value)
+        return self.default(value)
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps(
+            obj, kwargs.get("sort_keys"), kwargs.get("indent")
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or (
+            self.compact is False
+        )
+        return self._app.response_class(
+            self._dumps(obj, indent=indent) + b"\n", mimetype=self.mimetype
+        )
+
+
+def create_json_provider(app):
+    """Returns the JSON provider set by the app's JSON_PROVIDER setting:
+    orjson when installed (`auto`), `orjson` or Flask's `default`.
+    Raises ValueError if the provider is not valid or not installed."""
+
+    name = app.config.get("JSON_PROVIDER", "auto")
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"Invalid JSON provider '{name}'.")
+    if name == "orjson" and orjson is None:
+        raise ValueError("The orjson package is required for orjson.")
+    if name == "default" or orjson is None:
+        return DefaultJSONProvider(app)
+    return OrjsonProvider(app)
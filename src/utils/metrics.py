@@ -0,0 +1,221 @@
+"""This module contains the in-process metrics of the service.
+
+The metrics are kept per process in `metrics`, the default registry, and
+rendered in the Prometheus text format. Recording a value takes a lock and a
+bisect over the buckets, so the hot paths can be instrumented at all times.
+Nothing is shared between processes: with several workers a scrape reads
+the metrics of the worker that served it, so they are only correct with a
+single worker."""
+
+import bisect
+import functools
+import math
+import threading
+import time
+
+DURATION_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _format_labels(labelnames, labelvalues, extra=""):
+    """Returns the {name="value",...} of a series, empty without labels."""
+
+    labels = [
+        f'{name}="{_escape(value)}"'
+        for name, value in zip(labelnames, labelvalues)
+    ]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def _escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A value that only goes up, per set of label values."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """Adds the amount to the series of the labels."""
+
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Returns the value of the series of the labels."""
+
+        return self._values.get(
+            tuple(labels[name] for name in self.labelnames), 0
+        )
+
+    def samples(self):
+        """Yields the lines of every series."""
+
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Histogram:
+    """Counts the observed values per bucket, per set of label values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Records the value in the series of the labels."""
+
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # bucket counts, then the +Inf bucket, the sum and the count.
+                series = self._series[key] = [0] * (len(self.buckets) + 1)
+                series += [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels):
+        """Returns the number of values observed in the series."""
+
+        key = tuple(labels[name] for name in self.labelnames)
+        series = self._series.get(key)
+        return series[-1] if series else 0
+
+    def samples(self):
+        """Yields the cumulative bucket, sum and count lines of every
+        series."""
+
+        with self._lock:
+            series = [
+                (key, list(values)) for key, values in self._series.items()
+            ]
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), values):
+                cumulative += count
+                labels = _format_labels(
+                    self.labelnames, key, f'le="{_format_value(bound)}"'
+                )
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(values[-2])}"
+            yield f"{self.name}_count{labels} {values[-1]}"
+
+
+class MetricsRegistry:
+    """Holds the metrics of the process and renders them."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Returns the counter of the name, created on first use."""
+
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(
+        self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS
+    ):
+        """Returns the histogram of the name, created on first use."""
+
+        return self._register(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def render(self):
+        """Returns every metric in the Prometheus text format."""
+
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+function_duration = metrics.histogram(
+    "juicemaster_function_duration_seconds",
+    "Time spent in the instrumented functions.",
+    ("function",),
+)
+
+
+def timed(name):
+    """Decorator recording the duration of every call of the function in
+    `function_duration`, labelled with the given name."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                function_duration.observe(
+                    time.perf_counter() - start, function=name
+                )
+
+        return wrapper
+
+    return decorator
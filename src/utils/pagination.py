@@ -0,0 +1,75 @@
+"""This module contains the helpers for keyset (cursor) pagination.
+
+A cursor is the sort key of the last item of a page, encoded as an opaque
+url-safe string. The next page is read with `WHERE (key) > (cursor)`, which
+is served by an index on the sort key however deep the page is."""
+
+import json
+import base64
+
+from src.config.app_config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+def encode_cursor(*values):
+    """Encodes the sort key values of the last item of a page."""
+
+    payload = json.dumps([str(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor, size):
+    """Decodes a cursor into its `size` sort key values, as strings.
+    Raises ValueError if the cursor is not valid."""
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as error:
+        raise ValueError(f"Invalid cursor '{cursor}'") from error
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return values
+
+
+def parse_limit(value):
+    """Returns the page size requested by the `limit` parameter.
+    Raises ValueError if the value is not valid."""
+
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError as error:
+        raise ValueError(f"Invalid limit '{value}'") from error
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(
+            f"Limit '{value}' is not in the valid range (1-{MAX_PAGE_SIZE})."
+        )
+    return limit
+
+
+def paginate(query, limit, key):
+    """Reads one page of the ordered query. Returns the items and the cursor
+    of the next page, or None on the last page. `key` returns the sort key
+    values of an item."""
+
+    return split_page(query.limit(limit + 1).all(), limit, key)
+
+
+def split_page(items, limit, key):
+    """Splits the `limit + 1` items read for a page into the page and the
+    cursor of the next page, or None on the last page."""
+
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(*key(items[-1]))
+
+
+def page_payload(name, items, next_cursor, serializer):
+    """Returns the response of a page: its items serialized under `name` and
+    the cursor of the next page."""
+
+    return {
+        name: [serializer(item) for item in items],
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,75 @@
+"""This module contains the sampling profiler of the requests.
+
+One daemon thread wakes every `interval` seconds and records the current
+stack of every thread serving a profiled request, so the requests themselves
+only register and unregister their thread. The samples are kept as collapsed
+stacks, `module:function;module:function count` lines from the outermost
+frame, the input of flamegraph.pl and speedscope."""
+
+import collections
+import sys
+import threading
+import time
+
+
+def collapse_stack(frame):
+    """Returns the collapsed `module:function;...` stack of the frame."""
+
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Samples the stacks of the threads between `begin` and `end`."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._samples = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def begin(self, thread_id):
+        """Starts sampling the thread, and the sampler on first use."""
+
+        with self._lock:
+            self._samples[thread_id] = collections.Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="profiler", daemon=True
+                )
+                self._thread.start()
+
+    def end(self, thread_id):
+        """Stops sampling the thread and returns its collapsed stacks with
+        their number of samples."""
+
+        with self._lock:
+            return self._samples.pop(thread_id, collections.Counter())
+
+    def sample(self):
+        """Records the current stack of every sampled thread."""
+
+        frames = sys._current_frames()  # pylint: disable=protected-access
+        with self._lock:
+            for thread_id, samples in self._samples.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    samples[collapse_stack(frame)] += 1
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.sample()
+
+
+def write_collapsed(path, samples):
+    """Writes the collapsed stacks to the file, one `stack count` line
+    each."""
+
+    with open(path, "w", encoding="utf-8") as file:
+        for stack, count in samples.most_common():
+            file.write(f"{stack} {count}\n")
@@ -0,0 +1,212 @@
+"""This module compiles the declarative schemas of the request bodies.
+
+A schema is a {key: Field} map. `compile_validator` turns it once into a
+function running the check of every field, in the order of the fields, which
+returns the error message of the first failed check or None. The messages
+and bounds of the checks are prepared once, missing values are reported
+together, and only None counts as missing: 0, 0.0 and empty strings are
+checked like any value. Numbers are ints or floats, booleans are not."""
+
+import functools
+import math
+import re
+import uuid
+from datetime import datetime
+
+NUMBER_TYPES = (int, float)
+UUID_CACHE_SIZE = 4096
+
+_UUID_PATTERN = re.compile(
+    r"[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}"
+)
+
+
+def is_uuid(value):
+    """Returns True if the value is a UUID or its string form."""
+
+    if isinstance(value, uuid.UUID):
+        return True
+    if not isinstance(value, str):
+        return False
+    if _UUID_PATTERN.fullmatch(value):
+        return True
+    # the other forms accepted by uuid.UUID, e.g. without hyphens.
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+class Field:
+    """The checks of one attribute of a schema.
+
+    `kind` is one of "number", "string", "uuid" or "timestamp". The messages
+    are formatted with the `value` of the attribute; by default they name the
+    attribute with spaces instead of underscores."""
+
+    def __init__(
+        self,
+        kind,
+        required=False,
+        minimum=None,
+        maximum=None,
+        choices=None,
+        type_error=None,
+        value_error=None,
+    ):
+        self.kind = kind
+        self.required = required
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = tuple(choices) if choices is not None else None
+        self.type_error = type_error
+        self.value_error = value_error
+
+
+def _number_check(label, field):
+    type_error = field.type_error or f"Invalid 'type' for {label}"
+
+    def check(value):
+        if type(value) not in NUMBER_TYPES:
+            return type_error
+        return None
+
+    if field.minimum is None and field.maximum is None:
+        return check
+
+    # a missing bound is infinite; NaN fails either way.
+    minimum = -math.inf if field.minimum is None else field.minimum
+    maximum = math.inf if field.maximum is None else field.maximum
+    value_error = field.value_error or (
+        f"Invalid value '{{value}}' for {label}, expected "
+        f"{field.minimum} to {field.maximum}"
+    )
+
+    def bounded_check(value):
+        if type(value) not in NUMBER_TYPES:
+            return type_error
+        if not minimum <= value <= maximum:
+            return value_error.format(value=value)
+        return None
+
+    return bounded_check
+
+
+def _string_check(label, field):
+    type_error = field.type_error or f"Invalid 'type' for {label}"
+    choices = frozenset(field.choices) if field.choices is not None else None
+    value_error = field.value_error or f"Invalid 'value' for {label}"
+
+    def check(value):
+        if not isinstance(value, str):
+            return type_error
+        if choices is not None and value not in choices:
+            return value_error.format(value=value)
+        return None
+
+    return check
+
+
+def _uuid_check(label, field):
+    value_error = field.value_error or f"Invalid {label} '{{value}}'"
+
+    # the readings of a batch mostly share a few ids.
+    @functools.lru_cache(maxsize=UUID_CACHE_SIZE)
+    def valid_string(value):
+        return _UUID_PATTERN.fullmatch(value) is not None or is_uuid(value)
+
+    def check(value):
+        if valid_string(value) if isinstance(value, str) else is_uuid(value):
+            return None
+        return value_error.format(value=value)
+
+    return check
+
+
+def _timestamp_check(label, field):
+    value_error = field.value_error or f"Invalid {label} '{{value}}'"
+
+    def check(value):
+        if not isinstance(value, str):
+            return value_error.format(value=value)
+        try:
+            datetime.fromisoformat(value)
+        except ValueError:
+            return value_error.format(value=value)
+        return None
+
+    return check
+
+
+FIELD_CHECKS = {
+    "number": _number_check,
+    "string": _string_check,
+    "uuid": _uuid_check,
+    "timestamp": _timestamp_check,
+}
+
+
+def compile_validator(name, object_name, fields):
+    """Returns a function checking a payload against the {key: Field}
+    schema, which returns an error message or None. `object_name` names the
+    payload in the messages, e.g. "Invalid 'type' for reading".
+    Raises ValueError if a field has an unknown kind.
+
+    The function has a `many` attribute, checking a list of payloads, which
+    returns the (index, error message) of the invalid ones."""
+
+    checks = []
+    for key, field in fields.items():
+        if field.kind not in FIELD_CHECKS:
+            raise ValueError(f"Invalid field kind '{field.kind}'.")
+        check = FIELD_CHECKS[field.kind](key.replace("_", " "), field)
+        checks.append((key, check, field.required))
+    checks = tuple(checks)
+    required = tuple(key for key, field in fields.items() if field.required)
+    type_error = f"Invalid 'type' for {object_name}"
+    missing_error = f"Missing attributes for {object_name}: "
+
+    def validator(data):
+        if not isinstance(data, dict):
+            return type_error
+        error = None
+        for key, check, is_required in checks:
+            value = data.get(key)
+            if value is None:
+                # missing values are reported before the failed checks.
+                if is_required:
+                    return missing_error + ", ".join(
+                        key for key in required if data.get(key) is None
+                    )
+            elif error is None:
+                error = check(value)
+        return error
+
+    def many(items):
+        errors = []
+        for index, data in enumerate(items):
+            error = validator(data)
+            if error is not None:
+                errors.append((index, error))
+        return errors
+
+    validator.__name__ = validator.__qualname__ = name
+    validator.__doc__ = (
+        f"Performs validation checks on the {object_name} data.\n"
+        "    Returns an error message if the data is not valid."
+    )
+    many.__name__ = many.__qualname__ = f"{name}_many"
+    many.__doc__ = (
+        f"Performs validation checks on a list of {object_name} data.\n"
+        "    Returns the (index, error message) of the invalid items."
+    )
+    validator.many = many
+    return validator
+
+
+def validate_items(validator, items):
+    """Returns the (index, error message) of the invalid items, checked by
+    the `many` function of a compiled validator."""
+
+    return validator.many(items)
@@ -0,0 +1,62 @@
+"""This module contains the response representations of the models.
+
+Each serializer is built once from its field map into a function that reads
+every attribute with one `attrgetter` and zips them with the keys. The values
+are left as they are, UUIDs and datetimes included, and formatted by the
+app's JSON provider. The serializers read attributes, so they accept model
+instances as well as rows of column-projected queries."""
+
+from operator import attrgetter
+
+
+def compile_serializer(name, fields):
+    """Returns a function building the {key: obj.attribute} dict of the
+    fields, given as a {key: attribute} map."""
+
+    keys = tuple(fields)
+    getter = attrgetter(*fields.values())
+    if len(keys) == 1:
+        # attrgetter returns the value itself for a single attribute.
+        getter = attrgetter(*fields.values(), *fields.values())
+
+    def serializer(obj):
+        return dict(zip(keys, getter(obj)))
+
+    serializer.__name__ = serializer.__qualname__ = name
+    serializer.__doc__ = "Returns the response representation of the object."
+    return serializer
+
+
+BATTERY_FIELDS = {
+    "id": "battery_id",
+    "state_of_charge": "state_of_charge",
+    "capacity": "capacity",
+    "voltage": "voltage",
+    "battery_health": "battery_health",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+BATTERY_LOG_FIELDS = {
+    "timestamp": "timestamp",
+    "state_of_charge": "state_of_charge",
+    "voltage": "voltage",
+}
+
+ISSUE_FIELDS = {
+    "id": "issue_id",
+    "issue_type": "issue_type",
+    "issue_description": "issue_description",
+    "occurrence_timestamp": "occurrence_timestamp",
+}
+
+FLEET_ISSUE_FIELDS = {**ISSUE_FIELDS, "battery_id": "battery_id"}
+
+battery_to_dict = compile_serializer("battery_to_dict", BATTERY_FIELDS)
+battery_log_to_dict = compile_serializer(
+    "battery_log_to_dict", BATTERY_LOG_FIELDS
+)
+issue_to_dict = compile_serializer("issue_to_dict", ISSUE_FIELDS)
+fleet_issue_to_dict = compile_serializer(
+    "fleet_issue_to_dict", FLEET_ISSUE_FIELDS
+)
@@ -0,0 +1,64 @@
+"""This module contains the SQL expressions truncating timestamps to buckets.
+
+Postgres truncates with `date_trunc`, SQLite (used by the tests) formats the
+timestamp with `strftime`, which returns the bucket start as a string."""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+# bucket name: (date_trunc unit, strftime format, length in seconds). The
+# SQLite formats match how SQLAlchemy stores datetimes, so the bucket starts
+# compare correctly with stored timestamps.
+TIME_BUCKETS = {
+    "1m": ("minute", "%Y-%m-%d %H:%M:00.000000", 60),
+    "1h": ("hour", "%Y-%m-%d %H:00:00.000000", 3600),
+    "1d": ("day", "%Y-%m-%d 00:00:00.000000", 86400),
+}
+
+
+def validate_bucket(bucket):
+    """Raises ValueError if the bucket is unknown."""
+
+    if bucket not in TIME_BUCKETS:
+        raise ValueError(
+            f"Invalid bucket '{bucket}', expected one of "
+            f"{', '.join(TIME_BUCKETS)}"
+        )
+
+
+def bucket_expression(column, bucket, dialect_name):
+    """Returns the SQL expression of the start of the column's bucket.
+    Raises ValueError if the bucket is unknown."""
+
+    validate_bucket(bucket)
+    unit, sqlite_format, _ = TIME_BUCKETS[bucket]
+    if dialect_name == "sqlite":
+        return func.strftime(sqlite_format, column)
+    return func.date_trunc(unit, column)
+
+
+def bucket_start(value):
+    """Returns the bucket start read from the database as a datetime."""
+
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def truncate(value, bucket):
+    """Returns the start of the bucket the datetime falls into."""
+
+    seconds = TIME_BUCKETS[bucket][2]
+    start = value.replace(second=0, microsecond=0)
+    if seconds >= 3600:
+        start = start.replace(minute=0)
+    if seconds >= 86400:
+        start = start.replace(hour=0)
+    return start
+
+
+def bucket_end(value, bucket):
+    """Returns the end of the bucket that starts at the given datetime."""
+
+    return value + timedelta(seconds=TIME_BUCKETS[bucket][2])
@@ -0,0 +1,37 @@
+"""This method contains smoke tests for the asyncio (ASGI) app."""
+
+import os
+import unittest
+from importlib.util import find_spec
+
+ASGI_PACKAGES = ("quart", "aiosqlite")
+
+
+@unittest.skipIf(
+    not all(find_spec(package) for package in ASGI_PACKAGES),
+    "requires the packages of requirements-asgi.txt",
+)
+class AsgiAppTestCase(unittest.TestCase):
+    """Test case for the creation of the ASGI app."""
+
+    def setUp(self):
+        """Set up the ASGI app on an in-memory SQLite database."""
+
+        # pylint: disable=import-outside-toplevel
+        from src.asgi import create_asgi_app
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_asgi_app()
+
+    def test_create_app(self):
+        """Test that the app serves the battery and issue routes on the
+        aiosqlite driver."""
+
+        engine = self.app.extensions["async_engine"]
+        self.assertEqual(engine.url.drivername, "sqlite+aiosqlite")
+        self.assertTrue(self.app.config["TESTING"])
+
+        rules = {rule.rule for rule in self.app.url_map.iter_rules()}
+        self.assertIn("/api/v1/batteries", rules)
+        self.assertTrue(any("issues" in rule for rule in rules))
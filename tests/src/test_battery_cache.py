@@ -0,0 +1,201 @@
+"""This method contains unittests for the battery cache."""
+
+import os
+import time
+import unittest
+
+from sqlalchemy import delete
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.services.battery_cache import battery_cache
+from src.utils.cache import LRUCacheBackend, RedisCacheBackend
+
+
+class FakeRedis:
+    """Holds the keys in a dict, with the redis-py interface used."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        """Returns the value of the key as bytes."""
+
+        value = self.values.get(key)
+        return value.encode() if value is not None else None
+
+    def set(self, key, value, ex=None):  # pylint: disable=unused-argument
+        """Stores the value of the key."""
+
+        self.values[key] = value
+
+    def delete(self, *keys):
+        """Removes the keys."""
+
+        for key in keys:
+            self.values.pop(key, None)
+
+
+class CacheBackendTestCase(unittest.TestCase):
+    """Test case for the cache backends."""
+
+    def test_lru_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted first."""
+
+        cache = LRUCacheBackend(max_size=2, ttl=30)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        self.assertEqual(cache.get("a"), "1")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.size(), 2)
+
+    def test_lru_expires_entries(self):
+        """Test that entries are not returned after their TTL."""
+
+        cache = LRUCacheBackend(max_size=2, ttl=0)
+        cache.set("a", "1")
+        time.sleep(0.01)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.size(), 0)
+
+    def test_redis_backend(self):
+        """Test that the Redis backend prefixes the keys and decodes."""
+
+        client = FakeRedis()
+        cache = RedisCacheBackend(client, ttl=30)
+        cache.set("a", "1")
+
+        self.assertEqual(cache.get("a"), "1")
+        self.assertIn("juicemaster:a", client.values)
+        cache.delete("a")
+        self.assertIsNone(cache.get("a"))
+
+
+class BatteryCacheTestCase(unittest.TestCase):
+    """Test case for the cached battery lookups."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        os.environ["BATTERY_CACHE_BACKEND"] = "lru"
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            battery = Battery(
+                state_of_charge=50,
+                capacity=100,
+                voltage=12,
+                battery_health="GOOD",
+            )
+            db.session.add(battery)
+            db.session.commit()
+            self.battery_id = str(battery.battery_id)
+
+    def tearDown(self):
+        """Tear down the test environment."""
+
+        del os.environ["BATTERY_CACHE_BACKEND"]
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_lookup_is_cached(self):
+        """Test that the second lookup is served from the cache."""
+
+        first = self.client.get(f"/api/v1/batteries/{self.battery_id}")
+        second = self.client.get(f"/api/v1/batteries/{self.battery_id}")
+
+        self.assertEqual(first.json, second.json)
+        self.assertEqual(second.json["state_of_charge"], 50)
+        stats = self.client.get("/debug/cache").json
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_update_invalidates(self):
+        """Test that an update is visible to the next lookup."""
+
+        self.client.get(f"/api/v1/batteries/{self.battery_id}")
+        self.client.put(
+            f"/api/v1/batteries/{self.battery_id}",
+            json={"state_of_charge": 60, "voltage": 12},
+        )
+        response = self.client.get(f"/api/v1/batteries/{self.battery_id}")
+
+        self.assertEqual(response.json["state_of_charge"], 60)
+
+    def test_ingest_invalidates(self):
+        """Test that ingested readings are visible to the next lookup."""
+
+        self.client.get(f"/api/v1/batteries/{self.battery_id}")
+        self.client.post(
+            "/api/v1/batteries/readings",
+            json=[
+                {
+                    "battery_id": self.battery_id,
+                    "state_of_charge": 70,
+                    "voltage": 12,
+                }
+            ],
+        )
+        response = self.client.get(f"/api/v1/batteries/{self.battery_id}")
+
+        self.assertEqual(response.json["state_of_charge"], 70)
+
+    def test_delete_invalidates(self):
+        """Test that a deleted battery is no longer found."""
+
+        self.client.get(f"/api/v1/batteries/{self.battery_id}")
+        self.client.delete(f"/api/v1/batteries/{self.battery_id}")
+        response = self.client.get(f"/api/v1/batteries/{self.battery_id}")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_existence_is_read_from_database(self):
+        """Test that a battery deleted through another worker, while still
+        cached, no longer takes issues."""
+
+        self.client.get(f"/api/v1/batteries/{self.battery_id}")
+        with self.app.app_context():
+            db.session.execute(delete(Battery))
+            db.session.commit()
+
+        response = self.client.post(
+            f"/api/v1/batteries/{self.battery_id}/issues",
+            json={
+                "issue_type": "Overheating",
+                "issue_description": "Too hot",
+            },
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            f"/api/v1/batteries/{self.battery_id}/issues"
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_disabled_by_default(self):
+        """Test that the cache is off unless a backend is set."""
+
+        del os.environ["BATTERY_CACHE_BACKEND"]
+        create_app()
+        os.environ["BATTERY_CACHE_BACKEND"] = "lru"
+
+        self.assertEqual(battery_cache.stats()["backend"], "none")
+
+    def test_redis_backend_lookup(self):
+        """Test the lookups through the Redis backend."""
+
+        battery_cache.backend = RedisCacheBackend(FakeRedis(), ttl=30)
+        self.client.get(f"/api/v1/batteries/{self.battery_id}")
+        response = self.client.get(f"/api/v1/batteries/{self.battery_id}")
+
+        self.assertEqual(response.json["id"], self.battery_id)
+        self.assertEqual(battery_cache.stats()["hits"], 1)
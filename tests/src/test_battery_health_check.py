@@ -2,11 +2,18 @@
 
 import os
 import unittest
-from datetime import datetime
+import uuid
+from datetime import datetime, timedelta
 from unittest.mock import patch
 
+from src.database.database import db
 from src.database.model_battery_log import BatteryLog
-from src.services.battery_health_check import HealthCheck
+from src.services.battery_health_check import (
+    HealthCheck,
+    RowScanStrategy,
+    SqlAggregateStrategy,
+    get_strategy,
+)
 from src.app import create_app
 
 
@@ -101,3 +108,67 @@ class HealthCheckTestCase(unittest.TestCase):
 
         # Assert that the health is updated
         self.assertNotEqual(result, "VERY GOOD")
+
+
+class ExceedCountStrategyTestCase(unittest.TestCase):
+    """Test cases for the exceed count strategies of the health check."""
+
+    def setUp(self):
+        """Set up the test data."""
+
+        self.request_time = datetime.utcnow()
+        self.battery_ids = [uuid.uuid4() for _ in range(3)]
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        for battery_id, state_of_charge in zip(self.battery_ids, [10, 50, 90]):
+            db.session.add(
+                BatteryLog(
+                    battery_id=battery_id,
+                    voltage=12,
+                    state_of_charge=state_of_charge,
+                    timestamp=self.request_time - timedelta(hours=1),
+                )
+            )
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test data and the Flask app context."""
+
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_strategies_agree(self):
+        """Test that the scan and aggregate strategies count the same logs."""
+
+        since = self.request_time - timedelta(days=1)
+        for battery_id in self.battery_ids:
+            self.assertEqual(
+                RowScanStrategy().count(
+                    battery_id, None, since, self.request_time
+                ),
+                SqlAggregateStrategy().count(
+                    battery_id, None, since, self.request_time
+                ),
+            )
+
+    def test_count_many(self):
+        """Test that the exceed counts of many batteries are grouped."""
+
+        since = self.request_time - timedelta(days=1)
+        counts = SqlAggregateStrategy.count_many(self.battery_ids, since)
+
+        self.assertEqual(
+            counts, {self.battery_ids[0]: 1, self.battery_ids[2]: 1}
+        )
+
+    def test_invalid_strategy(self):
+        """Test that an unknown health check engine is rejected."""
+
+        with self.assertRaises(ValueError):
+            get_strategy("unknown")
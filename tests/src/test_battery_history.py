@@ -0,0 +1,96 @@
+"""This method contains unittests for Battery History API."""
+
+import os
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+
+
+class BatteryHistoryTestCase(unittest.TestCase):
+    """Test case for the Battery History API."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+        self.battery_id = uuid.uuid4()
+
+        with self.app.app_context():
+            db.create_all()
+            db.session.add(
+                Battery(
+                    battery_id=self.battery_id,
+                    state_of_charge=50,
+                    capacity=100,
+                    voltage=12,
+                    battery_health="EXCELLENT",
+                )
+            )
+            # two hours of logs, every 20 minutes
+            for minutes, state_of_charge in zip(
+                range(0, 120, 20), [10, 20, 30, 60, 70, 80]
+            ):
+                db.session.add(
+                    BatteryLog(
+                        battery_id=self.battery_id,
+                        state_of_charge=state_of_charge,
+                        voltage=12,
+                        timestamp=datetime(2023, 6, 1, 10)
+                        + timedelta(minutes=minutes),
+                    )
+                )
+            db.session.commit()
+
+        self.url = (
+            f"/api/v1/batteries/{self.battery_id}/logs"
+            f"?from=2023-06-01T00:00:00&to=2023-06-02T00:00:00"
+        )
+
+    def tearDown(self):
+        """Tear down the test environment."""
+
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_get_logs_hourly(self):
+        """Test aggregating the logs per hour."""
+
+        response = self.client.get(f"{self.url}&bucket=1h")
+        self.assertEqual(response.status_code, 200)
+
+        buckets = response.json["buckets"]
+        self.assertEqual([bucket["count"] for bucket in buckets], [3, 3])
+        self.assertEqual(buckets[0]["state_of_charge"]["min"], 10)
+        self.assertEqual(buckets[1]["state_of_charge"]["avg"], 70)
+
+    def test_get_raw_logs_pages(self):
+        """Test reading the raw logs page by page."""
+
+        response = self.client.get(f"{self.url}&limit=4")
+        self.assertEqual(len(response.json["logs"]), 4)
+
+        cursor = response.json["next_cursor"]
+        response = self.client.get(f"{self.url}&limit=4&cursor={cursor}")
+        self.assertEqual(len(response.json["logs"]), 2)
+        self.assertIsNone(response.json["next_cursor"])
+
+    def test_get_logs_invalid_bucket(self):
+        """Test that an unknown bucket is rejected."""
+
+        response = self.client.get(f"{self.url}&bucket=1w")
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_logs_unknown_battery(self):
+        """Test that the logs of an unknown battery are not found."""
+
+        response = self.client.get(f"/api/v1/batteries/{uuid.uuid4()}/logs")
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,131 @@
+"""This method contains unittests for Battery Ingest API."""
+
+import os
+import unittest
+import uuid
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.database.read_models import select_battery
+
+
+class BatteryIngestTestCase(unittest.TestCase):
+    """Test case for the bulk readings API."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        # Create a test Flask app
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+        self.battery_ids = [uuid.uuid4(), uuid.uuid4()]
+
+        with self.app.app_context():
+            for battery_id in self.battery_ids:
+                db.session.add(
+                    Battery(
+                        battery_id=battery_id,
+                        state_of_charge=50,
+                        capacity=100,
+                        voltage=12,
+                        battery_health="EXCELLENT",
+                    )
+                )
+            db.session.commit()
+
+    def tearDown(self):
+        """Tear down the test environment."""
+
+        # Clean up the test database
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_add_readings(self):
+        """Test storing readings for several batteries at once."""
+
+        response = self.client.post(
+            "/api/v1/batteries/readings",
+            json=[
+                {
+                    "battery_id": str(self.battery_ids[0]),
+                    "state_of_charge": 70,
+                    "voltage": 12.5,
+                    "timestamp": "2023-06-01T10:00:00Z",
+                },
+                {
+                    "battery_id": str(self.battery_ids[1]),
+                    "state_of_charge": 0,
+                    "voltage": 11.1,
+                },
+            ],
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["accepted"], 2)
+
+        with self.app.app_context():
+            self.assertEqual(BatteryLog.query.count(), 2)
+            battery = select_battery(self.battery_ids[1])
+            self.assertEqual(battery.state_of_charge, 0)
+
+    def test_add_readings_health(self):
+        """Test that the health is evaluated after every reading of a batch."""
+
+        response = self.client.post(
+            "/api/v1/batteries/readings",
+            json=[
+                {
+                    "battery_id": str(self.battery_ids[0]),
+                    "state_of_charge": state_of_charge,
+                    "voltage": 12,
+                }
+                for state_of_charge in [90, 10, 95, 5]
+            ],
+        )
+        self.assertEqual(response.status_code, 200)
+
+        with self.app.app_context():
+            self.assertEqual(BatteryLog.query.count(), 4)
+            battery = db.session.get(Battery, self.battery_ids[0])
+            self.assertEqual(battery.battery_health, "GOOD")
+
+    def test_add_readings_partial_failure(self):
+        """Test that invalid readings are reported without failing the batch."""
+
+        response = self.client.post(
+            "/api/v1/batteries/readings",
+            json=[
+                {
+                    "battery_id": str(self.battery_ids[0]),
+                    "state_of_charge": 70,
+                    "voltage": 12.5,
+                },
+                {
+                    "battery_id": str(uuid.uuid4()),
+                    "state_of_charge": 70,
+                    "voltage": 12.5,
+                },
+                {"battery_id": "not-a-uuid", "voltage": 12.5},
+            ],
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["accepted"], 1)
+        self.assertEqual(
+            [result["status"] for result in response.json["results"]],
+            ["ok", "error", "error"],
+        )
+
+    def test_add_readings_invalid_batch(self):
+        """Test that a body which is not a list of readings is rejected."""
+
+        response = self.client.post(
+            "/api/v1/batteries/readings", json={"state_of_charge": 70}
+        )
+        self.assertEqual(response.status_code, 400)
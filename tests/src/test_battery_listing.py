@@ -0,0 +1,113 @@
+"""This method contains unittests for the paginated battery listing."""
+
+import os
+import unittest
+from datetime import datetime
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_state import BatteryState
+from src.database.read_models import select_batteries, select_battery
+
+
+class BatteryListingTestCase(unittest.TestCase):
+    """Test case for the paginated battery listing."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            for state_of_charge in range(0, 100, 20):
+                battery = Battery(
+                    state_of_charge=state_of_charge,
+                    capacity=100,
+                    voltage=12,
+                    battery_health="GOOD"
+                    if state_of_charge < 40
+                    else "EXCELLENT",
+                )
+                db.session.add(battery)
+                db.session.add(
+                    BatteryState(
+                        battery_id=battery.battery_id,
+                        state_of_charge=state_of_charge,
+                        voltage=12,
+                        updated_at=datetime.utcnow(),
+                    )
+                )
+            db.session.commit()
+
+    def tearDown(self):
+        """Tear down the test environment."""
+
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_pages_cover_every_battery(self):
+        """Test that following the cursors returns every battery once."""
+
+        ids = []
+        url = "/api/v1/batteries?limit=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [battery["id"] for battery in response.json["batteries"]]
+            cursor = response.json["next_cursor"]
+            url = (
+                f"/api/v1/batteries?limit=2&cursor={cursor}"
+                if cursor
+                else None
+            )
+
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(len(set(ids)), 5)
+
+    def test_filters(self):
+        """Test filtering by health and state of charge range."""
+
+        response = self.client.get(
+            "/api/v1/batteries?battery_health=EXCELLENT&max_state_of_charge=60"
+        )
+        self.assertEqual(
+            sorted(
+                battery["state_of_charge"]
+                for battery in response.json["batteries"]
+            ),
+            [40, 60],
+        )
+
+    def test_unpaginated(self):
+        """Test that every battery is listed behind the explicit flag."""
+
+        response = self.client.get("/api/v1/batteries?all=true")
+        self.assertEqual(len(response.json), 5)
+
+    def test_invalid_parameters(self):
+        """Test that invalid limits, cursors and filters are rejected."""
+
+        for query in [
+            "limit=0",
+            "cursor=invalid",
+            "battery_health=OK",
+            "min_state_of_charge=high",
+            "max_state_of_charge=nan",
+        ]:
+            response = self.client.get(f"/api/v1/batteries?{query}")
+            self.assertEqual(response.status_code, 400)
+
+    def test_rows_are_not_tracked(self):
+        """Test that the listing rows stay out of the identity map."""
+
+        with self.app.test_request_context("/api/v1/batteries"):
+            rows = select_batteries().all()
+
+            self.assertEqual(len(rows), 5)
+            self.assertEqual(len(db.session.identity_map), 0)
+            self.assertIsNotNone(select_battery(rows[0].battery_id))
@@ -0,0 +1,168 @@
+"""This method contains unittests for the last state of the batteries."""
+
+import os
+import uuid
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.database.model_battery_state import BatteryState
+from src.database.read_models import select_battery
+
+
+class BatteryStateTestCase(unittest.TestCase):
+    """Test case for the battery states."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            battery = Battery(
+                state_of_charge=50,
+                capacity=100,
+                voltage=12,
+                battery_health="EXCELLENT",
+            )
+            self.battery_id = battery.battery_id
+            db.session.add(battery)
+            db.session.commit()
+
+    def tearDown(self):
+        """Tear down the test environment."""
+
+        with self.app.app_context():
+            db.drop_all()
+
+    def battery_row(self):
+        """Returns the values of the batteries row of the battery."""
+
+        battery = db.session.get(Battery, self.battery_id)
+        return battery.state_of_charge, battery.voltage
+
+    def test_update_writes_state(self):
+        """Test that an update writes the state, not the battery row."""
+
+        response = self.client.put(
+            f"/api/v1/batteries/{self.battery_id}",
+            json={"state_of_charge": 0, "voltage": 11.5},
+        )
+        self.assertEqual(response.status_code, 200)
+
+        with self.app.app_context():
+            self.assertEqual(self.battery_row(), (50, 12))
+            state = db.session.get(BatteryState, self.battery_id)
+            self.assertEqual((state.state_of_charge, state.voltage), (0, 11.5))
+
+        battery = self.client.get(f"/api/v1/batteries/{self.battery_id}").json
+        self.assertEqual(battery["state_of_charge"], 0)
+        self.assertEqual(battery["voltage"], 11.5)
+
+    def test_null_state_is_not_replaced(self):
+        """Test that a null value of the state is read as null."""
+
+        with self.app.app_context():
+            db.session.add(
+                BatteryState(
+                    battery_id=self.battery_id,
+                    state_of_charge=30,
+                    voltage=None,
+                    updated_at=datetime.utcnow(),
+                )
+            )
+            db.session.commit()
+            battery = select_battery(self.battery_id)
+            self.assertEqual(battery.state_of_charge, 30)
+            self.assertIsNone(battery.voltage)
+
+    def test_listing_filters_on_state(self):
+        """Test that the listing filters on the last state of charge."""
+
+        self.client.put(
+            f"/api/v1/batteries/{self.battery_id}",
+            json={"state_of_charge": 90, "voltage": 12},
+        )
+
+        response = self.client.get("/api/v1/batteries?min_state_of_charge=80")
+        self.assertEqual(len(response.json["batteries"]), 1)
+        response = self.client.get("/api/v1/batteries?max_state_of_charge=60")
+        self.assertEqual(len(response.json["batteries"]), 0)
+
+    def test_added_battery_has_state(self):
+        """Test that a battery gets its state, and is filtered on it, when it
+        is added."""
+
+        response = self.client.post(
+            "/api/v1/batteries",
+            json={"state_of_charge": 95, "capacity": 100, "voltage": 12},
+        )
+        battery_id = response.json["battery_id"]
+
+        with self.app.app_context():
+            state = db.session.get(BatteryState, uuid.UUID(battery_id))
+            self.assertEqual((state.state_of_charge, state.voltage), (95, 12))
+        response = self.client.get("/api/v1/batteries?min_state_of_charge=80")
+        self.assertEqual(
+            [battery["id"] for battery in response.json["batteries"]],
+            [battery_id],
+        )
+
+    def test_health_change_writes_battery(self):
+        """Test that a health downgrade is written to the battery row."""
+
+        now = datetime.utcnow()
+        with self.app.app_context():
+            db.session.add_all(
+                BatteryLog(self.battery_id, 5, 12, now - timedelta(hours=1))
+                for _ in range(3)
+            )
+            db.session.commit()
+
+        response = self.client.post(
+            "/api/v1/batteries/readings",
+            json=[
+                {
+                    "battery_id": str(self.battery_id),
+                    "state_of_charge": 95,
+                    "voltage": 12.5,
+                }
+            ],
+        )
+        self.assertEqual(response.json["accepted"], 1)
+
+        with self.app.app_context():
+            battery = db.session.get(Battery, self.battery_id)
+            self.assertEqual(battery.battery_health, "VERY GOOD")
+            self.assertEqual(battery.state_of_charge, 50)
+            self.assertEqual(select_battery(self.battery_id).voltage, 12.5)
+
+    def test_delete_removes_state(self):
+        """Test that deleting a battery deletes its state."""
+
+        self.client.put(
+            f"/api/v1/batteries/{self.battery_id}",
+            json={"state_of_charge": 40, "voltage": 12},
+        )
+        self.client.delete(f"/api/v1/batteries/{self.battery_id}")
+
+        with self.app.app_context():
+            self.assertIsNone(db.session.get(BatteryState, self.battery_id))
+
+    def test_states_have_no_index(self):
+        """Test that no column of the states is indexed, so that the updates
+        can stay HOT."""
+
+        with self.app.app_context():
+            self.assertEqual(
+                inspect(db.engine).get_indexes("battery_states"), []
+            )
@@ -0,0 +1,99 @@
+"""This method contains unittests for the Data Export API."""
+
+import os
+import csv
+import io
+import json
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.database.model_issue import Issue
+
+
+class DataExportTestCase(unittest.TestCase):
+    """Test case for the Data Export API."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+        self.battery_ids = [uuid.uuid4(), uuid.uuid4()]
+        self.now = datetime.utcnow()
+
+        with self.app.app_context():
+            db.create_all()
+            for battery_id in self.battery_ids:
+                db.session.add(
+                    Battery(
+                        battery_id=battery_id,
+                        state_of_charge=50,
+                        capacity=100,
+                        voltage=12,
+                        battery_health="EXCELLENT",
+                    )
+                )
+                for hours in range(3):
+                    db.session.add(
+                        BatteryLog(
+                            battery_id=battery_id,
+                            state_of_charge=50,
+                            voltage=12,
+                            timestamp=self.now - timedelta(hours=hours),
+                        )
+                    )
+                db.session.add(
+                    Issue(battery_id, "high temperature", "Over 70 degrees")
+                )
+            db.session.commit()
+
+    def tearDown(self):
+        """Tear down the test environment."""
+
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_export_batteries_ndjson(self):
+        """Test exporting the batteries as NDJSON."""
+
+        response = self.client.get("/api/v1/export/batteries")
+        self.assertEqual(response.status_code, 200)
+
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(
+            sorted(row["battery_id"] for row in rows),
+            sorted(str(battery_id) for battery_id in self.battery_ids),
+        )
+
+    def test_export_battery_logs_filtered(self):
+        """Test exporting the logs of a battery within a time range."""
+
+        start = (self.now - timedelta(hours=1, minutes=30)).isoformat()
+        response = self.client.get(
+            f"/api/v1/export/battery_logs?format=csv"
+            f"&battery_id={self.battery_ids[0]}&from={start}"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        self.assertEqual(len(rows), 2)
+
+    def test_export_issues(self):
+        """Test exporting the issues."""
+
+        response = self.client.get("/api/v1/export/issues")
+        self.assertEqual(len(response.text.splitlines()), 2)
+
+    def test_export_invalid_format(self):
+        """Test that an unknown format is rejected."""
+
+        response = self.client.get("/api/v1/export/issues?format=xml")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,175 @@
+"""This method contains unittests for the health analytics."""
+
+import os
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.services.battery_health_check import HealthCheck, get_policy
+from src.services.health_analytics import (
+    AnalyticsPolicy,
+    analyze_series,
+    battery_analytics,
+    np,
+    turning_points,
+)
+
+
+@unittest.skipIf(np is None, "requires the numpy package")
+class HealthAnalyticsTestCase(unittest.TestCase):
+    """Test cases for the analytics metrics and health policy."""
+
+    def setUp(self):
+        """Set up the Flask app context and the database."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.now = datetime.utcnow()
+
+    def tearDown(self):
+        """Clean up the test data and the Flask app context."""
+
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_logs(self, battery_id, readings):
+        for step, (state_of_charge, voltage) in enumerate(readings):
+            db.session.add(
+                BatteryLog(
+                    battery_id=battery_id,
+                    state_of_charge=state_of_charge,
+                    voltage=voltage,
+                    timestamp=self.now
+                    - timedelta(minutes=len(readings) - step),
+                )
+            )
+        db.session.commit()
+
+    def test_turning_points(self):
+        """Test that flat and monotonic stretches are collapsed."""
+
+        state_of_charge = np.array([50, 60, 60, 90, 40, np.nan, 10, 30, 30])
+        self.assertEqual(
+            turning_points(state_of_charge).tolist(), [50, 90, 10, 30]
+        )
+
+    def test_analyze_series(self):
+        """Test the cycles, depth of discharge and voltage sag metrics."""
+
+        metrics = analyze_series(
+            np.array([100, 10, 100, 50, 60, 15], dtype=float),
+            np.array([13, 12, 13, 10, 12, 11.5]),
+        )
+
+        self.assertEqual(metrics["readings"], 6)
+        self.assertEqual(metrics["exceed_count"], 4)
+        self.assertEqual(metrics["cycles"], (90 + 90 + 50 + 10 + 45) / 200)
+        self.assertEqual(
+            metrics["depth_of_discharge"]["counts"], [0, 0, 2, 0, 1]
+        )
+        self.assertEqual(metrics["depth_of_discharge"]["max"], 90)
+        self.assertEqual(metrics["deep_discharges"], 1)
+        self.assertAlmostEqual(metrics["voltage_sag"], 3 / 13)
+
+    def test_battery_analytics_fleet_slice(self):
+        """Test that the logs of several batteries are split per battery."""
+
+        battery_ids = [uuid.uuid4(), uuid.uuid4(), uuid.uuid4()]
+        self._add_logs(battery_ids[0], [(50, 12), (40, 11.9)])
+        self._add_logs(battery_ids[1], [(90, 12), (10, 12), (90, 12)])
+
+        analytics = battery_analytics(
+            battery_ids, self.now - timedelta(days=1)
+        )
+
+        self.assertEqual(set(analytics), set(battery_ids[:2]))
+        self.assertEqual(analytics[battery_ids[0]]["readings"], 2)
+        self.assertEqual(analytics[battery_ids[1]]["cycles"], 0.8)
+
+    def _check(self, battery_id, health, reading, timestamp):
+        """Logs the reading and returns the health checked after it with
+        the analytics policy."""
+
+        db.session.add(BatteryLog(battery_id, *reading, timestamp))
+        return HealthCheck(
+            battery_id, health, timestamp, policy=AnalyticsPolicy()
+        ).check_condition()
+
+    def test_health_check_analytics_policy(self):
+        """Test that each limit first breached by a reading downgrades the
+        health a level, and does not again while it stays breached."""
+
+        battery_id = uuid.uuid4()
+        self._add_logs(battery_id, [(95, 12), (5, 12), (95, 12)])
+
+        # 4 out of band readings, a second deep discharge and a 20% sag.
+        health = self._check(battery_id, "EXCELLENT", (5, 9.6), self.now)
+        self.assertEqual(health, "BAD")
+
+        # only the exceed count is evaluated again.
+        health = self._check(
+            battery_id, "VERY GOOD", (50, 12), self.now + timedelta(minutes=1)
+        )
+        self.assertEqual(health, "GOOD")
+
+    def test_policy_is_the_same_for_every_path(self):
+        """Test that bulk readings are checked like single updates."""
+
+        self.app.config["HEALTH_POLICY"] = "analytics"
+        client = self.app.test_client()
+        battery_ids = []
+        for _ in range(2):
+            battery = Battery(50, 100, 12, "EXCELLENT")
+            battery_ids.append(battery.battery_id)
+            db.session.add(battery)
+        db.session.commit()
+
+        readings = [(95, 12), (5, 12), (95, 12), (5, 9.6)]
+        for state_of_charge, voltage in readings:
+            client.put(
+                f"/api/v1/batteries/{battery_ids[0]}",
+                json={"state_of_charge": state_of_charge, "voltage": voltage},
+            )
+        client.post(
+            "/api/v1/batteries/readings",
+            json=[
+                {
+                    "battery_id": str(battery_ids[1]),
+                    "state_of_charge": state_of_charge,
+                    "voltage": voltage,
+                    "timestamp": (
+                        self.now + timedelta(seconds=step)
+                    ).isoformat(),
+                }
+                for step, (state_of_charge, voltage) in enumerate(readings)
+            ],
+        )
+
+        db.session.expire_all()
+        self.assertEqual(
+            [db.session.get(Battery, i).battery_health for i in battery_ids],
+            ["BAD", "BAD"],
+        )
+
+    def test_health_check_default_policy(self):
+        """Test that the default policy only counts the exceeded readings."""
+
+        battery_id = uuid.uuid4()
+        self._add_logs(
+            battery_id, [(95, 12), (5, 9.6), (95, 12), (5, 12), (50, 12)]
+        )
+
+        self.assertIsNone(get_policy())
+        health = HealthCheck(
+            battery_id, "EXCELLENT", self.now
+        ).check_condition()
+
+        self.assertEqual(health, "VERY GOOD")
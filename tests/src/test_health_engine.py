@@ -0,0 +1,135 @@
+"""This method contains unittests for the incremental health engine."""
+
+import os
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from sqlalchemy.exc import OperationalError
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.database.read_models import select_battery
+from src.services.battery_health_check import HealthCheck
+from src.services.health_engine import RollingHealthCounter, health_counter
+
+
+class RollingHealthCounterTestCase(unittest.TestCase):
+    """Test cases for the rolling health counter."""
+
+    def setUp(self):
+        """Set up the test data."""
+
+        self.battery_id = uuid.uuid4()
+        self.now = datetime.utcnow()
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        os.environ["HEALTH_CHECK_ENGINE"] = "incremental"
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        """Clean up the test data and the Flask app context."""
+
+        db.drop_all()
+        self.app_context.pop()
+        del os.environ["HEALTH_CHECK_ENGINE"]
+        health_counter.reconcile()
+
+    def test_observe_counts_out_of_band_readings(self):
+        """Test that only out of band readings are counted."""
+
+        counter = RollingHealthCounter()
+        counter.observe(self.battery_id, True, self.now, self.now)
+        counter.observe(self.battery_id, False, self.now, self.now)
+        count = counter.observe(self.battery_id, True, self.now, self.now)
+
+        self.assertEqual(count, 2)
+
+    def test_readings_expire_from_window(self):
+        """Test that readings older than the window are no longer counted."""
+
+        counter = RollingHealthCounter()
+        old = self.now - timedelta(hours=23)
+        counter.observe(self.battery_id, True, old, old)
+        counter.observe(self.battery_id, True, self.now, self.now)
+
+        later = self.now + timedelta(hours=2)
+        self.assertEqual(counter.exceed_count(self.battery_id, later), 1)
+
+    def test_window_is_rebuilt_from_logs(self):
+        """Test that a battery unknown to the counter is loaded from logs."""
+
+        db.session.add(
+            BatteryLog(
+                battery_id=self.battery_id,
+                state_of_charge=10,
+                voltage=12,
+                timestamp=self.now - timedelta(hours=1),
+            )
+        )
+        db.session.commit()
+
+        counter = RollingHealthCounter()
+        self.assertEqual(counter.exceed_count(self.battery_id, self.now), 1)
+
+    def test_check_condition_uses_counter(self):
+        """Test that the health is downgraded by the incremental engine."""
+
+        for _ in range(2):
+            HealthCheck(
+                self.battery_id, "EXCELLENT", self.now, state_of_charge=90
+            ).check_condition()
+        result = HealthCheck(
+            self.battery_id, "EXCELLENT", self.now, state_of_charge=90
+        ).check_condition()
+
+        self.assertEqual(result, "VERY GOOD")
+
+    def test_failed_readings_are_not_counted(self):
+        """Test that readings whose commit fails are not counted again when
+        they are retried, in bulk or as a battery update."""
+
+        db.session.add(
+            Battery(
+                battery_id=self.battery_id,
+                state_of_charge=50,
+                capacity=100,
+                voltage=12,
+                battery_health="EXCELLENT",
+            )
+        )
+        db.session.commit()
+        reading = {"state_of_charge": 90, "voltage": 12}
+        readings = [{"battery_id": str(self.battery_id), **reading}] * 2
+        error = OperationalError("UPDATE", {}, Exception("gone"))
+
+        with patch(
+            "src.services.battery_ingest.save_states", side_effect=error
+        ), self.assertRaises(OperationalError):
+            self.client.post("/api/v1/batteries/readings", json=readings)
+        with patch(
+            "src.services.battery_subscriber.save_states", side_effect=error
+        ), self.assertRaises(OperationalError):
+            self.client.put(
+                f"/api/v1/batteries/{self.battery_id}", json=reading
+            )
+        db.session.rollback()
+
+        response = self.client.post(
+            "/api/v1/batteries/readings", json=readings
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            health_counter.exceed_count(self.battery_id, datetime.utcnow()), 2
+        )
+        self.assertEqual(
+            select_battery(self.battery_id).battery_health, "EXCELLENT"
+        )
@@ -0,0 +1,255 @@
+"""This method contains unittests for the fleet health recomputation."""
+
+import os
+import tempfile
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.database.model_battery_state import BatteryState
+from src.services.health_recompute import recompute_health
+
+
+class HealthRecomputeTestCase(unittest.TestCase):
+    """Test cases for the `maintenance recompute-health` command."""
+
+    def setUp(self):
+        """Create batteries with and without out of band logs."""
+
+        self.db_file = tempfile.NamedTemporaryFile(suffix=".db")
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = f"sqlite:///{self.db_file.name}"
+        self.app = create_app()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        now = datetime.utcnow()
+        self.battery_ids = {}
+        for health, out_of_band in [
+            ("EXCELLENT", 3),
+            ("GOOD", 5),
+            ("BAD", 3),
+            ("VERY GOOD", 2),
+        ]:
+            battery_id = uuid.uuid4()
+            self.battery_ids[health] = battery_id
+            battery = Battery(
+                battery_id=battery_id,
+                state_of_charge=50,
+                capacity=100,
+                voltage=12,
+                battery_health=health,
+            )
+            # the logs below were not written by an ingest path.
+            battery.updated_at = now - timedelta(hours=1)
+            db.session.add(battery)
+            for step in range(out_of_band):
+                db.session.add(
+                    BatteryLog(
+                        battery_id=battery_id,
+                        state_of_charge=10,
+                        voltage=12,
+                        timestamp=now - timedelta(minutes=step + 1),
+                    )
+                )
+            # out of band, but older than the health check window
+            db.session.add(
+                BatteryLog(
+                    battery_id=battery_id,
+                    state_of_charge=90,
+                    voltage=12,
+                    timestamp=now - timedelta(days=2),
+                )
+            )
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test data and the Flask app context."""
+
+        db.drop_all()
+        self.app_context.pop()
+        self.db_file.close()
+
+    def _health(self):
+        db.session.expire_all()
+        return {
+            health: db.session.get(Battery, battery_id).battery_health
+            for health, battery_id in self.battery_ids.items()
+        }
+
+    def test_recompute_health(self):
+        """Test that the batteries over the limit are downgraded once."""
+
+        results = list(recompute_health(batch_size=3))
+
+        self.assertEqual([count for count, _ in results], [3, 1])
+        self.assertEqual(
+            self._health(),
+            {
+                "EXCELLENT": "VERY GOOD",
+                "GOOD": "BAD",
+                "BAD": "BAD",
+                "VERY GOOD": "VERY GOOD",
+            },
+        )
+
+    def test_recompute_health_twice(self):
+        """Test that a second run does not downgrade the batteries again."""
+
+        list(recompute_health(batch_size=3))
+        health = self._health()
+
+        results = list(recompute_health(batch_size=3))
+
+        self.assertEqual(self._health(), health)
+        self.assertFalse(any(changes for _, changes in results))
+
+    def test_recompute_health_engines(self):
+        """Test that every health check engine gives the same health, and
+        that an unknown engine is refused."""
+
+        self.app.config["HEALTH_CHECK_ENGINE"] = "incremental"
+        list(recompute_health(batch_size=3))
+        self.assertEqual(self._health()["GOOD"], "BAD")
+        self.assertEqual(self._health()["EXCELLENT"], "VERY GOOD")
+
+        self.app.config["HEALTH_CHECK_ENGINE"] = "unknown"
+        db.session.add(
+            BatteryLog(
+                battery_id=self.battery_ids["BAD"],
+                state_of_charge=50,
+                voltage=12,
+                timestamp=datetime.utcnow(),
+            )
+        )
+        db.session.commit()
+        with self.assertRaises(ValueError):
+            list(recompute_health(batch_size=3))
+
+    def test_checked_readings_are_not_replayed(self):
+        """Test that the readings checked when they were written do not
+        downgrade the battery again."""
+
+        client = self.app.test_client()
+        response = client.post(
+            "/api/v1/batteries",
+            json={
+                "state_of_charge": 50,
+                "capacity": 100,
+                "voltage": 12,
+                "battery_health": "EXCELLENT",
+            },
+        )
+        battery_id = response.json["battery_id"]
+        for _ in range(3):
+            client.put(
+                f"/api/v1/batteries/{battery_id}",
+                json={"state_of_charge": 5, "voltage": 12},
+            )
+
+        for _ in range(2):
+            list(recompute_health(batch_size=10))
+            battery = client.get(f"/api/v1/batteries/{battery_id}").json
+            self.assertEqual(battery["battery_health"], "VERY GOOD")
+
+    def test_readings_ahead_are_not_replayed(self):
+        """Test that readings stamped ahead of the server clock, checked
+        when they were written, are not replayed."""
+
+        client = self.app.test_client()
+        response = client.post(
+            "/api/v1/batteries",
+            json={
+                "state_of_charge": 50,
+                "capacity": 100,
+                "voltage": 12,
+                "battery_health": "EXCELLENT",
+            },
+        )
+        battery_id = response.json["battery_id"]
+        ahead = datetime.utcnow() + timedelta(seconds=30)
+        response = client.post(
+            "/api/v1/batteries/readings",
+            json=[
+                {
+                    "battery_id": battery_id,
+                    "state_of_charge": 5,
+                    "voltage": 12,
+                    "timestamp": ahead.isoformat(),
+                }
+            ]
+            * 3,
+        )
+        self.assertEqual(response.status_code, 200, response.json)
+
+        for _ in range(2):
+            list(recompute_health(batch_size=10))
+            battery = client.get(f"/api/v1/batteries/{battery_id}").json
+            self.assertEqual(battery["battery_health"], "VERY GOOD")
+
+    def test_idle_battery(self):
+        """Test that the logs of a battery idle for days, loaded after it
+        was last checked, are checked against the window of their time."""
+
+        battery_id = self.battery_ids["VERY GOOD"]
+        list(recompute_health(batch_size=10))
+        idle = datetime.utcnow() - timedelta(days=3)
+        for minutes in range(4):
+            db.session.add(
+                BatteryLog(
+                    battery_id=battery_id,
+                    state_of_charge=5,
+                    voltage=11,
+                    timestamp=idle + timedelta(minutes=minutes),
+                )
+            )
+        db.session.commit()
+
+        for _ in range(2):
+            list(recompute_health(batch_size=10))
+            self.assertEqual(self._health()["VERY GOOD"], "BAD")
+        state = db.session.get(BatteryState, battery_id)
+        self.assertEqual(state.voltage, 12)
+
+    def test_recompute_health_dry_run(self):
+        """Test that a dry run reports the changes without writing them."""
+
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(
+            args=["maintenance", "recompute-health", "--dry-run"]
+        )
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("4/4 batteries checked, 2 changed.", result.output)
+        self.assertIn(
+            "1 batteries would change from EXCELLENT to VERY GOOD.",
+            result.output,
+        )
+        self.assertEqual(
+            self._health(),
+            {health: health for health in self.battery_ids},
+        )
+
+    def test_recompute_health_workers(self):
+        """Test recomputing the batches in a process pool."""
+
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(
+            args=[
+                "maintenance",
+                "recompute-health",
+                "--batch-size",
+                "1",
+                "--workers",
+                "2",
+            ]
+        )
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("4/4 batteries checked, 2 changed.", result.output)
+        self.assertEqual(self._health()["GOOD"], "BAD")
@@ -0,0 +1,228 @@
+"""This method contains unittests for the asynchronous ingestion."""
+
+import os
+import uuid
+import unittest
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.database.read_models import select_battery
+from src.services.battery_ingest import ingest_pipeline
+from src.services.ingest_pipeline import IngestPipeline
+from src.utils.brokers import LocalBroker, QueueFullError
+
+ASYNC_SETTINGS = {
+    "INGEST_MODE": "async",
+    "INGEST_FLUSH_INTERVAL": "0.01",
+}
+
+
+class LocalBrokerTestCase(unittest.TestCase):
+    """Test case for the in-process broker."""
+
+    def test_publish_is_all_or_none(self):
+        """Test that a batch larger than the room left is rejected whole."""
+
+        broker = LocalBroker(max_size=3)
+        broker.publish([1, 2])
+
+        with self.assertRaises(QueueFullError):
+            broker.publish([3, 4])
+        self.assertEqual(broker.size(), 2)
+
+    def test_requeue_and_ack(self):
+        """Test that requeued messages are consumed again first."""
+
+        broker = LocalBroker(max_size=3)
+        broker.publish([1, 2, 3])
+        batch = broker.consume(2, timeout=0)
+        self.assertEqual(broker.in_flight(), 2)
+
+        broker.requeue(batch)
+        self.assertEqual(broker.consume(3, timeout=0), [1, 2, 3])
+        self.assertFalse(broker.join(timeout=0))
+
+        broker.ack([1, 2, 3])
+        self.assertTrue(broker.join(timeout=0))
+
+
+class IngestPipelineTestCase(unittest.TestCase):
+    """Test case for the asynchronous ingestion endpoints."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        os.environ.update(ASYNC_SETTINGS)
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            battery = Battery(
+                state_of_charge=50,
+                capacity=100,
+                voltage=12,
+                battery_health="GOOD",
+            )
+            db.session.add(battery)
+            db.session.commit()
+            self.battery_id = str(battery.battery_id)
+
+    def tearDown(self):
+        """Tear down the test environment."""
+
+        ingest_pipeline.stop()
+        for name in ASYNC_SETTINGS:
+            os.environ.pop(name)
+        os.environ.pop("INGEST_QUEUE_SIZE", None)
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_readings_are_queued(self):
+        """Test that readings are accepted, then stored by the workers."""
+
+        response = self.client.post(
+            "/api/v1/batteries/readings",
+            json=[
+                {
+                    "battery_id": self.battery_id,
+                    "state_of_charge": 60,
+                    "voltage": 12,
+                },
+                {"battery_id": self.battery_id, "voltage": 12},
+            ],
+        )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json["accepted"], 1)
+        self.assertEqual(response.json["results"][1]["status"], "error")
+        self.assertTrue(ingest_pipeline.flush(timeout=5))
+        with self.app.app_context():
+            self.assertEqual(BatteryLog.query.count(), 1)
+            self.assertEqual(
+                select_battery(uuid.UUID(self.battery_id)).state_of_charge,
+                60,
+            )
+        self.assertEqual(ingest_pipeline.stats()["stored"], 1)
+
+    def test_update_is_queued(self):
+        """Test that a battery update is accepted, then applied."""
+
+        response = self.client.put(
+            f"/api/v1/batteries/{self.battery_id}",
+            json={"state_of_charge": 70, "voltage": 12},
+        )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(ingest_pipeline.flush(timeout=5))
+        response = self.client.get(f"/api/v1/batteries/{self.battery_id}")
+        self.assertEqual(response.json["state_of_charge"], 70)
+
+    def test_partial_update_is_queued(self):
+        """Test that an update of one value is accepted like in sync mode,
+        and stored with the other value missing."""
+
+        response = self.client.put(
+            f"/api/v1/batteries/{self.battery_id}",
+            json={"state_of_charge": 5},
+        )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(ingest_pipeline.flush(timeout=5))
+        self.assertEqual(ingest_pipeline.stats()["stored"], 1)
+        with self.app.app_context():
+            log = BatteryLog.query.one()
+            self.assertEqual((log.state_of_charge, log.voltage), (5, None))
+        response = self.client.get(f"/api/v1/batteries/{self.battery_id}")
+        self.assertEqual(response.json["state_of_charge"], 5)
+        self.assertIsNone(response.json["voltage"])
+
+    def test_unknown_battery_update(self):
+        """Test that updating an unknown battery is still rejected."""
+
+        response = self.client.put(
+            "/api/v1/batteries/00000000-0000-0000-0000-000000000000",
+            json={"state_of_charge": 70, "voltage": 12},
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_backpressure(self):
+        """Test that readings beyond the queue size are refused."""
+
+        ingest_pipeline.stop()
+        os.environ["INGEST_QUEUE_SIZE"] = "1"
+        app = create_app()
+        reading = {
+            "battery_id": self.battery_id,
+            "state_of_charge": 60,
+            "voltage": 12,
+        }
+
+        response = app.test_client().post(
+            "/api/v1/batteries/readings", json=[reading, reading]
+        )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "1")
+
+
+class IngestRetryTestCase(unittest.TestCase):
+    """Test case for the retries of failed batches."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.app.config.update(INGEST_MODE="async", INGEST_FLUSH_INTERVAL=0.01)
+        self.calls = []
+
+    def _store(self, readings):
+        """Fails the first call and succeeds afterwards."""
+
+        self.calls.append(readings)
+        if len(self.calls) == 1:
+            raise RuntimeError("database unavailable")
+        return [{"index": 0, "status": "ok"} for _ in readings]
+
+    def test_failed_batch_is_retried(self):
+        """Test that a failed batch is stored on the next attempt."""
+
+        pipeline = IngestPipeline(self._store)
+        pipeline.init_app(self.app)
+        pipeline.submit([{"state_of_charge": 60}])
+
+        self.assertTrue(pipeline.flush(timeout=5))
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(pipeline.counters["retried"], 1)
+        self.assertEqual(pipeline.counters["stored"], 1)
+        pipeline.stop()
+
+    def test_batch_out_of_retries_is_dropped(self):
+        """Test that a batch is dropped once out of retries."""
+
+        self.app.config["INGEST_MAX_RETRIES"] = 0
+        pipeline = IngestPipeline(self._store)
+        pipeline.init_app(self.app)
+        pipeline.submit([{"state_of_charge": 60}])
+
+        self.assertTrue(pipeline.flush(timeout=5))
+        self.assertEqual(pipeline.counters["failed"], 1)
+        pipeline.stop()
+
+    def test_stop_drains_the_queue(self):
+        """Test that stopping stores the readings still queued."""
+
+        self.calls.append(None)
+        pipeline = IngestPipeline(self._store)
+        pipeline.init_app(self.app)
+        pipeline.submit([{"state_of_charge": 60}] * 3)
+        pipeline.stop()
+
+        self.assertEqual(sum(len(call) for call in self.calls[1:]), 3)
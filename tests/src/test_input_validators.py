@@ -0,0 +1,173 @@
+"""This method contains unittests for the compiled input validators."""
+
+import uuid
+import unittest
+
+from src.utils.input_validators import (
+    validate_battery_data,
+    validate_bulk_issue_data,
+    validate_issue_data,
+    validate_reading_data,
+)
+from src.utils.schemas import Field, compile_validator, validate_items
+
+BATTERY_ID = "8b1e8c5e-4a50-4c1f-9a8e-0d4f2f4a6b10"
+
+
+def make_reading(**values):
+    """Returns a valid reading updated with the values."""
+
+    reading = {
+        "battery_id": BATTERY_ID,
+        "state_of_charge": 55.5,
+        "voltage": 12.1,
+        "timestamp": "2023-06-01T08:30:00",
+    }
+    reading.update(values)
+    return reading
+
+
+class ValidatorTestCase(unittest.TestCase):
+    """Test case for the validators of single payloads."""
+
+    def test_battery_zero_values(self):
+        """Test that zero values are checked like any value."""
+
+        self.assertIsNone(
+            validate_battery_data(
+                {"state_of_charge": 0, "capacity": 0.0, "voltage": 0}
+            )
+        )
+        self.assertEqual(
+            validate_battery_data({"capacity": ""}),
+            "Invalid 'type' for capacity",
+        )
+        self.assertEqual(
+            validate_battery_data({"battery_health": ""}),
+            "Invalid 'value' for battery health",
+        )
+
+    def test_battery_range(self):
+        """Test the range of the state of charge."""
+
+        self.assertIsNone(validate_battery_data({"state_of_charge": 100}))
+        self.assertEqual(
+            validate_battery_data({"state_of_charge": -0.5}),
+            "Charge value '-0.5' is not in the valid range (0-100).",
+        )
+
+    def test_booleans_are_not_numbers(self):
+        """Test that booleans are rejected as numbers."""
+
+        self.assertEqual(
+            validate_battery_data({"voltage": True}),
+            "Invalid 'type' for voltage",
+        )
+        self.assertEqual(
+            validate_reading_data(make_reading(state_of_charge=False)),
+            "Invalid 'type' for state of charge",
+        )
+
+    def test_missing_attributes(self):
+        """Test that the missing attributes are reported together."""
+
+        self.assertEqual(
+            validate_issue_data({}),
+            "Missing attributes for issue: issue_type, issue_description",
+        )
+        self.assertEqual(
+            validate_reading_data({"battery_id": BATTERY_ID, "voltage": 0}),
+            "Missing attributes for reading: state_of_charge",
+        )
+        self.assertEqual(
+            validate_reading_data([]), "Invalid 'type' for reading"
+        )
+
+    def test_uuid_forms(self):
+        """Test the accepted forms of the battery ids."""
+
+        for battery_id in (
+            BATTERY_ID,
+            BATTERY_ID.upper(),
+            BATTERY_ID.replace("-", ""),
+            uuid.UUID(BATTERY_ID),
+        ):
+            self.assertIsNone(
+                validate_reading_data(make_reading(battery_id=battery_id))
+            )
+        for battery_id in ("nope", BATTERY_ID[:-1] + "g", 42):
+            self.assertEqual(
+                validate_reading_data(make_reading(battery_id=battery_id)),
+                f"Invalid battery id '{battery_id}'",
+            )
+
+    def test_timestamps(self):
+        """Test the timestamps of the bulk issues."""
+
+        issue = {
+            "battery_id": BATTERY_ID,
+            "issue_type": "overheat",
+            "issue_description": "Too hot",
+        }
+        self.assertIsNone(validate_bulk_issue_data(issue))
+        self.assertEqual(
+            validate_bulk_issue_data(
+                dict(issue, occurrence_timestamp="yesterday")
+            ),
+            "Invalid timestamp 'yesterday'",
+        )
+
+    def test_invalid_kind(self):
+        """Test that a schema with an unknown kind does not compile."""
+
+        with self.assertRaises(ValueError):
+            compile_validator("validate", "thing", {"a": Field("blob")})
+
+
+class BatchValidatorTestCase(unittest.TestCase):
+    """Test case for the validation of lists of payloads."""
+
+    def test_errors_per_item(self):
+        """Test that every invalid item is reported with its index."""
+
+        readings = [
+            make_reading(),
+            None,
+            make_reading(voltage="12"),
+            make_reading(battery_id="nope"),
+            make_reading(state_of_charge=0, voltage=0.0),
+            make_reading(battery_id=[BATTERY_ID]),
+        ]
+
+        self.assertEqual(
+            validate_items(validate_reading_data, readings),
+            [
+                (1, "Invalid 'type' for reading"),
+                (2, "Invalid 'type' for voltage"),
+                (3, "Invalid battery id 'nope'"),
+                (5, f"Invalid battery id '['{BATTERY_ID}']'"),
+            ],
+        )
+
+    def test_same_as_single(self):
+        """Test that a batch reports the errors of the single validator."""
+
+        readings = [
+            make_reading(battery_id=str(uuid.uuid4())) for _ in range(50)
+        ]
+        readings += [
+            make_reading(battery_id="nope"),
+            make_reading(state_of_charge=101),
+            make_reading(timestamp="now"),
+            {"voltage": True},
+        ] * 3
+        readings += readings[:50]
+
+        self.assertEqual(
+            validate_items(validate_reading_data, readings),
+            [
+                (index, validate_reading_data(reading))
+                for index, reading in enumerate(readings)
+                if validate_reading_data(reading) is not None
+            ],
+        )
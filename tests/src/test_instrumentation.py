@@ -0,0 +1,159 @@
+"""This method contains unittests for the request instrumentation."""
+
+import os
+import time
+import uuid
+import tempfile
+import threading
+import unittest
+
+from sqlalchemy.exc import OperationalError
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.utils.metrics import MetricsRegistry, function_duration
+from src.utils.profiler import SamplingProfiler
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    """Test cases for the metrics endpoint and the profiler."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+        self.battery_id = uuid.uuid4()
+        with self.app.app_context():
+            db.create_all()
+            db.session.add(
+                Battery(
+                    battery_id=self.battery_id,
+                    state_of_charge=50,
+                    capacity=100,
+                    voltage=12,
+                    battery_health="GOOD",
+                )
+            )
+            db.session.commit()
+
+    def tearDown(self):
+        """Tear down the test environment."""
+
+        for name in (
+            "PROFILER_ENABLED",
+            "PROFILER_INTERVAL",
+            "PROFILER_SLOW_REQUEST_MS",
+            "PROFILER_OUTPUT_DIR",
+        ):
+            os.environ.pop(name, None)
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_metrics(self):
+        """Test that the routes and their SQL statements are measured."""
+
+        validations = function_duration.count(function="validate_input")
+        checks = function_duration.count(function="check_condition")
+        self.client.get("/api/v1/batteries")
+        self.client.put(
+            f"/api/v1/batteries/{self.battery_id}",
+            json={"state_of_charge": 60, "voltage": 12},
+        )
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        text = response.get_data(as_text=True)
+        self.assertIn("# TYPE juicemaster_request_duration_seconds", text)
+        self.assertIn(
+            'juicemaster_request_duration_seconds_bucket{method="GET",'
+            'route="/api/v1/batteries",status="200",le="+Inf"}',
+            text,
+        )
+        self.assertIn(
+            'juicemaster_request_sql_statements_count{method="PUT",'
+            'route="/api/v1/batteries/<uuid:battery_id>"}',
+            text,
+        )
+        self.assertEqual(
+            function_duration.count(function="validate_input"),
+            validations + 1,
+        )
+        self.assertEqual(
+            function_duration.count(function="check_condition"), checks + 1
+        )
+
+    def test_failed_statement(self):
+        """Test that a failed statement does not leave its start time on
+        the connection."""
+
+        with self.app.app_context():
+            connection = db.session.connection()
+            with self.assertRaises(OperationalError):
+                connection.exec_driver_sql("SELECT * FROM missing_table")
+            self.assertEqual(connection.info.get("query_start"), [])
+            db.session.rollback()
+
+    def test_histogram_render(self):
+        """Test the cumulative buckets of the text format."""
+
+        registry = MetricsRegistry()
+        histogram = registry.histogram(
+            "test_seconds", "Test.", ("route",), buckets=(0.1, 1)
+        )
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value, route="/a")
+
+        self.assertEqual(
+            registry.render().splitlines(),
+            [
+                "# HELP test_seconds Test.",
+                "# TYPE test_seconds histogram",
+                'test_seconds_bucket{route="/a",le="0.1"} 1',
+                'test_seconds_bucket{route="/a",le="1"} 2',
+                'test_seconds_bucket{route="/a",le="+Inf"} 3',
+                'test_seconds_sum{route="/a"} 5.55',
+                'test_seconds_count{route="/a"} 3',
+            ],
+        )
+
+    def test_sampling_profiler(self):
+        """Test that the stacks of the sampled threads are collapsed."""
+
+        profiler = SamplingProfiler(interval=60)
+        profiler.begin(threading.get_ident())
+        profiler.sample()
+        profiler.sample()
+        samples = profiler.end(threading.get_ident())
+
+        ((stack, count),) = samples.items()
+        self.assertEqual(count, 2)
+        self.assertIn(f"{__name__}:test_sampling_profiler;", stack)
+
+    def test_slow_request_profile(self):
+        """Test that the stacks of a slow request are written."""
+
+        output_dir = tempfile.mkdtemp()
+        os.environ["PROFILER_ENABLED"] = "True"
+        os.environ["PROFILER_INTERVAL"] = "0.001"
+        os.environ["PROFILER_SLOW_REQUEST_MS"] = "20"
+        os.environ["PROFILER_OUTPUT_DIR"] = output_dir
+        app = create_app()
+        app.add_url_rule("/slow", "slow", lambda: time.sleep(0.05) or "done")
+        client = app.test_client()
+
+        client.get("/metrics")
+        self.assertEqual(os.listdir(output_dir), [])
+        client.get("/slow")
+
+        (name,) = os.listdir(output_dir)
+        self.assertTrue(name.endswith("-GET_slow.folded"))
+        with open(os.path.join(output_dir, name), encoding="utf-8") as file:
+            stack, count = file.readline().rsplit(" ", 1)
+        self.assertIn(f"{__name__}:<lambda>", stack)
+        self.assertGreater(int(count), 0)
@@ -0,0 +1,135 @@
+"""This method contains unittests for the paginated issue listing."""
+
+import os
+import uuid
+import unittest
+from datetime import datetime, timedelta
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_issue import Issue
+
+
+class IssueListingTestCase(unittest.TestCase):
+    """Test case for the issue listing of a battery and of the fleet."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+        self.battery_ids = [uuid.uuid4(), uuid.uuid4()]
+        self.start = datetime(2023, 6, 1)
+        with self.app.app_context():
+            db.create_all()
+            for battery_id in self.battery_ids:
+                db.session.add(
+                    Battery(
+                        battery_id=battery_id,
+                        state_of_charge=50,
+                        capacity=100,
+                        voltage=12,
+                        battery_health="GOOD",
+                    )
+                )
+                for hour in range(5):
+                    issue = Issue(
+                        battery_id,
+                        "Overheating" if hour % 2 else "Noise",
+                        f"Hour {hour}",
+                    )
+                    issue.occurrence_timestamp = self.start + timedelta(
+                        hours=hour
+                    )
+                    db.session.add(issue)
+            db.session.commit()
+
+    def tearDown(self):
+        """Tear down the test environment."""
+
+        with self.app.app_context():
+            db.drop_all()
+
+    def _follow(self, url):
+        """Returns the issues of every page, following the cursors."""
+
+        issues = []
+        cursor = None
+        while True:
+            separator = "&" if "?" in url else "?"
+            response = self.client.get(
+                f"{url}{separator}cursor={cursor}" if cursor else url
+            )
+            self.assertEqual(response.status_code, 200)
+            issues += response.json["issues"]
+            cursor = response.json["next_cursor"]
+            if cursor is None:
+                return issues
+
+    def test_battery_pages(self):
+        """Test that the pages cover the issues of the battery in order."""
+
+        issues = self._follow(
+            f"/api/v1/batteries/{self.battery_ids[0]}/issues?limit=2"
+        )
+
+        self.assertEqual(
+            [issue["issue_description"] for issue in issues],
+            [f"Hour {hour}" for hour in range(5)],
+        )
+
+    def test_battery_filters(self):
+        """Test filtering the issues of a battery by type and time."""
+
+        end = (self.start + timedelta(hours=4)).isoformat()
+        response = self.client.get(
+            f"/api/v1/batteries/{self.battery_ids[0]}/issues"
+            f"?issue_type=Noise&to={end}"
+        )
+
+        self.assertEqual(
+            [issue["issue_description"] for issue in response.json["issues"]],
+            ["Hour 0", "Hour 2"],
+        )
+
+    def test_battery_unpaginated(self):
+        """Test that every issue is listed behind the explicit flag."""
+
+        response = self.client.get(
+            f"/api/v1/batteries/{self.battery_ids[0]}/issues?all=true"
+        )
+
+        self.assertEqual(len(response.json), 5)
+
+    def test_fleet_pages(self):
+        """Test that the fleet pages cover every issue once."""
+
+        issues = self._follow("/api/v1/batteries/issues?limit=3")
+
+        self.assertEqual(len(issues), 10)
+        self.assertEqual(len({issue["id"] for issue in issues}), 10)
+        self.assertEqual(
+            {issue["battery_id"] for issue in issues},
+            {str(battery_id) for battery_id in self.battery_ids},
+        )
+
+    def test_fleet_filters(self):
+        """Test filtering the fleet issues by type and time."""
+
+        start = (self.start + timedelta(hours=2)).isoformat()
+        response = self.client.get(
+            f"/api/v1/batteries/issues?issue_type=Overheating&from={start}"
+        )
+
+        self.assertEqual(len(response.json["issues"]), 2)
+
+    def test_invalid_cursor(self):
+        """Test that an invalid cursor is rejected."""
+
+        response = self.client.get("/api/v1/batteries/issues?cursor=abc")
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,127 @@
+"""This method contains unittests for the scoped issue mutations."""
+
+import os
+import uuid
+import unittest
+
+from sqlalchemy import event
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_issue import Issue
+
+
+class IssueMutationTestCase(unittest.TestCase):
+    """Test case for updating and deleting the issues of a battery."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+        self.battery_id = uuid.uuid4()
+        self.other_battery_id = uuid.uuid4()
+        self.issue_id = uuid.uuid4()
+        with self.app.app_context():
+            db.create_all()
+            for battery_id in (self.battery_id, self.other_battery_id):
+                db.session.add(
+                    Battery(
+                        battery_id=battery_id,
+                        state_of_charge=50,
+                        capacity=100,
+                        voltage=12,
+                        battery_health="GOOD",
+                    )
+                )
+            db.session.add(
+                Issue(
+                    self.battery_id,
+                    "Overheating",
+                    "Too hot",
+                    issue_id=self.issue_id,
+                )
+            )
+            db.session.add_all(
+                Issue(self.battery_id, "Noise", "Buzzing") for _ in range(10)
+            )
+            db.session.commit()
+
+    def tearDown(self):
+        """Tear down the test environment."""
+
+        with self.app.app_context():
+            db.drop_all()
+
+    def _issue(self):
+        """Returns the issue of the test."""
+
+        with self.app.app_context():
+            return db.session.get(Issue, self.issue_id)
+
+    def test_update(self):
+        """Test updating an issue of the battery."""
+
+        response = self.client.put(
+            f"/api/v1/batteries/{self.battery_id}/issues/{self.issue_id}",
+            json={"issue_type": "Cooling", "issue_description": "Cooled"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._issue().issue_type, "Cooling")
+
+    def test_update_issue_of_another_battery(self):
+        """Test that an issue cannot be changed through another battery."""
+
+        response = self.client.put(
+            f"/api/v1/batteries/{self.other_battery_id}/issues/"
+            f"{self.issue_id}",
+            json={"issue_type": "Cooling", "issue_description": "Cooled"},
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            response.json["message"], f"Issue {self.issue_id} not found"
+        )
+        self.assertEqual(self._issue().issue_type, "Overheating")
+
+    def test_delete_issue_of_missing_battery(self):
+        """Test that a missing battery is reported as such."""
+
+        missing_id = uuid.uuid4()
+        response = self.client.delete(
+            f"/api/v1/batteries/{missing_id}/issues/{self.issue_id}"
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            response.json["message"], f"Battery {missing_id} not found"
+        )
+        self.assertIsNotNone(self._issue())
+
+    def test_delete_runs_one_statement(self):
+        """Test that deleting an issue does not load the other issues."""
+
+        statements = []
+        with self.app.app_context():
+            engine = db.engine
+
+        def record(conn, cursor, statement, *args):  # pylint: disable=W0613
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = self.client.delete(
+                f"/api/v1/batteries/{self.battery_id}/issues/{self.issue_id}"
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith("DELETE FROM issues"))
+        self.assertIsNone(self._issue())
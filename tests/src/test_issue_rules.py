@@ -0,0 +1,193 @@
+"""This method contains unittests for the bulk issues API and the rules
+raising issues from the readings."""
+
+import os
+import uuid
+import unittest
+from datetime import datetime, timedelta
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_issue import Issue
+from src.services.issue_rules import detect_issues
+
+
+class IssueRulesTestCase(unittest.TestCase):
+    """Test case for the bulk issues API and the issue rules."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        os.environ["ISSUE_RULES_ENABLED"] = "True"
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+        self.battery_ids = [uuid.uuid4(), uuid.uuid4()]
+        with self.app.app_context():
+            db.create_all()
+            for battery_id in self.battery_ids:
+                db.session.add(
+                    Battery(
+                        battery_id=battery_id,
+                        state_of_charge=50,
+                        capacity=100,
+                        voltage=12,
+                        battery_health="GOOD",
+                    )
+                )
+            db.session.commit()
+
+    def tearDown(self):
+        """Tear down the test environment."""
+
+        del os.environ["ISSUE_RULES_ENABLED"]
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_add_issues_in_bulk(self):
+        """Test storing issues of several batteries at once."""
+
+        response = self.client.post(
+            "/api/v1/batteries/issues",
+            json=[
+                {
+                    "battery_id": str(self.battery_ids[0]),
+                    "issue_type": "Overheating",
+                    "issue_description": "Too hot",
+                    "occurrence_timestamp": "2023-06-01T10:00:00Z",
+                },
+                {
+                    "battery_id": str(self.battery_ids[1]),
+                    "issue_type": "Noise",
+                    "issue_description": "Buzzing",
+                },
+                {
+                    "battery_id": str(uuid.uuid4()),
+                    "issue_type": "Noise",
+                    "issue_description": "Buzzing",
+                },
+                {"battery_id": "not-a-uuid", "issue_type": "Noise"},
+            ],
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["accepted"], 2)
+        self.assertEqual(
+            [result["status"] for result in response.json["results"]],
+            ["ok", "ok", "error", "error"],
+        )
+
+        with self.app.app_context():
+            self.assertEqual(Issue.query.count(), 2)
+            issue = db.session.get(
+                Issue, uuid.UUID(response.json["results"][0]["id"])
+            )
+            self.assertEqual(
+                issue.occurrence_timestamp, datetime(2023, 6, 1, 10)
+            )
+
+    def test_add_issues_invalid_batch(self):
+        """Test that a body which is not a list of issues is rejected."""
+
+        response = self.client.post(
+            "/api/v1/batteries/issues", json={"issue_type": "Noise"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_add_issue_missing_battery(self):
+        """Test adding an issue to a battery which does not exist."""
+
+        response = self.client.post(
+            f"/api/v1/batteries/{uuid.uuid4()}/issues",
+            json={"issue_type": "Noise", "issue_description": "Buzzing"},
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_detect_issues(self):
+        """Test the rules and the cooldown between issues of a type."""
+
+        start = datetime(2023, 6, 1)
+        readings = [
+            {"timestamp": start, "state_of_charge": 99, "voltage": 12},
+            {
+                "timestamp": start + timedelta(minutes=1),
+                "state_of_charge": 98,
+                "voltage": 12,
+            },
+            {
+                "timestamp": start + timedelta(hours=2),
+                "state_of_charge": 5,
+                "voltage": 6,
+            },
+        ]
+        with self.app.app_context():
+            issues = detect_issues(
+                {self.battery_ids[0]: readings}, {self.battery_ids[0]: 12}
+            )
+
+        self.assertEqual(
+            [
+                (issue["issue_type"], issue["occurrence_timestamp"])
+                for issue in issues
+            ],
+            [
+                ("over-charge", start),
+                ("deep discharge", start + timedelta(hours=2)),
+                ("voltage anomaly", start + timedelta(hours=2)),
+            ],
+        )
+
+    def test_missing_values(self):
+        """Test that the values a reading leaves out are not checked, and
+        the voltage is compared with the last reading having one."""
+
+        start = datetime(2023, 6, 1)
+        readings = [
+            {"timestamp": start, "state_of_charge": None, "voltage": 12},
+            {
+                "timestamp": start + timedelta(hours=1),
+                "state_of_charge": 5,
+                "voltage": None,
+            },
+            {
+                "timestamp": start + timedelta(hours=2),
+                "state_of_charge": None,
+                "voltage": 6,
+            },
+        ]
+        with self.app.app_context():
+            issues = detect_issues({self.battery_ids[0]: readings}, {})
+
+        self.assertEqual(
+            [issue["issue_type"] for issue in issues],
+            ["deep discharge", "voltage anomaly"],
+        )
+
+    def test_readings_raise_issues(self):
+        """Test that ingested readings raise issues once per cooldown."""
+
+        for _ in range(2):
+            response = self.client.post(
+                "/api/v1/batteries/readings",
+                json=[
+                    {
+                        "battery_id": str(self.battery_ids[0]),
+                        "state_of_charge": 99,
+                        "voltage": 12,
+                    },
+                    {
+                        "battery_id": str(self.battery_ids[1]),
+                        "state_of_charge": 50,
+                        "voltage": 12,
+                    },
+                ],
+            )
+            self.assertEqual(response.status_code, 200)
+
+        with self.app.app_context():
+            issues = Issue.query.all()
+            self.assertEqual(len(issues), 1)
+            self.assertEqual(issues[0].battery_id, self.battery_ids[0])
+            self.assertEqual(issues[0].issue_type, "over-charge")
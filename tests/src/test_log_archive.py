@@ -0,0 +1,295 @@
+"""This method contains unittests for the archive of the battery logs."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.database.model_battery_log_rollup import BatteryLogRollup
+from src.services.log_archive import (
+    _write_manifest,
+    archive_logs,
+    archived_until,
+    partition_dir,
+    partition_of,
+    pq,
+)
+
+
+@unittest.skipIf(pq is None, "requires the pyarrow package")
+class LogArchiveTestCase(unittest.TestCase):
+    """Test cases for the archival of the logs and their history reads."""
+
+    def setUp(self):
+        """Log every 30 minutes for three days for two batteries."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.archive_dir = tempfile.mkdtemp()
+        self.app.config["ARCHIVE_DIR"] = self.archive_dir
+        self.app.config["ARCHIVE_PARTITIONS"] = 4
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.battery_ids = [uuid.uuid4(), uuid.uuid4()]
+        self.start = datetime(2023, 6, 1)
+        self.cutoff = self.start + timedelta(days=2)
+        for battery_id in self.battery_ids:
+            db.session.add(
+                Battery(
+                    battery_id=battery_id,
+                    state_of_charge=50,
+                    capacity=100,
+                    voltage=12,
+                    battery_health="EXCELLENT",
+                )
+            )
+            for step in range(144):
+                db.session.add(
+                    BatteryLog(
+                        battery_id=battery_id,
+                        state_of_charge=step % 100,
+                        voltage=12 + step % 8 / 4,
+                        timestamp=self.start + timedelta(minutes=30 * step),
+                    )
+                )
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test data, the archive and the Flask app context."""
+
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.archive_dir)
+
+    def history(self, **params):
+        """Returns every page of the logs of the first battery."""
+
+        params = {
+            "from": "2023-06-01T00:00:00",
+            "to": "2023-06-04T00:00:00",
+            **params,
+        }
+        url = f"/api/v1/batteries/{self.battery_ids[0]}/logs"
+        response = self.client.get(url, query_string=params)
+        self.assertEqual(response.status_code, 200, response.json)
+        if "bucket" in params:
+            return response.json["buckets"]
+        logs = response.json["logs"]
+        while response.json["next_cursor"]:
+            response = self.client.get(
+                url,
+                query_string={
+                    **params,
+                    "cursor": response.json["next_cursor"],
+                },
+            )
+            logs += response.json["logs"]
+        return logs
+
+    def partition_files(self, battery_id, day):
+        """Returns the files of the battery's partition of the day."""
+
+        path = partition_dir(
+            self.archive_dir, day, partition_of(battery_id, 4)
+        )
+        return sorted(os.listdir(path))
+
+    def test_archive_moves_logs(self):
+        """Test that the logs before the cutoff day are archived and
+        deleted, while their rollups are kept."""
+
+        archived = archive_logs(self.cutoff + timedelta(hours=5), 7)
+
+        self.assertEqual(archived, 2 * 96)
+        self.assertEqual(BatteryLog.query.count(), 2 * 48)
+        self.assertEqual(archived_until(), self.cutoff)
+        self.assertEqual(
+            BatteryLogRollup.query.filter_by(bucket="1d").count(), 4
+        )
+        for battery_id in self.battery_ids:
+            table = pq.read_table(
+                os.path.join(
+                    partition_dir(
+                        self.archive_dir,
+                        self.start,
+                        partition_of(battery_id, 4),
+                    ),
+                    self.partition_files(battery_id, self.start)[0],
+                ),
+                filters=[("battery_id", "==", str(battery_id))],
+            )
+            self.assertEqual(table.num_rows, 48)
+
+    def test_history_reads_archive(self):
+        """Test that the raw and aggregated history are the same once the
+        logs are archived, across pages spanning both sources."""
+
+        logs = self.history(limit=25)
+        buckets = self.history(bucket="1h")
+        daily = self.history(bucket="1d")
+
+        archive_logs(self.cutoff, 1000)
+
+        self.assertEqual(self.history(limit=25), logs)
+        self.assertEqual(len(logs), 144)
+        self.assertEqual(self.history(bucket="1h"), buckets)
+        self.assertEqual(self.history(bucket="1d"), daily)
+        self.assertEqual(
+            len(self.history(**{"from": "2023-06-01T10:00:00", "limit": 5})),
+            124,
+        )
+
+    def test_history_invalid_bucket(self):
+        """Test that an unknown bucket is rejected once logs are archived."""
+
+        archive_logs(self.cutoff, 1000)
+
+        response = self.client.get(
+            f"/api/v1/batteries/{self.battery_ids[0]}/logs",
+            query_string={"from": "2023-06-01T00:00:00", "bucket": "5m"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_rerun_merges_late_logs(self):
+        """Test that a later run adds late logs to the archived days
+        without duplicating the logs archived before."""
+
+        archive_logs(self.cutoff, 1000)
+        db.session.add(
+            BatteryLog(
+                battery_id=self.battery_ids[0],
+                state_of_charge=42,
+                voltage=12,
+                timestamp=self.start + timedelta(minutes=45),
+            )
+        )
+        db.session.commit()
+
+        self.assertEqual(archive_logs(self.cutoff, 1000), 1)
+
+        self.assertEqual(
+            len(self.partition_files(self.battery_ids[0], self.start)), 1
+        )
+        logs = self.history(**{"to": "2023-06-01T02:00:00"})
+        self.assertEqual(
+            [log["state_of_charge"] for log in logs], [0, 1, 42, 2, 3]
+        )
+
+    def test_rerun_keeps_rollups(self):
+        """Test that a late log archived by a later run is added to the
+        rollups of its archived day instead of replacing them."""
+
+        archive_logs(self.cutoff, 1000)
+        db.session.add(
+            BatteryLog(
+                battery_id=self.battery_ids[0],
+                state_of_charge=42,
+                voltage=12,
+                timestamp=self.start + timedelta(minutes=45),
+            )
+        )
+        db.session.commit()
+
+        archive_logs(self.cutoff, 1000)
+
+        daily = db.session.get(
+            BatteryLogRollup, ("1d", self.battery_ids[0], self.start)
+        )
+        self.assertEqual(daily.count, 49)
+        self.assertEqual(
+            BatteryLogRollup.query.filter_by(bucket="1d").count(), 4
+        )
+        self.assertEqual(
+            sum(bucket["count"] for bucket in self.history(bucket="1d")),
+            145,
+        )
+
+    def test_late_logs_are_not_deleted(self):
+        """Test that a back-dated log inserted while the logs are archived
+        is kept for the next run instead of being deleted."""
+
+        def write_manifest(*args):
+            db.session.add(
+                BatteryLog(
+                    battery_id=self.battery_ids[0],
+                    state_of_charge=42,
+                    voltage=12,
+                    timestamp=self.start + timedelta(minutes=45),
+                )
+            )
+            db.session.commit()
+            _write_manifest(*args)
+
+        with patch("src.services.log_archive._write_manifest", write_manifest):
+            self.assertEqual(archive_logs(self.cutoff, 1000), 2 * 96)
+
+        self.assertEqual(
+            BatteryLog.query.filter(
+                BatteryLog.timestamp < self.cutoff
+            ).count(),
+            1,
+        )
+        self.assertEqual(archive_logs(self.cutoff, 1000), 1)
+
+    def test_read_during_compaction(self):
+        """Test that the history lists the files again when one is removed
+        by a compaction while it is read."""
+
+        archive_logs(self.cutoff, 1000)
+        logs = self.history(limit=200)
+        read_table = pq.read_table
+        calls = []
+
+        def removed_once(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 1:
+                raise FileNotFoundError(args[0])
+            return read_table(*args, **kwargs)
+
+        with patch("src.services.log_archive.pq.read_table", removed_once):
+            self.assertEqual(self.history(limit=200), logs)
+        self.assertGreater(len(calls), 1)
+
+        # a compacted file read with one of the files it replaces.
+        path = partition_dir(
+            self.archive_dir, self.start, partition_of(self.battery_ids[0], 4)
+        )
+        name = self.partition_files(self.battery_ids[0], self.start)[0]
+        shutil.copy(
+            os.path.join(path, name), os.path.join(path, f"copy-{name}")
+        )
+        self.assertEqual(self.history(limit=200), logs)
+
+    def test_partitions_cannot_change(self):
+        """Test that the archive refuses another number of partitions."""
+
+        archive_logs(self.cutoff, 1000)
+        self.app.config["ARCHIVE_PARTITIONS"] = 8
+
+        with self.assertRaises(ValueError):
+            archive_logs(self.cutoff + timedelta(days=1), 1000)
+
+    def test_command_requires_age(self):
+        """Test that the command needs the age of the logs to archive."""
+
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(args=["maintenance", "archive-logs"])
+        self.assertNotEqual(result.exit_code, 0)
+
+        result = runner.invoke(
+            args=["maintenance", "archive-logs", "--older-than-days", "1"]
+        )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("288 logs archived", result.output)
+        self.assertEqual(BatteryLog.query.count(), 0)
@@ -0,0 +1,228 @@
+"""This method contains unittests for the battery log rollups."""
+
+import os
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.database.model_battery_log_rollup import BatteryLogRollup
+from src.services.log_rollups import compact_rollups, prune_logs
+
+
+class LogRollupsTestCase(unittest.TestCase):
+    """Test cases for the rollup compaction and retention."""
+
+    def setUp(self):
+        """Log every 30 minutes for two days for two batteries."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.battery_ids = [uuid.uuid4(), uuid.uuid4()]
+        self.start = datetime(2023, 6, 1)
+        self.end = self.start + timedelta(days=2)
+        for battery_id in self.battery_ids:
+            db.session.add(
+                Battery(
+                    battery_id=battery_id,
+                    state_of_charge=50,
+                    capacity=100,
+                    voltage=12,
+                    battery_health="EXCELLENT",
+                )
+            )
+            for step in range(96):
+                db.session.add(
+                    BatteryLog(
+                        battery_id=battery_id,
+                        state_of_charge=10 if step % 2 else 50,
+                        voltage=12,
+                        timestamp=self.start + timedelta(minutes=30 * step),
+                    )
+                )
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up the test data and the Flask app context."""
+
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_compact_hourly(self):
+        """Test the hourly rollups of the logs."""
+
+        written = compact_rollups("1h", self.start, self.end)
+        self.assertEqual(written, 2 * 48)
+
+        rollup = db.session.get(
+            BatteryLogRollup, ("1h", self.battery_ids[0], self.start)
+        )
+        self.assertEqual(rollup.count, 2)
+        self.assertEqual(rollup.out_of_band_count, 1)
+        self.assertEqual(rollup.state_of_charge_sum, 60)
+
+    def test_averages_skip_missing_values(self):
+        """Test that the averages are taken over the logs having the value,
+        like the raw history does."""
+
+        db.session.add(
+            BatteryLog(
+                battery_id=self.battery_ids[0],
+                state_of_charge=20,
+                voltage=None,
+                timestamp=self.start + timedelta(minutes=10),
+            )
+        )
+        db.session.commit()
+        compact_rollups("1h", self.start, self.end)
+
+        params = {
+            "bucket": "1h",
+            "from": "2023-06-01T00:00:00",
+            "to": "2023-06-01T01:00:00",
+        }
+        url = f"/api/v1/batteries/{self.battery_ids[0]}/logs"
+        raw = self.client.get(url, query_string={**params, "source": "raw"})
+        rollup = self.client.get(
+            url, query_string={**params, "source": "rollup"}
+        )
+
+        bucket = rollup.json["buckets"][0]
+        self.assertEqual(bucket["count"], 3)
+        self.assertEqual(bucket["voltage"]["avg"], 12)
+        self.assertAlmostEqual(bucket["state_of_charge"]["avg"], 80 / 3)
+        for name in ("voltage", "state_of_charge"):
+            self.assertAlmostEqual(
+                bucket[name]["avg"], raw.json["buckets"][0][name]["avg"]
+            )
+
+    def test_compact_is_idempotent(self):
+        """Test that re-running the compaction rewrites the same rollups."""
+
+        compact_rollups("1d", self.start, self.end)
+        compact_rollups("1d", self.start, self.end)
+
+        rollups = BatteryLogRollup.query.filter_by(bucket="1d").all()
+        self.assertEqual(len(rollups), 4)
+        self.assertEqual({rollup.count for rollup in rollups}, {48})
+
+    def test_prune_keeps_rollups(self):
+        """Test that pruned logs keep their rollups."""
+
+        deleted = prune_logs(self.start + timedelta(days=1), batch_size=10)
+
+        self.assertEqual(deleted, 2 * 48)
+        self.assertEqual(BatteryLog.query.count(), 2 * 48)
+        daily = BatteryLogRollup.query.filter_by(
+            bucket="1d", bucket_start=self.start
+        ).all()
+        self.assertEqual(len(daily), 2)
+
+        # the pruned day must survive a later compaction
+        compact_rollups("1d", self.start, self.end)
+        self.assertEqual(
+            BatteryLogRollup.query.filter_by(bucket="1d").count(), 4
+        )
+
+    def test_prune_merges_late_logs(self):
+        """Test that a back-dated log is merged into the rollups of a pruned
+        day instead of replacing them."""
+
+        prune_logs(self.start + timedelta(days=1), batch_size=10)
+        db.session.add(
+            BatteryLog(
+                battery_id=self.battery_ids[0],
+                state_of_charge=42,
+                voltage=12,
+                timestamp=self.start + timedelta(minutes=45),
+            )
+        )
+        db.session.commit()
+
+        self.assertEqual(prune_logs(self.start + timedelta(days=1), 10), 1)
+        compact_rollups("1d", self.start, self.end)
+
+        daily = db.session.get(
+            BatteryLogRollup, ("1d", self.battery_ids[0], self.start)
+        )
+        self.assertEqual(daily.count, 49)
+        self.assertEqual(daily.state_of_charge_sum, 24 * 60 + 42)
+        self.assertEqual(daily.state_of_charge_count, 49)
+        self.assertEqual(daily.state_of_charge_min, 10)
+        hourly = db.session.get(
+            BatteryLogRollup, ("1h", self.battery_ids[0], self.start)
+        )
+        self.assertEqual(hourly.count, 3)
+        self.assertEqual(
+            BatteryLogRollup.query.filter_by(bucket="1d").count(), 4
+        )
+
+    def test_get_fleet_rollups(self):
+        """Test reading the daily rollups of the fleet."""
+
+        compact_rollups("1d", self.start, self.end)
+
+        response = self.client.get(
+            "/api/v1/batteries/rollups?bucket=1d"
+            "&from=2023-06-01T00:00:00&to=2023-06-03T00:00:00"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [bucket["count"] for bucket in response.json["buckets"]], [96, 96]
+        )
+
+    def test_get_battery_logs_from_rollups(self):
+        """Test reading the history of a battery from the rollups."""
+
+        compact_rollups("1h", self.start, self.end)
+
+        response = self.client.get(
+            f"/api/v1/batteries/{self.battery_ids[0]}/logs?bucket=1h"
+            f"&source=rollup&from=2023-06-01T00:00:00&to=2023-06-01T06:00:00"
+        )
+        self.assertEqual(response.json["source"], "rollup")
+        self.assertEqual(len(response.json["buckets"]), 6)
+        self.assertEqual(
+            response.json["buckets"][0]["state_of_charge"]["avg"], 30
+        )
+
+    def test_history_after_retention_cutoff(self):
+        """Test that a history starting before the retention reads the
+        rollups before the cutoff and the raw logs after it."""
+
+        self.app.config["LOG_RETENTION_DAYS"] = 1
+        now = datetime.utcnow()
+        for timestamp in (now - timedelta(days=2), now - timedelta(minutes=5)):
+            db.session.add(
+                BatteryLog(
+                    battery_id=self.battery_ids[0],
+                    state_of_charge=50,
+                    voltage=12,
+                    timestamp=timestamp,
+                )
+            )
+        db.session.commit()
+        compact_rollups("1d", now - timedelta(days=3), now - timedelta(days=1))
+
+        response = self.client.get(
+            f"/api/v1/batteries/{self.battery_ids[0]}/logs",
+            query_string={
+                "bucket": "1d",
+                "from": (now - timedelta(days=3)).isoformat(),
+                "to": now.isoformat(),
+            },
+        )
+
+        self.assertEqual(response.json["source"], "rollup")
+        self.assertEqual(
+            [bucket["count"] for bucket in response.json["buckets"]], [1, 1]
+        )
@@ -0,0 +1,122 @@
+"""This method contains unittests for the battery logs migration."""
+
+import os
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from unittest import mock
+
+from sqlalchemy import Column, MetaData, Table, inspect, insert
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery_log import BatteryLog
+from src.database.migrate_battery_logs import (
+    LEGACY_TABLE,
+    daily_partition_ddl,
+    migrate_battery_logs,
+)
+
+
+class MigrateBatteryLogsTestCase(unittest.TestCase):
+    """Test cases for the battery logs migration."""
+
+    def setUp(self):
+        """Create the logs table as the previous layout, without a key."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        self.app = create_app()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        self.battery_id = uuid.uuid4()
+        now = datetime.utcnow()
+
+        metadata = MetaData()
+        legacy = Table(
+            "battery_logs",
+            metadata,
+            *[
+                Column(column.name, column.type)
+                for column in BatteryLog.__table__.columns
+                if column.name != "log_id"
+            ],
+        )
+        metadata.create_all(db.engine)
+        with db.engine.begin() as connection:
+            connection.execute(
+                insert(legacy),
+                [
+                    {
+                        "battery_id": self.battery_id,
+                        "state_of_charge": 50,
+                        "voltage": 12,
+                        "timestamp": now - timedelta(days=days),
+                    }
+                    for days in range(3)
+                ],
+            )
+
+    def tearDown(self):
+        """Clean up the test data and the Flask app context."""
+
+        with db.engine.begin() as connection:
+            for table in ["battery_logs", LEGACY_TABLE]:
+                connection.exec_driver_sql(f"DROP TABLE IF EXISTS {table}")
+        self.app_context.pop()
+
+    def test_migrate(self):
+        """Test that every log is copied into the new layout."""
+
+        migrate_battery_logs(db.engine)
+
+        tables = inspect(db.engine).get_table_names()
+        self.assertIn(LEGACY_TABLE, tables)
+        self.assertEqual(
+            BatteryLog.query.filter_by(battery_id=self.battery_id).count(), 3
+        )
+        indexes = inspect(db.engine).get_indexes("battery_logs")
+        self.assertEqual(
+            [index["name"] for index in indexes],
+            ["ix_battery_logs_battery_id_timestamp"],
+        )
+
+    def test_migrate_commits_each_day(self):
+        """Test that the days copied before a failure stay committed."""
+
+        with mock.patch(
+            "src.database.migrate_battery_logs.logger.info",
+            side_effect=[None, RuntimeError("copy failed")],
+        ):
+            with self.assertRaises(RuntimeError):
+                migrate_battery_logs(db.engine)
+
+        self.assertIn(LEGACY_TABLE, inspect(db.engine).get_table_names())
+        self.assertEqual(
+            BatteryLog.query.filter_by(battery_id=self.battery_id).count(), 2
+        )
+
+    def test_migrate_dry_run(self):
+        """Test that a dry run leaves the table untouched."""
+
+        statements = migrate_battery_logs(db.engine, dry_run=True)
+
+        self.assertTrue(statements[0].startswith("ALTER TABLE"))
+        self.assertNotIn(LEGACY_TABLE, inspect(db.engine).get_table_names())
+
+    def test_partitioned_requires_postgres(self):
+        """Test that partitioning is refused on other databases."""
+
+        with self.assertRaises(ValueError):
+            migrate_battery_logs(db.engine, partitioned=True)
+
+    def test_daily_partition_ddl(self):
+        """Test the range of a daily partition."""
+
+        ddl = daily_partition_ddl(datetime(2023, 6, 1).date())
+
+        self.assertIn("battery_logs_20230601", ddl)
+        self.assertIn(
+            "FROM ('2023-06-01T00:00:00') TO ('2023-06-02T00:00:00')", ddl
+        )
@@ -0,0 +1,226 @@
+"""This method contains unittests for the coalescing of the readings."""
+
+import os
+import uuid
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from flask import Flask
+from sqlalchemy.exc import OperationalError
+
+from src.app import create_app
+from src.database.database import db
+from src.database.model_battery import Battery
+from src.database.model_battery_log import BatteryLog
+from src.database.read_models import select_battery
+from src.services.reading_coalescer import ReadingCoalescer, reading_coalescer
+
+NOW = datetime(2023, 6, 1, 12)
+
+
+def make_row(state_of_charge, voltage=12.0, seconds=0):
+    """Returns a log row of a reading taken `seconds` after NOW."""
+
+    return {
+        "battery_id": None,
+        "state_of_charge": state_of_charge,
+        "voltage": voltage,
+        "timestamp": NOW + timedelta(seconds=seconds),
+    }
+
+
+class ReadingCoalescerTestCase(unittest.TestCase):
+    """Test case for the coalescing rules."""
+
+    def setUp(self):
+        """Set up a coalescer with the default settings."""
+
+        app = Flask(__name__)
+        app.config["READING_COALESCING"] = True
+        self.coalescer = ReadingCoalescer()
+        self.coalescer.init_app(app)
+        self.battery_id = uuid.uuid4()
+
+    def coalesce(self, *rows):
+        """Returns the rows logged by the coalescer."""
+
+        return self.coalescer.coalesce(self.battery_id, list(rows))
+
+    def test_deadband(self):
+        """Test that the readings within the deadband are dropped."""
+
+        rows = [
+            make_row(50, seconds=0),
+            make_row(50.3, 12.02, seconds=1),
+            make_row(50.5, 12.04, seconds=2),
+            make_row(51, seconds=3),
+            make_row(51, 12.1, seconds=4),
+        ]
+
+        self.assertEqual(self.coalesce(*rows), [rows[0], rows[3], rows[4]])
+        self.assertEqual(self.coalescer.counters["dropped"], 2)
+
+    def test_drift_is_measured_from_the_logged_reading(self):
+        """Test that small steps are logged once they leave the deadband."""
+
+        rows = [make_row(50 + step * 0.3, seconds=step) for step in range(5)]
+
+        self.assertEqual(self.coalesce(*rows), [rows[0], rows[2], rows[4]])
+
+    def test_duplicates_are_merged(self):
+        """Test that a repeated reading is counted as merged."""
+
+        self.coalesce(make_row(50))
+        self.assertEqual(self.coalesce(make_row(50)), [])
+        self.assertEqual(self.coalescer.counters["merged"], 1)
+        self.assertEqual(self.coalescer.counters["dropped"], 0)
+
+    def test_max_interval(self):
+        """Test that a reading is logged at least every max interval."""
+
+        rows = [make_row(50, seconds=0), make_row(50, seconds=301)]
+
+        self.assertEqual(self.coalesce(*rows), rows)
+
+    def test_out_of_band_readings_are_logged(self):
+        """Test that the readings counted by the health check are logged,
+        as is the first reading back in band."""
+
+        rows = [
+            make_row(21, seconds=0),
+            make_row(19.8, seconds=1),
+            make_row(19.8, seconds=2),
+            make_row(20.1, seconds=3),
+            make_row(20.2, seconds=4),
+        ]
+
+        self.assertEqual(self.coalesce(*rows), rows[:4])
+
+    def test_incomparable_readings_are_logged(self):
+        """Test that readings missing a value or out of order are logged."""
+
+        rows = [
+            make_row(50, seconds=10),
+            make_row(None, seconds=11),
+            make_row(50, seconds=5),
+        ]
+
+        self.assertEqual(self.coalesce(*rows), rows)
+
+    def test_disabled(self):
+        """Test that every reading is logged by default."""
+
+        coalescer = ReadingCoalescer()
+        coalescer.init_app(Flask(__name__))
+        rows = [make_row(50), make_row(50)]
+
+        self.assertFalse(coalescer.enabled)
+        self.assertEqual(coalescer.coalesce(self.battery_id, rows), rows)
+
+    def test_forget(self):
+        """Test that the next reading of a forgotten battery is logged."""
+
+        self.coalesce(make_row(50))
+        self.coalescer.forget(self.battery_id)
+
+        self.assertEqual(len(self.coalesce(make_row(50, seconds=1))), 1)
+
+
+class CoalescedIngestTestCase(unittest.TestCase):
+    """Test case for the ingestion of coalesced readings."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+        os.environ["READING_COALESCING"] = "True"
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            battery = Battery(
+                state_of_charge=50,
+                capacity=100,
+                voltage=12,
+                battery_health="EXCELLENT",
+            )
+            self.battery_id = battery.battery_id
+            db.session.add(battery)
+            db.session.commit()
+
+    def tearDown(self):
+        """Tear down the test environment."""
+
+        del os.environ["READING_COALESCING"]
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_readings_are_coalesced(self):
+        """Test that a batch of repeated readings is logged once, while the
+        state and the health see every reading."""
+
+        readings = [
+            {
+                "battery_id": str(self.battery_id),
+                "state_of_charge": 60,
+                "voltage": 12,
+                "timestamp": f"2023-06-01T12:00:{second:02}",
+            }
+            for second in range(10)
+        ]
+        readings += [
+            dict(readings[0], state_of_charge=5, timestamp=timestamp)
+            for timestamp in ("2023-06-01T12:01:00", "2023-06-01T12:01:01")
+        ]
+
+        response = self.client.post(
+            "/api/v1/batteries/readings", json=readings
+        )
+        self.assertEqual(response.json["accepted"], 12)
+
+        with self.app.app_context():
+            self.assertEqual(BatteryLog.query.count(), 3)
+            self.assertEqual(
+                select_battery(self.battery_id).state_of_charge, 5
+            )
+
+        stats = self.client.get("/debug/coalescing").json
+        self.assertEqual(stats["logged"], 3)
+        self.assertEqual(stats["dropped"], 9)
+        self.assertTrue(reading_coalescer.enabled)
+
+    def test_update_is_coalesced(self):
+        """Test that a repeated battery update is not logged again."""
+
+        for _ in range(3):
+            response = self.client.put(
+                f"/api/v1/batteries/{self.battery_id}",
+                json={"state_of_charge": 60, "voltage": 12},
+            )
+            self.assertEqual(response.status_code, 200)
+
+        with self.app.app_context():
+            self.assertEqual(BatteryLog.query.count(), 1)
+
+    def test_failed_update_is_forgotten(self):
+        """Test that an update whose commit fails is not coalesced with."""
+
+        with patch(
+            "src.services.battery_subscriber.save_states",
+            side_effect=OperationalError("UPDATE", {}, Exception("gone")),
+        ), self.assertRaises(OperationalError):
+            self.client.put(
+                f"/api/v1/batteries/{self.battery_id}",
+                json={"state_of_charge": 60, "voltage": 12},
+            )
+
+        response = self.client.put(
+            f"/api/v1/batteries/{self.battery_id}",
+            json={"state_of_charge": 60, "voltage": 12},
+        )
+        self.assertEqual(response.status_code, 200)
+        with self.app.app_context():
+            self.assertEqual(BatteryLog.query.count(), 1)
@@ -0,0 +1,148 @@
+"""This method contains unittests for the JSON serialization."""
+
+import os
+import uuid
+import unittest
+from datetime import date, datetime, timedelta, timezone
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date as werkzeug_http_date
+
+from src.app import create_app
+from src.database.model_battery import Battery
+from src.database.model_issue import Issue
+from src.utils.json_provider import (
+    OrjsonProvider,
+    create_json_provider,
+    http_date,
+    orjson,
+)
+from src.utils.serializers import battery_to_dict, issue_to_dict
+
+
+def make_battery():
+    """Returns a battery with all of its fields set."""
+
+    battery = Battery(
+        state_of_charge=55.5,
+        capacity=100,
+        voltage=12.1,
+        battery_health="GOOD",
+        battery_id=uuid.UUID("8b1e8c5e-4a50-4c1f-9a8e-0d4f2f4a6b10"),
+    )
+    battery.created_at = datetime(2023, 6, 1, 8, 30, 15, 120000)
+    battery.updated_at = datetime(2023, 6, 2, 9, 0)
+    return battery
+
+
+class SerializerTestCase(unittest.TestCase):
+    """Test case for the model serializers."""
+
+    def test_battery(self):
+        """Test that a battery keeps its native values."""
+
+        battery = make_battery()
+
+        self.assertEqual(
+            battery_to_dict(battery),
+            {
+                "id": battery.battery_id,
+                "state_of_charge": 55.5,
+                "capacity": 100,
+                "voltage": 12.1,
+                "battery_health": "GOOD",
+                "created_at": battery.created_at,
+                "updated_at": battery.updated_at,
+            },
+        )
+
+    def test_issue(self):
+        """Test the representation of an issue."""
+
+        issue = Issue(uuid.uuid4(), "Overheating", "Too hot")
+
+        self.assertEqual(
+            issue_to_dict(issue),
+            {
+                "id": issue.issue_id,
+                "issue_type": "Overheating",
+                "issue_description": "Too hot",
+                "occurrence_timestamp": None,
+            },
+        )
+
+
+class JsonProviderTestCase(unittest.TestCase):
+    """Test case for the JSON providers."""
+
+    def setUp(self):
+        """Set up the test environment."""
+
+        self.app = Flask(__name__)
+
+    @unittest.skipIf(orjson is None, "requires the orjson package")
+    def test_same_output_as_default(self):
+        """Test that orjson writes the responses of the default provider."""
+
+        payload = {"batteries": [battery_to_dict(make_battery())], "n": None}
+
+        with self.app.app_context():
+            expected = DefaultJSONProvider(self.app).response(payload)
+            actual = OrjsonProvider(self.app).response(payload)
+
+        self.assertEqual(actual.get_data(), expected.get_data())
+        self.assertEqual(actual.mimetype, "application/json")
+
+    def test_http_date(self):
+        """Test that dates are formatted like werkzeug does."""
+
+        for value in (
+            datetime(2023, 6, 1, 8, 30, 15, 120000),
+            datetime(
+                1999, 12, 31, 23, 59, tzinfo=timezone(timedelta(hours=3))
+            ),
+            date(2024, 2, 29),
+        ):
+            self.assertEqual(http_date(value), werkzeug_http_date(value))
+
+    @unittest.skipIf(orjson is None, "requires the orjson package")
+    def test_iso_datetimes(self):
+        """Test that datetimes are written as ISO 8601 when configured."""
+
+        self.app.config["JSON_DATETIME_FORMAT"] = "iso"
+
+        data = OrjsonProvider(self.app).dumps(battery_to_dict(make_battery()))
+
+        self.assertIn('"created_at":"2023-06-01T08:30:15.120000"', data)
+        self.assertIn('"id":"8b1e8c5e-4a50-4c1f-9a8e-0d4f2f4a6b10"', data)
+
+    @unittest.skipIf(orjson is None, "requires the orjson package")
+    def test_loads(self):
+        """Test that request bodies are parsed."""
+
+        self.assertEqual(
+            OrjsonProvider(self.app).loads('{"voltage": 12}'), {"voltage": 12}
+        )
+
+    @unittest.skipIf(orjson is None, "requires the orjson package")
+    def test_provider_selection(self):
+        """Test the selection of the provider by the settings."""
+
+        self.assertIsInstance(create_json_provider(self.app), OrjsonProvider)
+        self.app.config["JSON_PROVIDER"] = "default"
+        self.assertNotIsInstance(
+            create_json_provider(self.app), OrjsonProvider
+        )
+        self.app.config["JSON_PROVIDER"] = "ujson"
+        with self.assertRaises(ValueError):
+            create_json_provider(self.app)
+
+    @unittest.skipIf(orjson is None, "requires the orjson package")
+    def test_app_provider(self):
+        """Test that the app serves its responses with orjson."""
+
+        os.environ["TEST_MODE"] = "True"
+        os.environ["SQLALCHEMY_DB_URI"] = "sqlite:///:memory:"
+
+        self.assertIsInstance(create_app().json, OrjsonProvider)